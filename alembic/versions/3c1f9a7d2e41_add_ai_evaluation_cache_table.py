@@ -0,0 +1,44 @@
+"""add ai evaluation cache table
+
+Revision ID: 3c1f9a7d2e41
+Revises: 8a4c517456fa
+Create Date: 2026-10-18 10:12:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f9a7d2e41'
+down_revision: Union[str, None] = '8a4c517456fa'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ai_evaluation_cache',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('question_version', sa.String(length=64), nullable=False),
+        sa.Column('answer_hash', sa.String(length=64), nullable=False),
+        sa.Column('is_correct', sa.Boolean(), nullable=True),
+        sa.Column('score_percentage', sa.Integer(), nullable=True),
+        sa.Column('feedback', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('question_id', 'question_version', 'answer_hash', name='uq_ai_evaluation_cache_key')
+    )
+    op.create_index(op.f('ix_ai_evaluation_cache_id'), 'ai_evaluation_cache', ['id'], unique=False)
+    op.create_index(op.f('ix_ai_evaluation_cache_question_id'), 'ai_evaluation_cache', ['question_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_ai_evaluation_cache_question_id'), table_name='ai_evaluation_cache')
+    op.drop_index(op.f('ix_ai_evaluation_cache_id'), table_name='ai_evaluation_cache')
+    op.drop_table('ai_evaluation_cache')
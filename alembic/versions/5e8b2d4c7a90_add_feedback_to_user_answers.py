@@ -0,0 +1,31 @@
+"""add score_percentage and feedback to user_answers
+
+Revision ID: 5e8b2d4c7a90
+Revises: 3c1f9a7d2e41
+Create Date: 2026-10-18 11:03:47.815204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8b2d4c7a90'
+down_revision: Union[str, None] = '3c1f9a7d2e41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_answers', sa.Column('score_percentage', sa.Integer(), nullable=True))
+    op.add_column('user_answers', sa.Column('feedback', sa.Text(), nullable=True))
+    # Las filas existentes se completan con: python -m app.commands.backfill_answer_feedback
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('user_answers', 'feedback')
+    op.drop_column('user_answers', 'score_percentage')
@@ -0,0 +1,48 @@
+"""add grading jobs table and grading_status to user_exercise_responses
+
+Revision ID: 7b4e1f0c9d23
+Revises: 5e8b2d4c7a90
+Create Date: 2026-10-18 12:20:05.660931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4e1f0c9d23'
+down_revision: Union[str, None] = '5e8b2d4c7a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('user_exercise_responses', sa.Column('grading_status', sa.String(length=20), server_default='completed', nullable=False))
+    op.create_table('grading_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('exercise_response_id', sa.Integer(), nullable=False),
+        sa.Column('user_answer_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['exercise_response_id'], ['user_exercise_responses.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_answer_id'], ['user_answers.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_grading_jobs_id'), 'grading_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_grading_jobs_exercise_response_id'), 'grading_jobs', ['exercise_response_id'], unique=False)
+    op.create_index(op.f('ix_grading_jobs_status'), 'grading_jobs', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_grading_jobs_status'), table_name='grading_jobs')
+    op.drop_index(op.f('ix_grading_jobs_exercise_response_id'), table_name='grading_jobs')
+    op.drop_index(op.f('ix_grading_jobs_id'), table_name='grading_jobs')
+    op.drop_table('grading_jobs')
+    op.drop_column('user_exercise_responses', 'grading_status')
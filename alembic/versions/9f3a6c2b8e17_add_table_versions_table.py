@@ -0,0 +1,36 @@
+"""add table versions table
+
+Revision ID: 9f3a6c2b8e17
+Revises: 7b4e1f0c9d23
+Create Date: 2026-10-18 14:41:19.038754
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3a6c2b8e17'
+down_revision: Union[str, None] = '7b4e1f0c9d23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    table_versions = op.create_table('table_versions',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(table_versions, [
+        {'table_name': table_name, 'version': 0}
+        for table_name in ('exercises', 'questions', 'options', 'content', 'content_user_assignment')
+    ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('table_versions')
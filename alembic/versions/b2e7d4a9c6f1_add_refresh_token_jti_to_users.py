@@ -0,0 +1,28 @@
+"""add refresh token jti to users
+
+Revision ID: b2e7d4a9c6f1
+Revises: 9f3a6c2b8e17
+Create Date: 2026-10-18 16:05:42.518307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e7d4a9c6f1'
+down_revision: Union[str, None] = '9f3a6c2b8e17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('refresh_token_jti', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'refresh_token_jti')
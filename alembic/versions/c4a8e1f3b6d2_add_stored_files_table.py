@@ -0,0 +1,39 @@
+"""add stored files table
+
+Revision ID: c4a8e1f3b6d2
+Revises: b2e7d4a9c6f1
+Create Date: 2026-10-18 16:48:03.274115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a8e1f3b6d2'
+down_revision: Union[str, None] = 'b2e7d4a9c6f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_files',
+        sa.Column('digest', sa.String(length=64), nullable=False),
+        sa.Column('url', sa.String(length=255), nullable=False),
+        sa.Column('path', sa.String(length=255), nullable=False),
+        sa.Column('backend', sa.String(length=20), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(length=100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('digest')
+    )
+    op.create_index(op.f('ix_stored_files_url'), 'stored_files', ['url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_stored_files_url'), table_name='stored_files')
+    op.drop_table('stored_files')
@@ -0,0 +1,30 @@
+"""add image variants
+
+Revision ID: d6f2b8c1e4a7
+Revises: c4a8e1f3b6d2
+Create Date: 2026-10-18 17:22:36.905148
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6f2b8c1e4a7'
+down_revision: Union[str, None] = 'c4a8e1f3b6d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('content', sa.Column('img_variants', sa.JSON(), nullable=True))
+    op.add_column('stored_files', sa.Column('variants', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('stored_files', 'variants')
+    op.drop_column('content', 'img_variants')
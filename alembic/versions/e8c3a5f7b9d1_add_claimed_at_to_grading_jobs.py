@@ -0,0 +1,28 @@
+"""add claimed_at to grading_jobs
+
+Revision ID: e8c3a5f7b9d1
+Revises: d6f2b8c1e4a7
+Create Date: 2026-10-18 19:04:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8c3a5f7b9d1'
+down_revision: Union[str, None] = 'd6f2b8c1e4a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('grading_jobs', sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('grading_jobs', 'claimed_at')
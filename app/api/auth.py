@@ -4,8 +4,9 @@ from sqlalchemy.ext.asyncio import AsyncSession  # Importamos AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import Session
 from app.core.database import get_db
-from app.services.user_service import create_user, authenticate_user, delete_user_router, update_user_router, request_password_reset, reset_password_with_token, validate_reset_token
-from app.schemas.user import LoginRequest, UserCreate, RegisterResponse, ForgotPasswordRequest, ResetPasswordRequest, PasswordResetResponse, ValidateTokenRequest
+from app.core.auth import TokenUser, get_current_user
+from app.services.user_service import create_user, authenticate_user, delete_user_router, update_user_router, request_password_reset, reset_password_with_token, validate_reset_token, issue_session_tokens, rotate_refresh_token
+from app.schemas.user import LoginRequest, UserCreate, RegisterResponse, ForgotPasswordRequest, ResetPasswordRequest, PasswordResetResponse, ValidateTokenRequest, RefreshTokenRequest, TokenPair
 from app.models.user import User
 
 router = APIRouter()
@@ -43,7 +44,21 @@ async def login_user(data: LoginRequest, db: AsyncSession = Depends(get_db)):
         "isAdmin": user.isAdmin,
         "englishLevel": user.englishLevel
     }
-    return {"message": "Login successful", "user": user_response, "status": 200}
+    tokens = await issue_session_tokens(db, user)
+    return {"message": "Login successful", "user": user_response, **tokens, "status": 200}
+
+@router.post("/refresh", response_model=TokenPair)
+async def refresh_tokens(request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """Rota el refresh token y emite un access token nuevo"""
+    tokens = await rotate_refresh_token(db, request.refresh_token)
+    if not tokens:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token")
+    return tokens
+
+@router.get("/me")
+async def read_current_user(current_user: TokenUser = Depends(get_current_user)):
+    """Datos del usuario autenticado, tomados del token (sin consultar la base)"""
+    return {"id": current_user.id, "isAdmin": current_user.isAdmin, "englishLevel": current_user.englishLevel}
 
 @router.post("/forgot-password", response_model=PasswordResetResponse)
 async def forgot_password(request: ForgotPasswordRequest, db: AsyncSession = Depends(get_db)):
@@ -1,11 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.core.database import get_db
-from app.services.content_service import get_content, create_content, assign_users_to_content, get_content_with_users, get_all_content_with_users, check_link_exists, generate_unique_link, get_content_by_user_id
+from app.services.content_service import get_content, create_content, assign_users_to_content, get_content_with_users, get_all_content_with_users, bulk_assign_content, check_link_exists, create_content_with_unique_link, get_content_by_user_id
 from app.services.file_service import file_service
-from app.schemas.content import ContentCreate, ContentUserAssignment, ContentWithUsers
+from app.schemas.content import ContentCreate, ContentUserAssignment, ContentBulkAssignment, ContentWithUsers
 from app.core.firebase_config import firebase_config
+from app.schemas.content import ContentRead
+from app.utils.etag import conditional_json_response
 from typing import Optional
 import base64
 import os
@@ -39,9 +41,12 @@ async def firebase_status_endpoint():
     return status
 
 @router.get("/")
-async def get_content_endpoint(db: AsyncSession = Depends(get_db)):
-    content = await get_content(db)
-    return content
+async def get_content_endpoint(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build_payload():
+        content = await get_content(db)
+        return [ContentRead.model_validate(item) for item in content]
+
+    return await conditional_json_response(request, db, ("content",), build_payload)
 
 @router.post("/create")
 async def create_content_endpoint(
@@ -60,6 +65,7 @@ async def create_content_endpoint(
         print(f"   user_ids: {user_ids}")
         
         image_url_final = None
+        image_variants = None
         
         # Opción 1: Subir imagen a Firebase Storage
         if image_file:
@@ -68,7 +74,7 @@ async def create_content_endpoint(
             print(f"   Tamaño: {image_file.size if hasattr(image_file, 'size') else 'desconocido'}")
             
             try:
-                image_url_final = await file_service.save_image(image_file)
+                image_url_final, image_variants = await file_service.save_image_with_variants(image_file, db)
                 print(f"✅ Imagen subida exitosamente: {image_url_final}")
             except Exception as e:
                 print(f"❌ Error subiendo a Firebase: {str(e)}")
@@ -94,6 +100,7 @@ async def create_content_endpoint(
             link=link,
             title=title,
             img=image_url_final,
+            img_variants=image_variants,
             user_ids=user_ids.split(',') if user_ids else []
         )
         
@@ -109,7 +116,8 @@ async def create_content_endpoint(
                 "thematic": created_content.thematic,
                 "link": created_content.link,
                 "title": created_content.title,
-                "img": created_content.img
+                "img": created_content.img,
+                "img_variants": created_content.img_variants
             },
             "users_assigned": len(content_data.user_ids) if content_data.user_ids else 0
         }
@@ -126,15 +134,39 @@ async def create_content_endpoint(
 @router.post("/assign-users")
 async def assign_users_to_content_endpoint(assignment: ContentUserAssignment, db: AsyncSession = Depends(get_db)):
     try:
-        content = await assign_users_to_content(db, assignment)
-        return {"message": "Users assigned successfully", "content_id": content.id}
+        content, counts = await assign_users_to_content(db, assignment)
+        return {"message": "Users assigned successfully", "content_id": content.id, **counts}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/assign-bulk")
+async def bulk_assign_content_endpoint(assignment: ContentBulkAssignment, db: AsyncSession = Depends(get_db)):
+    """Asigna todos los usuarios indicados a todos los contenidos indicados"""
+    try:
+        counts = await bulk_assign_content(db, assignment)
+        return {"message": "Users assigned successfully", **counts}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/with-users")
-async def get_all_content_with_users_endpoint(db: AsyncSession = Depends(get_db)):
-    content = await get_all_content_with_users(db)
-    return content
+async def get_all_content_with_users_endpoint(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    cursor: Optional[int] = Query(None, description="Id del último contenido de la página anterior (header X-Next-Cursor)"),
+    assigned_to: Optional[int] = None,
+    db: AsyncSession = Depends(get_db)
+):
+    headers = {}
+
+    async def build_payload():
+        content, next_cursor = await get_all_content_with_users(db, limit, cursor, assigned_to)
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = str(next_cursor)
+        return content
+
+    return await conditional_json_response(
+        request, db, ("content", "content_user_assignment"), build_payload, headers
+    )
 
 @router.get("/{content_id}/with-users")
 async def get_content_with_users_endpoint(content_id: int, db: AsyncSession = Depends(get_db)):
@@ -156,10 +188,10 @@ async def update_content_image_endpoint(
             raise HTTPException(status_code=404, detail="Content not found")
         
         # Actualizar imagen
-        new_image_url = await file_service.update_file(
+        new_image_url, new_image_variants = await file_service.update_image(
             content.img, 
             image_file, 
-            "image"
+            db
         )
         
         # Actualizar en base de datos
@@ -170,11 +202,13 @@ async def update_content_image_endpoint(
         db_content = content_result.scalar_one_or_none()
         if db_content:
             db_content.img = new_image_url
+            db_content.img_variants = new_image_variants
             await db.commit()
         
         return {
             "message": "Image updated successfully",
-            "img": new_image_url
+            "img": new_image_url,
+            "img_variants": new_image_variants
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -193,18 +227,14 @@ async def create_content_auto_link_endpoint(
     try:
         print(f"📝 Recibiendo datos: thematic={thematic}, link={link}, title={title}")
         
-        # Generar link único automáticamente
-        unique_link = await generate_unique_link(db, link)
-        if unique_link != link:
-            print(f"🔄 Link modificado de '{link}' a '{unique_link}' para evitar duplicados")
-        
         image_url_final = None
+        image_variants = None
         
         # Opción 1: Subir imagen a Firebase Storage
         if image_file:
             print(f"🖼️  Intentando subir imagen: {image_file.filename}")
             try:
-                image_url_final = await file_service.save_image(image_file)
+                image_url_final, image_variants = await file_service.save_image_with_variants(image_file, db)
                 print(f"✅ Imagen subida exitosamente: {image_url_final}")
             except Exception as e:
                 print(f"❌ Error subiendo a Firebase: {str(e)}")
@@ -220,18 +250,22 @@ async def create_content_auto_link_endpoint(
             print("📷 No se proporcionó imagen, usando placeholder")
             image_url_final = "https://via.placeholder.com/400x300?text=Sin+imagen"
         
-        # Crear objeto de contenido con el link único
+        # Crear objeto de contenido; el link único se resuelve al insertar
         content_data = ContentCreate(
             thematic=thematic,
-            link=unique_link,
+            link=link,
             title=title,
             img=image_url_final,
+            img_variants=image_variants,
             user_ids=user_ids.split(',') if user_ids else []
         )
         
         print(f"📦 Creando contenido con datos: {content_data}")
         
-        created_content = await create_content(db, content_data)
+        created_content = await create_content_with_unique_link(db, content_data)
+        unique_link = created_content.link
+        if unique_link != link:
+            print(f"🔄 Link modificado de '{link}' a '{unique_link}' para evitar duplicados")
         print(f"✅ Contenido creado con ID: {created_content.id}")
         
         return {
@@ -241,7 +275,8 @@ async def create_content_auto_link_endpoint(
                 "thematic": created_content.thematic,
                 "link": created_content.link,
                 "title": created_content.title,
-                "img": created_content.img
+                "img": created_content.img,
+                "img_variants": created_content.img_variants
             },
             "users_assigned": len(content_data.user_ids) if content_data.user_ids else 0,
             "link_modified": unique_link != link,
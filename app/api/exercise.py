@@ -5,20 +5,26 @@ from app.services.exercise_service import (
     create_exercise_router,
     create_full_exercise_router,
     delete_exercise_router,
-    get_full_exercise,
+    get_full_exercise_payload,
     update_exercise_router,
-    get_all_exercises,
+    get_exercises_page,
     get_exercises_by_type_router,
     reject_exercise_router,
     approve_exercise_router
 )
+from app.services.exercise_cache import exercise_tree_cache
 from app.schemas.exercise import (
     exerciseCreate,
     exerciseResponse,
     CreateexerciseResponse,
-    exerciseFullOut
+    exerciseFullOut,
+    exerciseHeaderOut,
+    ExerciseType,
+    EnglishLevel
 )
-from typing import List
+from fastapi import Query, Request
+from app.utils.etag import conditional_json_response
+from typing import List, Literal, Optional, Union
 from pydantic import BaseModel
 import logging
 
@@ -29,6 +35,9 @@ class ExerciseWrapper(BaseModel):
 
 router = APIRouter()
 
+# Tablas de las que depende el árbol de un ejercicio (para el ETag)
+EXERCISE_TREE_TABLES = ("exercises", "questions", "options")
+
 @router.post("/create", response_model=CreateexerciseResponse)
 async def create_exercise(exercise_data: exerciseCreate, db: AsyncSession = Depends(get_db)):
     new_exercise = await create_exercise_router(db, exercise_data)
@@ -120,18 +129,53 @@ async def update_exercise(exercise_id: int, updates: dict, db: AsyncSession = De
         "status": 200
     }
 
+@router.get("/cache/stats")
+async def get_exercise_cache_stats():
+    """Estadísticas de la caché de ejercicios completos"""
+    return exercise_tree_cache.stats()
+
 @router.get("/{exercise_id}", response_model=exerciseResponse)
 async def get_exercise(exercise_id: int, db: AsyncSession = Depends(get_db)):
-    exercise = await get_full_exercise(db, exercise_id)
+    exercise = await get_full_exercise_payload(db, exercise_id)
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
-    return exercise
+    return {"message": "Ejercicio encontrado", "exercise": exercise, "status": 200}
 
-@router.get("/", response_model=List[exerciseFullOut])
-async def get_exercises(db: AsyncSession = Depends(get_db)):
-    try:
-        exercises = await get_all_exercises(db)
+@router.get("/", response_model=List[Union[exerciseFullOut, exerciseHeaderOut]])
+async def get_exercises(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    cursor: Optional[int] = Query(None, description="Id del último ejercicio de la página anterior (header X-Next-Cursor)"),
+    type: Optional[ExerciseType] = None,
+    level: Optional[EnglishLevel] = None,
+    valid: Optional[bool] = None,
+    fields: Literal["full", "headers"] = "full",
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Listar ejercicios paginados por cursor. Sin limit se devuelven todos (compatibilidad
+    con los clientes existentes); con limit, el header X-Next-Cursor indica la página siguiente.
+    Con fields=headers se devuelven solo los datos del ejercicio, sin preguntas.
+    Soporta If-None-Match: responde 304 si los ejercicios no cambiaron.
+    """
+    headers = {}
+
+    async def build_payload():
+        exercises, next_cursor = await get_exercises_page(
+            db,
+            limit=limit,
+            cursor=cursor,
+            exercise_type=type.value if type else None,
+            level=level.value if level else None,
+            valid=valid,
+            include_questions=fields == "full"
+        )
+        if next_cursor is not None:
+            headers["X-Next-Cursor"] = str(next_cursor)
         return exercises
+
+    try:
+        return await conditional_json_response(request, db, EXERCISE_TREE_TABLES, build_payload, headers)
     except Exception as e:
         logger.error(f"Error al obtener ejercicios: {str(e)}")
         raise HTTPException(
@@ -140,9 +184,11 @@ async def get_exercises(db: AsyncSession = Depends(get_db)):
         )
 
 @router.get("/bytype/{exercise_type}", response_model=List[exerciseResponse])
-async def get_exercises_by_type(exercise_type: str, db: AsyncSession = Depends(get_db)):
-    exercises = await get_exercises_by_type_router(db, exercise_type)
-    return exercises
+async def get_exercises_by_type(exercise_type: str, request: Request, db: AsyncSession = Depends(get_db)):
+    return await conditional_json_response(
+        request, db, EXERCISE_TREE_TABLES,
+        lambda: get_exercises_by_type_router(db, exercise_type)
+    )
 
 @router.post("/reject/{exercise_id}")
 async def reject_exercise(exercise_id: int, db: AsyncSession = Depends(get_db)):
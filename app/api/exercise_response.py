@@ -6,13 +6,17 @@ from app.services.exercise_response_service import (
     get_user_exercise_responses,
     get_exercise_response,
     update_user_level,
-    get_answer_feedback
+    get_answer_feedback,
+    get_response_feedback as get_response_feedback_items
 )
 from app.services.ia_generation_service import analyze_text_response
+from app.services.ai_evaluation_cache_service import ai_evaluation_cache
+from app.services.grading_queue import get_grading_status
 from app.schemas.exercise_response import (
     UserExerciseResponseCreate,
     UserExerciseResponseRead,
-    AnswerFeedback
+    AnswerFeedback,
+    GradingStatus
 )
 from app.schemas.question import QuestionOut
 from typing import List
@@ -35,12 +39,15 @@ router = APIRouter()
 async def submit_exercise_response(
     user_id: int,
     response_data: UserExerciseResponseCreate,
+    async_grading: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Enviar las respuestas de un ejercicio
+    Enviar las respuestas de un ejercicio.
+    Con async_grading=true las respuestas de texto libre se corrigen en segundo plano
+    y la entrega se devuelve con grading_status 'pending'.
     """
-    response = await create_exercise_response(db, user_id, response_data)
+    response = await create_exercise_response(db, user_id, response_data, defer_ai_grading=async_grading)
     if not response:
         raise HTTPException(status_code=400, detail="Error al procesar las respuestas")
     return response
@@ -67,6 +74,13 @@ async def set_user_level_endpoint(
     user = await update_user_level(db, user_id)
     return {"message": "Nivel de inglés actualizado", "englishLevel": user.englishLevel}
 
+@router.get("/ai-cache/stats")
+async def get_ai_cache_stats():
+    """
+    Estadísticas de la caché de evaluaciones de IA (aciertos, fallos y llamadas al modelo evitadas)
+    """
+    return ai_evaluation_cache.stats.as_dict()
+
 @router.get("/responses/{response_id}", response_model=UserExerciseResponseRead)
 async def get_response(
     response_id: int,
@@ -80,6 +94,32 @@ async def get_response(
         raise HTTPException(status_code=404, detail="Respuesta no encontrada")
     return response
 
+@router.get("/responses/{response_id}/status", response_model=GradingStatus)
+async def get_response_grading_status(
+    response_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener el estado de corrección de una entrega
+    """
+    status = await get_grading_status(db, response_id)
+    if not status:
+        raise HTTPException(status_code=404, detail="Respuesta no encontrada")
+    return status
+
+@router.get("/responses/{response_id}/feedback", response_model=List[AnswerFeedback])
+async def get_response_feedback_endpoint(
+    response_id: int,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Obtener el feedback de todas las respuestas de una entrega
+    """
+    feedback = await get_response_feedback_items(db, response_id)
+    if not feedback:
+        raise HTTPException(status_code=404, detail="Respuesta no encontrada")
+    return feedback
+
 @router.get("/responses/{response_id}/feedback/{question_id}", response_model=AnswerFeedback)
 async def get_response_feedback(
     response_id: int,
@@ -88,7 +128,7 @@ async def get_response_feedback(
 ):
     """
     Obtener feedback detallado de una respuesta específica.
-    Para preguntas sin opciones, re-analiza la respuesta con IA.
+    Devuelve el puntaje y feedback guardados al momento de la entrega.
     """
     feedback = await get_answer_feedback(db, response_id, question_id)
     if not feedback:
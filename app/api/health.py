@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_db
+from app.core.firebase_config import firebase_config
+from app.services.email_service import email_service
+from app.services.grading_queue import grading_queue
+
+router = APIRouter()
+
+@router.get("/ready")
+async def readiness(db: AsyncSession = Depends(get_db)):
+    """Estado de los backends: 503 si la base no responde; el resto se informa sin inicializarlo"""
+    try:
+        await db.execute(text("SELECT 1"))
+        database_ready = True
+    except Exception:
+        database_ready = False
+
+    status = {
+        "database": database_ready,
+        "grading_queue": grading_queue.running,
+        "firebase": {
+            "initialized": firebase_config.initialized,
+            # Consultar el bucket inicializaría Firebase; solo se informa si ya está caliente
+            "configured": firebase_config.bucket is not None if firebase_config.initialized else None
+        },
+        "email": {
+            "configured": email_service.email_configured,
+            "initialized": email_service.initialized
+        }
+    }
+    return JSONResponse(status, status_code=200 if database_ready else 503)
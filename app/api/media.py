@@ -0,0 +1,71 @@
+"""
+Archivos locales (imágenes y audios del backend local), en reemplazo de StaticFiles.
+
+FileResponse atiende Range/If-Range (206 para poder adelantar los audios). El envío es
+una lectura por bloques en un hilo: Starlette solo delega el archivo al servidor con la
+extensión ASGI http.response.pathsend (respuestas completas, sin Range) y uvicorn no la
+implementa; el envío sin copia requiere un servidor que sí la anuncie en scope["extensions"].
+Los nombres content-addressed (SHA-256) y uuid nunca se reescriben: su ETag sale del
+nombre y se cachean como immutable.
+"""
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from app.core.config import settings
+import asyncio
+import hashlib
+import os
+import re
+import stat
+
+router = APIRouter()
+
+# <sha256>.ext, <sha256>_<derivado>.ext o <uuid>.ext
+_IMMUTABLE_NAME = re.compile(
+    r"^(?P<id>[0-9a-f]{64}(?:_[a-z0-9]+)?|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})\.[A-Za-z0-9]+$"
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "public, max-age=300"
+
+
+def _resolve(path: str) -> str:
+    root = os.path.realpath(settings.LOCAL_STORAGE_ROOT)
+    full_path = os.path.realpath(os.path.join(root, path))
+    if not full_path.startswith(root + os.sep):
+        raise HTTPException(status_code=404, detail="Not Found")
+    return full_path
+
+
+def _etag_for(filename: str, stat_result: os.stat_result) -> tuple:
+    """ETag y Cache-Control: por nombre si es inmutable, si no por tamaño y fecha de modificación."""
+    match = _IMMUTABLE_NAME.match(filename)
+    if match:
+        return f'"{match.group("id")}"', IMMUTABLE_CACHE_CONTROL
+    etag_base = f"{stat_result.st_mtime}-{stat_result.st_size}"
+    return f'"{hashlib.md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"', DEFAULT_CACHE_CONTROL
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+@router.api_route("/{path:path}", methods=["GET", "HEAD"])
+async def serve_media(path: str, request: Request):
+    full_path = _resolve(path)
+    try:
+        stat_result = await asyncio.to_thread(os.stat, full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    etag, cache_control = _etag_for(os.path.basename(full_path), stat_result)
+    headers = {"etag": etag, "cache-control": cache_control}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return FileResponse(full_path, stat_result=stat_result, headers=headers)
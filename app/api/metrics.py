@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from app.core.database import engine
+from app.core.config import settings
+from app.core.pool_metrics import pool_metrics
+from app.core.query_stats import query_stats
+
+router = APIRouter()
+
+@router.get("/pool")
+async def get_pool_metrics():
+    """Estado del pool de conexiones y distribución del tiempo de espera por una conexión"""
+    return pool_metrics.snapshot(engine.sync_engine.pool)
+
+@router.get("/queries")
+async def get_query_metrics(top: int = settings.QUERY_STATS_TOP_N):
+    """Sentencias SQL con mayor tiempo acumulado, agrupadas por huella"""
+    return query_stats.top(top)
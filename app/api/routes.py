@@ -7,6 +7,11 @@ from app.api import exercise
 from app.api import exercise_response
 from app.api import iaGenerartion
 from app.api import content
+from app.api import metrics
+from app.api import health
+from app.api import uploads
+from app.api import media
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -21,4 +26,8 @@ router.include_router(user.router, prefix="/user", tags=["User"])
 router.include_router(question.router, prefix="/questions", tags=["Questions"])
 router.include_router(exercise_response.router, prefix="/exercise", tags=["Exercise Responses"])
 router.include_router(iaGenerartion.router, prefix="/ia", tags=["iaGeneration"])
-router.include_router(content.router, prefix="/content", tags=["Content"])
\ No newline at end of file
+router.include_router(content.router, prefix="/content", tags=["Content"])
+router.include_router(metrics.router, prefix="/internal/metrics", tags=["Metrics"])
+router.include_router(health.router, tags=["Health"])
+router.include_router(uploads.router, prefix="/uploads", tags=["Uploads"])
+router.include_router(media.router, prefix=settings.LOCAL_STORAGE_BASE_URL, tags=["Media"])
\ No newline at end of file
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.database import get_db
+from app.schemas.upload import UploadTicketRequest, UploadTicket, UploadCompleteRequest
+from app.services.direct_upload_service import create_upload_ticket, complete_upload
+from app.services.file_service import file_service
+from app.services.storage_backends import verify_direct_upload
+
+router = APIRouter()
+
+@router.post("/sign", response_model=UploadTicket)
+async def sign_upload(request: UploadTicketRequest, db: AsyncSession = Depends(get_db)):
+    """URL firmada para subir una imagen o un audio directamente al storage"""
+    return await create_upload_ticket(db, request)
+
+@router.post("/complete")
+async def complete_direct_upload(request: UploadCompleteRequest, db: AsyncSession = Depends(get_db)):
+    """Registra el archivo subido en un contenido (imagen) o ejercicio (audio)"""
+    return await complete_upload(db, request)
+
+@router.put("/direct/{backend_name}/{key:path}")
+async def direct_upload(
+    backend_name: str,
+    key: str,
+    request: Request,
+    expires: int = Query(...),
+    signature: str = Query(...),
+    content_type: Optional[str] = Query(None)
+):
+    """Reemplazo local del storage para las URLs firmadas (backends local y memory)"""
+    if backend_name not in ("local", "memory"):
+        raise HTTPException(status_code=404, detail="Backend no disponible")
+    if not verify_direct_upload(backend_name, key, content_type, expires, signature):
+        raise HTTPException(status_code=403, detail="Firma inválida o expirada")
+    if content_type and request.headers.get("content-type") != content_type:
+        raise HTTPException(status_code=400, detail="Content-Type distinto al firmado")
+    declared_size = request.headers.get("content-length")
+    if declared_size and int(declared_size) > file_service.max_file_size:
+        raise HTTPException(status_code=413, detail="Archivo demasiado grande. Máximo 50MB")
+
+    url = await file_service.receive_direct_upload(backend_name, key, request.stream(), content_type)
+    return {"url": url}
@@ -0,0 +1,80 @@
+"""
+Completa score_percentage y feedback en las respuestas guardadas antes de que existieran esas columnas.
+
+Uso:
+    python -m app.commands.backfill_answer_feedback [--batch-size 500] [--reanalyze]
+
+Sin --reanalyze solo se reutilizan evaluaciones de la caché de IA; con --reanalyze
+las respuestas libres que no estén en la caché se envían al modelo.
+El porcentaje siempre se deriva de points_earned para que coincida con el puntaje ya otorgado.
+"""
+import argparse
+import asyncio
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app.core.database import async_session_maker
+from app.models.question import Question
+from app.models.user_answer import UserAnswer
+from app.services.ai_evaluation_cache_service import ai_evaluation_cache, evaluation_cache_key, evaluate_text_answers
+
+
+async def backfill_answer_feedback(batch_size: int = 500, reanalyze: bool = False) -> int:
+    updated = 0
+    last_id = 0
+    async with async_session_maker() as db:
+        while True:
+            result = await db.execute(
+                select(UserAnswer)
+                .options(selectinload(UserAnswer.question).selectinload(Question.options))
+                .where(UserAnswer.id > last_id, UserAnswer.score_percentage.is_(None))
+                .order_by(UserAnswer.id)
+                .limit(batch_size)
+            )
+            answers = result.scalars().all()
+            if not answers:
+                break
+            last_id = answers[-1].id
+
+            # Respuestas libres a preguntas sin opciones: las que evaluó la IA
+            ai_answers = [
+                answer for answer in answers
+                if answer.question and not answer.question.options and answer.answer_text
+            ]
+            evaluations = {}
+            if ai_answers:
+                items = [(answer.question, answer.answer_text) for answer in ai_answers]
+                if reanalyze:
+                    results = await evaluate_text_answers(db, items)
+                else:
+                    keys = [evaluation_cache_key(question, answer_text) for question, answer_text in items]
+                    cached = await ai_evaluation_cache.get_many(db, keys)
+                    results = [cached.get(key) for key in keys]
+                evaluations = {answer.id: evaluation for answer, evaluation in zip(ai_answers, results)}
+
+            for answer in answers:
+                if answer.question and answer.question.points:
+                    answer.score_percentage = round(100 * (answer.points_earned or 0) / answer.question.points)
+                else:
+                    answer.score_percentage = 100 if answer.is_correct else 0
+                evaluation = evaluations.get(answer.id)
+                if evaluation:
+                    answer.feedback = evaluation["feedback"]
+
+            await db.commit()
+            updated += len(answers)
+            print(f"✅ {updated} respuestas actualizadas (último id: {last_id})")
+
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Completa score_percentage y feedback en user_answers")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--reanalyze", action="store_true", help="Consultar al modelo para respuestas sin evaluación cacheada")
+    args = parser.parse_args()
+    total = asyncio.run(backfill_answer_feedback(args.batch_size, args.reanalyze))
+    print(f"🎯 Backfill finalizado: {total} respuestas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark de la corrección de respuestas: check_answer anterior vs AnswerKey precompilada.
+
+Uso:
+    python -m app.commands.benchmark_answer_key [--comparisons 1000000] [--answers 4]
+
+La versión anterior (reproducida abajo) separaba y normalizaba correct_answer en cada
+llamada y escribía cinco líneas de log por comparación. Se mide con el logger en INFO,
+como en producción; los handlers se reemplazan por uno nulo para medir el costo de
+formatear y despachar los registros sin escribir un millón de líneas en la consola.
+"""
+import argparse
+import logging
+import time
+from app.utils.answer_key import check_answer, compile_answer_key
+
+logger = logging.getLogger("benchmark_answer_key")
+
+
+def legacy_check_answer(user_answer: str, correct_answer: str) -> bool:
+    """check_answer tal como estaba en exercise_response_service antes de la clave compilada."""
+    logger.info("\n=== Checking Answer ===")
+    logger.info(f"Raw user answer: '{user_answer}'")
+    logger.info(f"Raw correct answer: '{correct_answer}'")
+
+    if not user_answer or not correct_answer:
+        logger.info("Empty answer detected")
+        return False
+
+    user_answer = user_answer.lower().strip()
+    correct_answers = [ans.lower().strip() for ans in correct_answer.split('|')]
+
+    logger.info(f"Normalized user answer: '{user_answer}'")
+    logger.info(f"Normalized correct answers: {correct_answers}")
+
+    for correct in correct_answers:
+        logger.info(f"Comparing '{user_answer}' with '{correct}'")
+        if user_answer == correct:
+            logger.info("Match found!")
+            return True
+
+    logger.info("No matches found")
+    return False
+
+
+def _measure(name: str, compare, pairs, comparisons: int, baseline: float = None) -> float:
+    started = time.perf_counter()
+    matches = 0
+    for i in range(comparisons):
+        user_answer, correct_answer = pairs[i % len(pairs)]
+        matches += compare(user_answer, correct_answer)
+    elapsed = time.perf_counter() - started
+    speedup = f"  x{baseline / elapsed:.1f}" if baseline else ""
+    print(f"📊 {name:<22} {elapsed:7.2f}s  {comparisons / elapsed / 1e6:6.2f} M comp/s  ({matches} correctas){speedup}")
+    return elapsed
+
+
+def benchmark(comparisons: int, answers: int):
+    logging.basicConfig(level=logging.INFO, handlers=[logging.NullHandler()], force=True)
+
+    # Preguntas con varias respuestas aceptadas; la mitad de los intentos son correctos
+    pairs = []
+    for question in range(100):
+        accepted = [f"Answer {question}-{k}" for k in range(answers)]
+        correct_answer = " | ".join(accepted)
+        pairs.append((f"  answer {question}-{answers - 1} ", correct_answer))
+        pairs.append((f"wrong {question}", correct_answer))
+
+    legacy = _measure("check_answer anterior", legacy_check_answer, pairs, comparisons)
+    _measure("check_answer actual", check_answer, pairs, comparisons, legacy)
+
+    # En la corrección se usa question.answer_key: la clave ya está resuelta por pregunta
+    keys = {correct_answer: compile_answer_key(correct_answer) for _, correct_answer in pairs}
+    _measure("AnswerKey.matches", lambda user_answer, correct_answer: keys[correct_answer].matches(user_answer),
+             pairs, comparisons, legacy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark de check_answer vs AnswerKey")
+    parser.add_argument("--comparisons", type=int, default=1_000_000)
+    parser.add_argument("--answers", type=int, default=4, help="Respuestas aceptadas por pregunta")
+    args = parser.parse_args()
+    benchmark(args.comparisons, args.answers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Compara GET /content/with-users con una consulta por contenido (1+N, como antes) y con la
+consulta única con LEFT JOIN de get_all_content_with_users: sentencias y latencia.
+
+Uso:
+    python -m app.commands.benchmark_content_with_users [--contents 5000] [--users 200] [--runs 5]
+        [--database-url sqlite+aiosqlite:///benchmark_content.db]
+
+Por defecto usa una base SQLite temporal (requiere aiosqlite) con las tablas creadas desde
+los modelos; con --database-url se puede medir contra otra base vacía. Cada contenido se
+asigna a `users` usuarios (5k x 200 = 1M filas en content_user_assignment).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from app.core.query_stats import install_query_timing
+from app.core.request_queries import query_budget
+from app.models.base import Base
+from app.models.content import Content, content_user_assignment
+from app.models.user import User
+from app.schemas.content import ContentWithUsers
+from app.services.content_service import get_all_content_with_users
+
+BATCH_SIZE = 10000
+
+
+async def legacy_get_all_content_with_users(db: AsyncSession):
+    """Versión anterior: una consulta a la tabla intermedia por cada contenido."""
+    result = await db.execute(select(Content))
+    content_with_users = []
+    for content in result.scalars().all():
+        user_ids_result = await db.execute(
+            text("SELECT user_id FROM content_user_assignment WHERE content_id = :content_id"),
+            {"content_id": content.id}
+        )
+        content_with_users.append(ContentWithUsers(
+            id=content.id,
+            thematic=content.thematic,
+            link=content.link,
+            title=content.title,
+            img=content.img,
+            assigned_users=[row[0] for row in user_ids_result.fetchall()]
+        ))
+    return content_with_users
+
+
+async def _seed(session_maker, contents: int, users: int) -> int:
+    async with session_maker() as db:
+        await db.execute(insert(User), [
+            {"id": i, "name": f"user {i}", "email": f"user{i}@example.com", "password": "x", "isAdmin": False}
+            for i in range(1, users + 1)
+        ])
+        await db.execute(insert(Content), [
+            {"id": i, "thematic": "technology", "link": f"content-{i}", "title": f"Contenido {i}", "img": "/static/img.png"}
+            for i in range(1, contents + 1)
+        ])
+        rows = [
+            {"content_id": content_id, "user_id": user_id}
+            for content_id in range(1, contents + 1)
+            for user_id in range(1, users + 1)
+        ]
+        for start in range(0, len(rows), BATCH_SIZE):
+            await db.execute(insert(content_user_assignment), rows[start:start + BATCH_SIZE])
+        await db.commit()
+    return users // 2
+
+
+async def benchmark(contents: int, users: int, runs: int, database_url: str):
+    engine = create_async_engine(database_url)
+    install_query_timing(engine.sync_engine, slow_threshold_ms=float("inf"))
+    session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    started = time.perf_counter()
+    some_user = await _seed(session_maker, contents, users)
+    print(f"🌱 {contents} contenidos x {users} usuarios asignados cargados en {time.perf_counter() - started:.1f}s")
+
+    scenarios = {
+        "1+N (anterior)": lambda db: legacy_get_all_content_with_users(db),
+        "JOIN, todo": lambda db: get_all_content_with_users(db),
+        "JOIN, limit=100": lambda db: get_all_content_with_users(db, limit=100),
+        "JOIN, assigned_to": lambda db: get_all_content_with_users(db, limit=100, assigned_to=some_user),
+    }
+    for name, load in scenarios.items():
+        latencies = []
+        for _ in range(runs):
+            async with session_maker() as db:
+                with query_budget(10 ** 9) as log:
+                    started = time.perf_counter()
+                    result = await load(db)
+                    latencies.append((time.perf_counter() - started) * 1000)
+        items = result if isinstance(result, list) else result[0]
+        print(
+            f"📊 {name:<18} {log.count:6d} sentencias  {len(items):5d} contenidos  "
+            f"p50 {statistics.median(latencies):9.1f} ms  max {max(latencies):9.1f} ms"
+        )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de /content/with-users")
+    parser.add_argument("--contents", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=200, help="Usuarios asignados a cada contenido")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--database-url", help="Base de datos vacía a usar (por defecto SQLite temporal)")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    temp_path = None
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite+aiosqlite:///{temp_path}"
+    try:
+        asyncio.run(benchmark(args.contents, args.users, args.runs, database_url))
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Compara el listado completo de GET /exercise/ con las páginas por cursor y el modo headers.
+
+Uso:
+    python -m app.commands.benchmark_exercise_listing [--exercises 10000] [--questions 10] [--options 4] [--keep]
+
+Carga en la base de datos configurada un catálogo sintético (por defecto 10k ejercicios
+x 10 preguntas x 4 opciones) y mide cada escenario en un subproceso propio, en proceso
+(ASGI, sin red), para que el pico de RSS de uno no contamine al siguiente:
+  - todo:     GET /exercise/ sin limit (lo que hacía el endpoint antes de paginar)
+  - página:   GET /exercise/?limit=100
+  - headers:  GET /exercise/?limit=100&fields=headers
+Al final se borran los datos sintéticos salvo que se pase --keep.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import time
+import httpx
+from sqlalchemy import delete, func, insert, select
+from app.core.database import async_session_maker
+from app.models.exercise import Exercise
+from app.models.option import Option
+from app.models.question import Question
+
+SCENARIOS = {
+    "todo": "/exercise/",
+    "página": "/exercise/?limit=100",
+    "headers": "/exercise/?limit=100&fields=headers",
+}
+BATCH_SIZE = 5000
+
+
+async def _seed(exercises: int, questions: int, options: int) -> tuple:
+    """Inserta el catálogo con ids explícitos (inserts masivos) y devuelve el rango de ids de ejercicios."""
+    async with async_session_maker() as db:
+        first_exercise = (await db.scalar(select(func.max(Exercise.id))) or 0) + 1
+        first_question = (await db.scalar(select(func.max(Question.id))) or 0) + 1
+
+        exercise_rows = [
+            {
+                "id": first_exercise + i, "title": f"benchmark {i}", "type": "grammar", "level": "B1",
+                "valid": True, "instructions": "Elige la opción correcta", "content_text": "Texto de ejemplo " * 10
+            }
+            for i in range(exercises)
+        ]
+        for start in range(0, len(exercise_rows), BATCH_SIZE):
+            await db.execute(insert(Exercise), exercise_rows[start:start + BATCH_SIZE])
+
+        question_rows = []
+        option_rows = []
+        for i in range(exercises):
+            for j in range(questions):
+                question_id = first_question + i * questions + j
+                question_rows.append({
+                    "id": question_id, "exercise_id": first_exercise + i, "question_text": f"Pregunta {j}",
+                    "correct_answer": "a", "explanation": "Explicación", "order": j, "points": 1, "difficulty": "easy"
+                })
+                option_rows.extend(
+                    {"question_id": question_id, "option_text": f"Opción {k}", "is_correct": k == 0}
+                    for k in range(options)
+                )
+        for start in range(0, len(question_rows), BATCH_SIZE):
+            await db.execute(insert(Question), question_rows[start:start + BATCH_SIZE])
+        for start in range(0, len(option_rows), BATCH_SIZE):
+            await db.execute(insert(Option), option_rows[start:start + BATCH_SIZE])
+        await db.commit()
+    return first_exercise, first_exercise + exercises - 1, first_question, first_question + exercises * questions - 1
+
+
+async def _cleanup(first_exercise: int, last_exercise: int, first_question: int, last_question: int):
+    async with async_session_maker() as db:
+        await db.execute(delete(Option).where(Option.question_id.between(first_question, last_question)))
+        await db.execute(delete(Question).where(Question.id.between(first_question, last_question)))
+        await db.execute(delete(Exercise).where(Exercise.id.between(first_exercise, last_exercise)))
+        await db.commit()
+
+
+async def _run_scenario(url: str) -> dict:
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        started = time.perf_counter()
+        response = await client.get(url)
+        elapsed = time.perf_counter() - started
+    # ru_maxrss está en KB en Linux
+    return {
+        "status": response.status_code,
+        "seconds": elapsed,
+        "bytes": len(response.content),
+        "items": len(response.json()) if response.status_code == 200 else 0,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def benchmark(exercises: int, questions: int, options: int, keep: bool):
+    started = time.perf_counter()
+    ids = asyncio.run(_seed(exercises, questions, options))
+    print(f"🌱 {exercises} ejercicios x {questions} preguntas x {options} opciones cargados en {time.perf_counter() - started:.1f}s")
+    try:
+        for name in SCENARIOS:
+            output = subprocess.run(
+                [sys.executable, "-m", "app.commands.benchmark_exercise_listing", "--scenario", name],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(
+                f"📊 {name:<8} {result['seconds'] * 1000:9.1f} ms  {result['items']:6d} ejercicios  "
+                f"{result['bytes'] / (1024 * 1024):8.2f} MB  pico RSS {result['peak_rss_mb']:8.1f} MB  status {result['status']}"
+            )
+    finally:
+        if not keep:
+            asyncio.run(_cleanup(*ids))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del listado de ejercicios")
+    parser.add_argument("--exercises", type=int, default=10000)
+    parser.add_argument("--questions", type=int, default=10, help="Preguntas por ejercicio")
+    parser.add_argument("--options", type=int, default=4, help="Opciones por pregunta")
+    parser.add_argument("--keep", action="store_true", help="No borrar los datos sintéticos")
+    parser.add_argument("--scenario", choices=SCENARIOS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.scenario:
+        print(json.dumps(asyncio.run(_run_scenario(SCENARIOS[args.scenario]))))
+        return
+    benchmark(args.exercises, args.questions, args.options, args.keep)
+
+
+if __name__ == "__main__":
+    main()
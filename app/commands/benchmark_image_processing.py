@@ -0,0 +1,65 @@
+"""
+Mide el throughput de generación de derivados de imágenes por núcleo.
+
+Uso:
+    python -m app.commands.benchmark_image_processing [--images 24] [--width 3000] [--height 2000]
+
+Procesa el mismo lote con 1, 2, ... N procesos (hasta la cantidad de núcleos) usando
+render_image_variants con la configuración actual.
+"""
+import argparse
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+from app.core.config import settings
+from app.utils.image_processing import render_image_variants
+
+
+def _sample_jpeg(width: int, height: int) -> bytes:
+    # Ruido sobre un degradado: se comprime como una foto real, no como un color plano
+    gradient = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    noise = Image.effect_noise((width, height), 40).convert("RGB")
+    buffer = io.BytesIO()
+    Image.blend(gradient, noise, 0.5).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def _render(data: bytes):
+    return render_image_variants(
+        data,
+        settings.IMAGE_VARIANT_WIDTHS,
+        settings.IMAGE_VARIANT_FORMATS,
+        settings.IMAGE_THUMBNAIL_SIZE,
+        settings.IMAGE_VARIANT_QUALITY
+    )
+
+
+def benchmark(images: int, width: int, height: int):
+    data = _sample_jpeg(width, height)
+    print(f"🖼️  {images} imágenes de {width}x{height} ({len(data) / 1024:.0f} KB)")
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # Calentar los procesos antes de medir
+            list(pool.map(_render, [data] * workers))
+            started = time.perf_counter()
+            list(pool.map(_render, [data] * images))
+            elapsed = time.perf_counter() - started
+        throughput = images / elapsed
+        print(f"📊 {workers} procesos: {throughput:.2f} imágenes/s ({throughput / workers:.2f} por núcleo)")
+        workers *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de generación de derivados de imágenes")
+    parser.add_argument("--images", type=int, default=24, help="Imágenes por corrida")
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    args = parser.parse_args()
+    benchmark(args.images, args.width, args.height)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Compara el montaje StaticFiles anterior con la ruta de media para archivos de audio grandes.
+
+Uso:
+    python -m app.commands.benchmark_media_serving [--size-mb 100] [--requests 20]
+
+Genera un archivo en un directorio temporal y mide, en proceso (ASGI, sin red), descargas
+completas, requests con Range (como al adelantar un audio) y revalidaciones con If-None-Match.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import uuid
+import httpx
+from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+
+
+def _build_apps(root: str):
+    # La configuración se lee al importar: apuntar el storage local al directorio temporal
+    os.environ["LOCAL_STORAGE_ROOT"] = root
+    from app.api import media
+
+    static_app = FastAPI()
+    static_app.mount("/static", StaticFiles(directory=root), name="static")
+    media_app = FastAPI()
+    media_app.include_router(media.router, prefix="/static")
+    return {"StaticFiles": static_app, "media": media_app}
+
+
+def _range_header(i: int, size: int) -> dict:
+    # Saltos a posiciones distintas del archivo, como al adelantar un audio
+    chunk = 1024 * 1024
+    start = (i * 7919 * 1024) % (size - chunk)
+    return {"Range": f"bytes={start}-{start + chunk - 1}"}
+
+
+async def _measure(app, url: str, requests: int, headers_for):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        first = await client.get(url)
+        started = time.perf_counter()
+        transferred = 0
+        statuses = set()
+        for i in range(requests):
+            response = await client.get(url, headers=headers_for(i, first))
+            transferred += len(response.content)
+            statuses.add(response.status_code)
+        elapsed = time.perf_counter() - started
+    return elapsed, transferred, sorted(statuses)
+
+
+async def benchmark(size_mb: int, requests: int):
+    root = tempfile.mkdtemp()
+    filename = f"{uuid.uuid4()}.mp3"
+    size = size_mb * 1024 * 1024
+    with open(os.path.join(root, filename), "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+
+    apps = _build_apps(root)
+    url = f"/static/{filename}"
+    scenarios = {
+        "completo": lambda i, first: {},
+        "range 1MB": lambda i, first: _range_header(i, size),
+        "if-none-match": lambda i, first: {"If-None-Match": first.headers.get("etag", "")},
+    }
+    for scenario, headers_for in scenarios.items():
+        for name, app in apps.items():
+            elapsed, transferred, statuses = await _measure(app, url, requests, headers_for)
+            print(
+                f"📊 {scenario:<14} {name:<12} {requests / elapsed:8.1f} req/s  "
+                f"{transferred / elapsed / (1024 * 1024):8.1f} MB/s  status {statuses}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de StaticFiles vs ruta de media")
+    parser.add_argument("--size-mb", type=int, default=100, help="Tamaño del archivo de audio generado")
+    parser.add_argument("--requests", type=int, default=20, help="Requests por escenario")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.size_mb, args.requests))
+
+
+if __name__ == "__main__":
+    main()
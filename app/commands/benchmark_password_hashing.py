@@ -0,0 +1,64 @@
+"""
+Mide el throughput de logins concurrentes y el lag del event loop al verificar contraseñas.
+
+Uso:
+    python -m app.commands.benchmark_password_hashing [--concurrency 50] [--rounds 12]
+
+Compara la verificación síncrona (como se hacía dentro de los handlers) con la versión
+que corre en el pool de hilos de app.utils.security. No usa la base de datos.
+"""
+import argparse
+import asyncio
+import time
+from passlib.context import CryptContext
+from app.core.config import settings
+from app.utils import security
+
+
+async def _measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Devuelve el mayor retraso (en segundos) observado al despertar cada `interval`."""
+    max_lag = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        max_lag = max(max_lag, time.perf_counter() - expected)
+    return max_lag
+
+
+async def _run(concurrency: int, hashed: str, password: str, use_executor: bool):
+    async def login():
+        if use_executor:
+            return await security.verify_password_async(password, hashed)
+        return security.pwd_context.verify(password, hashed)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(_measure_loop_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed, await lag_task
+
+
+async def benchmark(concurrency: int, rounds: int):
+    password = "benchmark-password"
+    hashed = CryptContext(schemes=["bcrypt"], bcrypt__default_rounds=rounds).hash(password)
+    for label, use_executor in (("síncrono", False), ("pool de hilos", True)):
+        elapsed, max_lag = await _run(concurrency, hashed, password, use_executor)
+        print(
+            f"📊 {label}: {concurrency} logins en {elapsed:.2f}s "
+            f"({concurrency / elapsed:.1f} logins/s), lag máximo del loop {max_lag * 1000:.0f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de verificación de contraseñas con bcrypt")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins simultáneos")
+    parser.add_argument("--rounds", type=int, default=settings.BCRYPT_ROUNDS, help="Costo de bcrypt")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.concurrency, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
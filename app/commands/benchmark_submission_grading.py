@@ -0,0 +1,158 @@
+"""
+Compara la corrección de entregas pregunta por pregunta (como se hacía antes) con la
+corrección por lotes de create_exercise_response: sentencias SQL y latencia p50/p95.
+
+Uso:
+    python -m app.commands.benchmark_submission_grading [--sizes 10 40 200] [--runs 30]
+        [--database-url sqlite+aiosqlite:///benchmark_grading.db]
+
+Por defecto usa una base SQLite temporal (requiere aiosqlite) con las tablas creadas desde
+los modelos; con --database-url se puede medir contra otra base vacía. Solo usa preguntas de
+opción múltiple, así que no se llama al modelo de IA. Las sentencias se cuentan con
+query_budget (app.core.request_queries).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload, sessionmaker
+from app.core.query_stats import install_query_timing
+from app.core.request_queries import query_budget
+from app.models.base import Base
+from app.models.exercise import DifficultyLevel, EnglishLevel, Exercise, ExerciseType
+from app.models.option import Option
+from app.models.question import Question
+from app.models.user import User
+from app.models.user_answer import UserAnswer
+from app.models.user_exercise_response import UserExerciseResponse
+from app.schemas.exercise_response import UserAnswerCreate, UserExerciseResponseCreate
+from app.services.exercise_response_service import create_exercise_response
+from app.utils.answer_key import check_answer
+
+
+async def grade_per_answer(db: AsyncSession, user_id: int, response_data: UserExerciseResponseCreate):
+    """Corrección anterior: una consulta por pregunta, otra por opción y un INSERT por respuesta."""
+    exercise_response = UserExerciseResponse(
+        user_id=user_id, exercise_id=response_data.exercise_id, score=0, is_valid=False
+    )
+    db.add(exercise_response)
+    await db.flush()
+
+    total_score = 0
+    all_correct = True
+    for answer_data in response_data.answers:
+        result = await db.execute(
+            select(Question).options(selectinload(Question.options)).where(Question.id == answer_data.question_id)
+        )
+        question = result.scalar_one_or_none()
+        result = await db.execute(
+            select(Option).where(Option.id == answer_data.option_id, Option.question_id == answer_data.question_id)
+        )
+        option = result.scalar_one_or_none()
+        is_correct = check_answer(option.option_text, question.correct_answer)
+        points_earned = question.points if is_correct else 0
+        db.add(UserAnswer(
+            exercise_response_id=exercise_response.id,
+            question_id=answer_data.question_id,
+            option_id=answer_data.option_id,
+            answer_text=answer_data.answer_text,
+            is_correct=is_correct,
+            points_earned=points_earned
+        ))
+        await db.flush()
+        total_score += points_earned
+        all_correct = all_correct and is_correct
+
+    exercise_response.score = total_score
+    exercise_response.is_valid = all_correct
+    user = await db.get(User, user_id)
+    user.points = (user.points or 0) + total_score
+    await db.commit()
+    return exercise_response
+
+
+async def _seed(session_maker, questions: int) -> tuple:
+    async with session_maker() as db:
+        user = User(name="benchmark", email=f"benchmark-{time.time_ns()}@example.com", password="x", isAdmin=False, points=0)
+        exercise = Exercise(
+            title="benchmark_submission_grading", type=ExerciseType.grammar, level=EnglishLevel.B1,
+            valid=True, instructions="Elige la opción correcta"
+        )
+        exercise.questions = [
+            Question(
+                question_text=f"Pregunta {i}", correct_answer="opción 0", points=1, order=i,
+                difficulty=DifficultyLevel.easy,
+                options=[Option(option_text=f"opción {k}", is_correct=k == 0) for k in range(4)]
+            )
+            for i in range(questions)
+        ]
+        db.add_all([user, exercise])
+        await db.commit()
+        answers = [
+            UserAnswerCreate(question_id=question.id, option_id=question.options[i % 2].id)
+            for i, question in enumerate(exercise.questions)
+        ]
+        return user.id, exercise.id, answers
+
+
+def _percentile(values, percentile: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(percentile * (len(ordered) - 1))))]
+
+
+async def benchmark(sizes, runs: int, database_url: str):
+    engine = create_async_engine(database_url)
+    install_query_timing(engine.sync_engine, slow_threshold_ms=float("inf"))
+    session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    user_id, exercise_id, all_answers = await _seed(session_maker, max(sizes))
+    implementations = {"por respuesta": grade_per_answer, "por lotes": create_exercise_response}
+
+    for size in sizes:
+        response_data = UserExerciseResponseCreate(exercise_id=exercise_id, answers=all_answers[:size])
+        for name, grade in implementations.items():
+            latencies = []
+            queries = 0
+            for _ in range(runs):
+                async with session_maker() as db:
+                    with query_budget(10 ** 9) as log:
+                        started = time.perf_counter()
+                        await grade(db, user_id, response_data)
+                        latencies.append((time.perf_counter() - started) * 1000)
+                    queries = log.count
+            print(
+                f"📊 {size:4d} respuestas  {name:<14} {queries:4d} sentencias  "
+                f"p50 {statistics.median(latencies):8.2f} ms  p95 {_percentile(latencies, 0.95):8.2f} ms"
+            )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la corrección de entregas")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 40, 200], help="Respuestas por entrega")
+    parser.add_argument("--runs", type=int, default=30, help="Entregas por tamaño e implementación")
+    parser.add_argument("--database-url", help="Base de datos vacía a usar (por defecto SQLite temporal)")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    temp_path = None
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite+aiosqlite:///{temp_path}"
+    try:
+        asyncio.run(benchmark(args.sizes, args.runs, database_url))
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+
+if __name__ == "__main__":
+    main()
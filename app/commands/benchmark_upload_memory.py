@@ -0,0 +1,68 @@
+"""
+Mide el pico de memoria (RSS) del proceso al guardar una imagen grande con file_service.
+
+Uso:
+    python -m app.commands.benchmark_upload_memory [--file imagen.png] [--side 4000] [--backend memory]
+
+Sin --file se genera (en un proceso aparte, para no afectar la medición) un PNG de ruido
+de unos 48 MB. --backend elige STORAGE_BACKEND (firebase, local o memory) para medir
+sin red.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+
+def _generate_noise_png(path: str, side: int):
+    from PIL import Image
+    Image.frombytes("RGB", (side, side), os.urandom(side * side * 3)).save(path, compress_level=0)
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+async def benchmark(path: str):
+    from app.services.file_service import file_service
+
+    size = os.path.getsize(path)
+    rss_before = _peak_rss_mb()
+    with open(path, "rb") as f:
+        upload = UploadFile(f, filename=os.path.basename(path), headers=Headers({"content-type": "image/png"}))
+        started = time.perf_counter()
+        url = await file_service.save_image(upload)
+        elapsed = time.perf_counter() - started
+    print(f"✅ Guardado en {url}")
+    print(f"📊 {size / (1024 * 1024):.1f} MB en {elapsed:.2f}s, pico de RSS {rss_before:.0f} MB -> {_peak_rss_mb():.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pico de memoria al guardar una imagen grande")
+    parser.add_argument("--file", help="Imagen a subir (por defecto se genera una)")
+    parser.add_argument("--side", type=int, default=4000, help="Lado en píxeles de la imagen generada")
+    parser.add_argument("--backend", choices=["firebase", "local", "memory"], help="Backend de almacenamiento")
+    args = parser.parse_args()
+    if args.backend:
+        # Antes de importar la app, que lee la configuración al cargarse
+        os.environ["STORAGE_BACKEND"] = args.backend
+
+    path = args.file
+    if not path:
+        path = os.path.join(tempfile.mkdtemp(), "benchmark.png")
+        generator = multiprocessing.Process(target=_generate_noise_png, args=(path, args.side))
+        generator.start()
+        generator.join()
+    asyncio.run(benchmark(path))
+
+
+if __name__ == "__main__":
+    main()
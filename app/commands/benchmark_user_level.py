@@ -0,0 +1,119 @@
+"""
+Compara el cálculo del nivel recorriendo todo el historial de entregas (como se hacía antes)
+con update_user_level, que usa User.points y una búsqueda bisect.
+
+Uso:
+    python -m app.commands.benchmark_user_level [--history 100 1000 10000] [--runs 50]
+        [--database-url sqlite+aiosqlite:///benchmark_level.db]
+
+Por defecto usa una base SQLite temporal (requiere aiosqlite) con las tablas creadas desde
+los modelos; con --database-url se puede medir contra otra base vacía.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from app.core.query_stats import install_query_timing
+from app.core.request_queries import query_budget
+from app.models.base import Base
+from app.models.user import User
+from app.models.user_exercise_response import UserExerciseResponse
+from app.services.exercise_response_service import update_user_level
+
+
+async def legacy_update_user_level(db: AsyncSession, user_id: int):
+    """update_user_level anterior: suma en Python el score de todas las entregas del usuario."""
+    user = await db.get(User, user_id)
+    result = await db.execute(
+        select(UserExerciseResponse)
+        .where(UserExerciseResponse.user_id == user_id)
+        .order_by(UserExerciseResponse.submitted_at.desc())
+    )
+    points = sum(response.score for response in result.scalars().all())
+    if not points:
+        return user
+    if points <= 300:
+        user.englishLevel = 'A1'
+    elif points <= 600:
+        user.englishLevel = 'A2'
+    elif points <= 900:
+        user.englishLevel = 'B1'
+    elif points <= 1200:
+        user.englishLevel = 'B2'
+    elif points <= 1500:
+        user.englishLevel = 'C1'
+    else:
+        user.englishLevel = 'C2'
+    await db.commit()
+    return user
+
+
+async def _seed_user(session_maker, history: int) -> int:
+    async with session_maker() as db:
+        user = User(name="benchmark", email=f"benchmark-{time.time_ns()}@example.com", password="x", isAdmin=False)
+        db.add(user)
+        await db.flush()
+        rows = [{"user_id": user.id, "score": 7, "is_valid": True} for _ in range(history)]
+        for start in range(0, len(rows), 5000):
+            await db.execute(insert(UserExerciseResponse), rows[start:start + 5000])
+        # El total mantenido por las entregas (ver reconcile_user_points)
+        user.points = 7 * history
+        await db.commit()
+        return user.id
+
+
+async def benchmark(histories, runs: int, database_url: str):
+    engine = create_async_engine(database_url)
+    install_query_timing(engine.sync_engine, slow_threshold_ms=float("inf"))
+    session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    implementations = {"historial completo": legacy_update_user_level, "User.points": update_user_level}
+    for history in histories:
+        user_id = await _seed_user(session_maker, history)
+        for name, update_level in implementations.items():
+            latencies = []
+            for _ in range(runs):
+                async with session_maker() as db:
+                    with query_budget(10 ** 9) as log:
+                        started = time.perf_counter()
+                        user = await update_level(db, user_id)
+                        latencies.append((time.perf_counter() - started) * 1000)
+            ordered = sorted(latencies)
+            print(
+                f"📊 {history:6d} entregas  {name:<19} nivel {user.englishLevel}  {log.count} sentencias  "
+                f"p50 {statistics.median(latencies):8.2f} ms  p95 {ordered[int(0.95 * (len(ordered) - 1))]:8.2f} ms"
+            )
+
+    await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del cálculo del nivel del usuario")
+    parser.add_argument("--history", type=int, nargs="+", default=[100, 1000, 10000], help="Entregas previas del usuario")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--database-url", help="Base de datos vacía a usar (por defecto SQLite temporal)")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    temp_path = None
+    if not database_url:
+        fd, temp_path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite+aiosqlite:///{temp_path}"
+    try:
+        asyncio.run(benchmark(args.history, args.runs, database_url))
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+
+if __name__ == "__main__":
+    main()
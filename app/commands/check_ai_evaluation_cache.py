@@ -0,0 +1,98 @@
+"""
+Verifica que una respuesta libre se corrija pasando por los dos niveles de la caché de IA.
+
+Uso:
+    python -m app.commands.check_ai_evaluation_cache
+
+Usa la base de datos configurada dentro de una transacción que se revierte al final y
+reemplaza el modelo por un evaluador falso en proceso, así no consume llamadas a OpenAI.
+Comprueba: fallo de caché -> una llamada al modelo, acierto en memoria, y tras vaciar
+la memoria, acierto en la tabla ai_evaluation_cache sin volver a llamar al modelo.
+"""
+import asyncio
+import sys
+from app.core.database import async_session_maker
+from app.models.exercise import DifficultyLevel, EnglishLevel, Exercise, ExerciseType
+from app.models.question import Question
+from app.services import ai_evaluation_cache_service
+from app.services.ai_evaluation_cache_service import ai_evaluation_cache, evaluate_text_answers
+
+
+class FakeEvaluator:
+    """Reemplazo de analyze_text_responses que cuenta las respuestas enviadas al modelo."""
+
+    def __init__(self):
+        self.evaluated = 0
+
+    async def __call__(self, items):
+        self.evaluated += len(items)
+        return [
+            {"is_correct": True, "score_percentage": 90, "feedback": "Buena respuesta"}
+            for _ in items
+        ]
+
+
+def _check(condition: bool, message: str):
+    print(f"{'✅' if condition else '❌'} {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+async def check_ai_evaluation_cache():
+    fake = FakeEvaluator()
+    original = ai_evaluation_cache_service.analyze_text_responses
+    ai_evaluation_cache_service.analyze_text_responses = fake
+    try:
+        async with async_session_maker() as db:
+            exercise = Exercise(
+                title="check_ai_evaluation_cache",
+                type=ExerciseType.writing,
+                level=EnglishLevel.B1,
+                instructions="Responde con tus palabras",
+            )
+            question = Question(
+                exercise=exercise,
+                question_text="Describe your last holiday",
+                correct_answer="I went to the beach",
+                explanation="Past simple",
+                points=10,
+                difficulty=DifficultyLevel.easy,
+            )
+            db.add(exercise)
+            await db.flush()
+            items = [(question, "I went to the beach with my family")]
+
+            first = await evaluate_text_answers(db, items)
+            _check(fake.evaluated == 1, "fallo de caché: la respuesta se envía al modelo")
+            _check(first[0]["score_percentage"] == 90, "se devuelve la evaluación del modelo")
+
+            memory_hits = ai_evaluation_cache.stats.memory_hits
+            second = await evaluate_text_answers(db, [(question, "  i went to the BEACH with my family ")])
+            _check(fake.evaluated == 1, "acierto en memoria: no se vuelve a llamar al modelo")
+            _check(ai_evaluation_cache.stats.memory_hits == memory_hits + 1, "el acierto se cuenta como de memoria")
+            _check(second == first, "la respuesta normalizada reutiliza la misma evaluación")
+
+            # Simula otro proceso (o un reinicio): solo queda la fila en la base de datos
+            ai_evaluation_cache._entries.clear()
+            db_hits = ai_evaluation_cache.stats.db_hits
+            third = await evaluate_text_answers(db, items)
+            _check(fake.evaluated == 1, "acierto en la base de datos: no se vuelve a llamar al modelo")
+            _check(ai_evaluation_cache.stats.db_hits == db_hits + 1, "el acierto se cuenta como de base de datos")
+            _check(third[0]["feedback"] == first[0]["feedback"], "la evaluación leída de la tabla coincide")
+
+            await db.rollback()
+    finally:
+        ai_evaluation_cache_service.analyze_text_responses = original
+        ai_evaluation_cache._entries.clear()
+
+
+def main():
+    try:
+        asyncio.run(check_ai_evaluation_cache())
+    except AssertionError:
+        sys.exit(1)
+    print("🎯 Caché de evaluaciones de IA verificada")
+
+
+if __name__ == "__main__":
+    main()
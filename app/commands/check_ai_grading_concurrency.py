@@ -0,0 +1,126 @@
+"""
+Verifica la corrección concurrente de respuestas libres contra un servidor falso compatible
+con OpenAI, en proceso (ASGI, sin red) y con latencia inyectada.
+
+Uso:
+    python -m app.commands.check_ai_grading_concurrency [--answers 20] [--concurrency 5] [--latency 0.2]
+
+Comprueba que:
+  - nunca hay más de `concurrency` llamadas al modelo en vuelo (y se llega a ese límite),
+  - el tiempo total ronda ceil(answers / concurrency) llamadas en lugar de `answers`,
+  - una respuesta cuyo análisis falla (HTTP 500) recibe la evaluación de respaldo sin
+    afectar a las demás.
+"""
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from openai import AsyncOpenAI
+from app.services import ia_generation_service
+from app.services.ia_generation_service import analyze_text_response, analyze_text_responses
+
+FAILING_ANSWER = "answer that makes the model fail"
+
+
+class FakeOpenAIServer:
+    """Endpoint /v1/chat/completions que tarda `latency` segundos y cuenta las llamadas en vuelo."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.calls = 0
+        self.app = FastAPI()
+        self.app.post("/v1/chat/completions")(self.chat_completions)
+
+    async def chat_completions(self, request: Request):
+        body = await request.json()
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+
+        if FAILING_ANSWER in body["messages"][-1]["content"]:
+            return JSONResponse({"error": {"message": "fake failure", "type": "server_error"}}, status_code=500)
+        content = json.dumps({"is_correct": True, "score_percentage": 80, "feedback": "Respuesta aceptable"})
+        return {
+            "id": f"chatcmpl-fake-{self.calls}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+
+def _check(condition: bool, message: str):
+    print(f"{'✅' if condition else '❌'} {message}")
+    if not condition:
+        raise AssertionError(message)
+
+
+async def check_ai_grading_concurrency(answers: int, concurrency: int, latency: float):
+    server = FakeOpenAIServer(latency)
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app))
+    original = ia_generation_service._async_client
+    ia_generation_service._async_client = AsyncOpenAI(
+        api_key="fake", base_url="http://fake-openai/v1", http_client=http_client, max_retries=0
+    )
+    evaluations = [
+        {
+            "question_text": f"Translate sentence {i}",
+            "correct_answer": "expected answer",
+            "user_answer": FAILING_ANSWER if i == 0 else f"student answer {i}",
+            "explanation": None,
+        }
+        for i in range(answers)
+    ]
+    try:
+        started = time.perf_counter()
+        for evaluation in evaluations:
+            await analyze_text_response(**evaluation)
+        sequential = time.perf_counter() - started
+
+        server.max_in_flight = 0
+        started = time.perf_counter()
+        results = await analyze_text_responses(evaluations, max_concurrency=concurrency)
+        concurrent = time.perf_counter() - started
+    finally:
+        ia_generation_service._async_client = original
+        await http_client.aclose()
+
+    expected = math.ceil(answers / concurrency) * latency
+    print(f"📊 secuencial {sequential:.2f}s, concurrente {concurrent:.2f}s (ideal {expected:.2f}s), x{sequential / concurrent:.1f}")
+    _check(server.max_in_flight <= concurrency, f"como máximo {concurrency} llamadas en vuelo (hubo {server.max_in_flight})")
+    _check(server.max_in_flight == min(concurrency, answers), "las llamadas se reparten hasta el límite de concurrencia")
+    _check(concurrent < expected + latency, "el tiempo total ronda ceil(respuestas / concurrencia) llamadas")
+    _check(results[0].get("fallback") is True, "la respuesta que falla recibe la evaluación de respaldo")
+    _check(
+        all(result["score_percentage"] == 80 and not result.get("fallback") for result in results[1:]),
+        "el fallo de una respuesta no afecta a las demás"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Corrección concurrente contra un servidor OpenAI falso")
+    parser.add_argument("--answers", type=int, default=20, help="Respuestas libres en la entrega")
+    parser.add_argument("--concurrency", type=int, default=5, help="Límite de llamadas simultáneas")
+    parser.add_argument("--latency", type=float, default=0.2, help="Segundos que tarda cada llamada")
+    args = parser.parse_args()
+    try:
+        asyncio.run(check_ai_grading_concurrency(args.answers, args.concurrency, args.latency))
+    except AssertionError:
+        sys.exit(1)
+    print("🎯 Corrección concurrente verificada")
+
+
+if __name__ == "__main__":
+    main()
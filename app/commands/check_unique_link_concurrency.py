@@ -0,0 +1,69 @@
+"""
+Dispara muchos POST /content/create-auto-link simultáneos con el mismo link y verifica
+que todos se creen (sin 500 ni 409) con links distintos.
+
+Uso:
+    python -m app.commands.check_unique_link_concurrency [--requests 50] [--keep]
+
+Corre en proceso (ASGI, sin red) contra la base de datos configurada. Los contenidos
+creados se borran al final salvo que se pase --keep.
+"""
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from collections import Counter
+import httpx
+from sqlalchemy import delete
+from app.core.database import async_session_maker
+from app.main import app
+from app.models.content import Content
+
+
+async def check_unique_link_concurrency(requests: int, keep: bool) -> bool:
+    link = f"check-concurrency-{uuid.uuid4().hex[:8]}"
+    form = {"thematic": "technology", "link": link, "title": "Prueba de concurrencia"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=120) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(
+            *(client.post("/content/create-auto-link", data=form) for _ in range(requests))
+        )
+        elapsed = time.perf_counter() - started
+
+    statuses = Counter(response.status_code for response in responses)
+    created = [response.json()["content"] for response in responses if response.status_code == 200]
+    links = [content["link"] for content in created]
+    print(f"📊 {requests} requests en {elapsed:.2f}s, status: {dict(statuses)}")
+
+    ok = True
+    if statuses != Counter({200: requests}):
+        print("❌ Hubo requests que no crearon el contenido")
+        ok = False
+    if len(set(links)) != len(links):
+        duplicated = [value for value, count in Counter(links).items() if count > 1]
+        print(f"❌ Links duplicados: {duplicated}")
+        ok = False
+    if ok:
+        print(f"✅ {len(links)} contenidos con links distintos ({link}, {link}_1, ...)")
+
+    if not keep and created:
+        async with async_session_maker() as db:
+            await db.execute(delete(Content).where(Content.id.in_([content["id"] for content in created])))
+            await db.commit()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Creación concurrente de contenidos con el mismo link")
+    parser.add_argument("--requests", type=int, default=50, help="Requests simultáneos")
+    parser.add_argument("--keep", action="store_true", help="No borrar los contenidos creados")
+    args = parser.parse_args()
+    if not asyncio.run(check_unique_link_concurrency(args.requests, args.keep)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Prueba de carga del pool de conexiones: 200 requests concurrentes contra un endpoint que
+toma una conexión, ejecuta una consulta y la retiene `--hold-ms` (el tiempo de un request típico).
+
+Uso:
+    python -m app.commands.load_test_db_pool [--concurrency 200] [--requests 2000] [--hold-ms 20]
+        [--pools 5:5 10:20 50:50 100:100] [--pool-timeout 5]
+
+Corre en proceso (ASGI, sin red) contra la base de datos configurada, con un engine por
+configuración de pool (tamaño:overflow) instrumentado igual que el de la app. Por cada una
+muestra throughput, latencias, errores (timeouts del pool) y las métricas de /internal/metrics/pool.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import DATABASE_URL
+from app.core.pool_metrics import InstrumentedAsyncQueuePool, pool_metrics
+
+
+def _build_app(engine, hold_seconds: float) -> FastAPI:
+    session_maker = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def get_db():
+        async with session_maker() as session:
+            yield session
+
+    app = FastAPI()
+
+    @app.get("/work")
+    async def work(db: AsyncSession = Depends(get_db)):
+        try:
+            await db.execute(text("SELECT 1"))
+        except PoolTimeoutError:
+            raise HTTPException(status_code=503, detail="Pool timeout")
+        # La conexión queda tomada hasta que termina el request
+        await asyncio.sleep(hold_seconds)
+        return {"ok": True}
+
+    return app
+
+
+async def _run(pool_size: int, max_overflow: int, pool_timeout: float, concurrency: int, requests: int, hold_seconds: float):
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_pre_ping=True,
+    )
+    pool_metrics.reset()
+    app = _build_app(engine, hold_seconds)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+    max_checked_out = 0
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=None) as client:
+        async def one_request():
+            nonlocal max_checked_out
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/work")
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                max_checked_out = max(max_checked_out, engine.sync_engine.pool.checkedout())
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    snapshot = pool_metrics.snapshot(engine.sync_engine.pool)
+    await engine.dispose()
+
+    ordered = sorted(latencies)
+    busiest_buckets = sorted(
+        ((bucket, count) for bucket, count in snapshot["wait_histogram"].items() if count),
+        key=lambda item: -item[1]
+    )[:3]
+    print(
+        f"📊 pool {pool_size:3d}+{max_overflow:<3d} {requests / elapsed:8.1f} req/s  "
+        f"p50 {statistics.median(ordered):8.1f} ms  p95 {ordered[int(0.95 * (len(ordered) - 1))]:8.1f} ms  "
+        f"p99 {ordered[int(0.99 * (len(ordered) - 1))]:8.1f} ms  status {statuses}"
+    )
+    print(
+        f"   máx. en uso {max_checked_out}, timeouts {snapshot['timeouts']}, "
+        f"espera media {snapshot['avg_wait_ms']} ms, máx. {snapshot['max_wait_ms']} ms, buckets {busiest_buckets}"
+    )
+
+
+async def load_test(pools, pool_timeout: float, concurrency: int, requests: int, hold_ms: float):
+    print(f"🚦 {requests} requests, {concurrency} concurrentes, {hold_ms} ms por request, pool_timeout {pool_timeout}s")
+    for pool_size, max_overflow in pools:
+        await _run(pool_size, max_overflow, pool_timeout, concurrency, requests, hold_ms / 1000)
+
+
+def _parse_pool(value: str):
+    size, _, overflow = value.partition(":")
+    return int(size), int(overflow or 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del pool de conexiones")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--hold-ms", type=float, default=20, help="Tiempo que cada request retiene la conexión")
+    parser.add_argument("--pools", type=_parse_pool, nargs="+", default=[(5, 5), (10, 20), (50, 50), (100, 100)],
+                        help="Configuraciones tamaño:overflow a comparar")
+    parser.add_argument("--pool-timeout", type=float, default=5, help="Segundos de espera por una conexión")
+    args = parser.parse_args()
+    asyncio.run(load_test(args.pools, args.pool_timeout, args.concurrency, args.requests, args.hold_ms))
+
+
+if __name__ == "__main__":
+    main()
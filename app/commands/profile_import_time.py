@@ -0,0 +1,50 @@
+"""
+Perfil del tiempo de import de la aplicación (arranque en frío de cada worker y de cada CLI).
+
+Uso:
+    python -m app.commands.profile_import_time [--module app.main] [--top 20]
+
+Ejecuta `python -X importtime` en un proceso nuevo y muestra los módulos con mayor
+tiempo acumulado.
+"""
+import argparse
+import subprocess
+import sys
+
+
+def profile_imports(module: str):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        print(result.stderr)
+        raise SystemExit(result.returncode)
+
+    # Formato: "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de import por módulo")
+    parser.add_argument("--module", default="app.main", help="Módulo a importar")
+    parser.add_argument("--top", type=int, default=20, help="Cantidad de módulos a mostrar")
+    args = parser.parse_args()
+
+    rows = profile_imports(args.module)
+    total = next((cumulative for cumulative, _, name in rows if name.strip() == args.module), None)
+    if total is not None:
+        print(f"⏱️  import {args.module}: {total / 1000:.1f} ms")
+    for cumulative, self_us, name in sorted(rows, reverse=True)[:args.top]:
+        print(f"{cumulative / 1000:>9.1f} ms  {self_us / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Recalcula User.points a partir de las entregas guardadas y corrige las diferencias.
+
+Uso:
+    python -m app.commands.reconcile_user_points [--dry-run]
+
+User.points se mantiene de forma incremental en cada entrega; este comando sirve para
+reparar desvíos (por ejemplo, usuarios con historial previo a ese contador).
+"""
+import argparse
+import asyncio
+from sqlalchemy import func, update
+from sqlalchemy.future import select
+from app.core.database import async_session_maker
+from app.models.user import User
+from app.models.user_exercise_response import UserExerciseResponse
+
+
+async def reconcile_user_points(dry_run: bool = False) -> int:
+    async with async_session_maker() as db:
+        # Un único GROUP BY con los totales reales de cada usuario
+        totals_result = await db.execute(
+            select(UserExerciseResponse.user_id, func.coalesce(func.sum(UserExerciseResponse.score), 0))
+            .group_by(UserExerciseResponse.user_id)
+        )
+        totals = {user_id: int(total) for user_id, total in totals_result.all()}
+
+        users_result = await db.execute(select(User.id, User.points))
+        drifted = [
+            {"id": user_id, "points": totals.get(user_id, 0)}
+            for user_id, points in users_result.all()
+            if (points or 0) != totals.get(user_id, 0)
+        ]
+
+        for row in drifted:
+            print(f"🔧 Usuario {row['id']}: points -> {row['points']}")
+
+        if drifted and not dry_run:
+            # UPDATE masivo por clave primaria
+            await db.execute(update(User), drifted)
+            await db.commit()
+
+    return len(drifted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula User.points desde user_exercise_responses")
+    parser.add_argument("--dry-run", action="store_true", help="Solo mostrar las diferencias")
+    args = parser.parse_args()
+    drifted = asyncio.run(reconcile_user_points(args.dry_run))
+    print(f"🎯 Usuarios con diferencias: {drifted}")
+
+
+if __name__ == "__main__":
+    main()
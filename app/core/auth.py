@@ -0,0 +1,38 @@
+"""
+Dependencias de autenticación basadas en el token de acceso (JWT).
+
+Los claims del token alcanzan para identificar y autorizar al usuario, así que
+estas dependencias no consultan la base de datos. Son async porque la verificación
+es barata (y casi siempre sale de la caché): así no pasan por el threadpool.
+"""
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.utils.security import ACCESS_TOKEN_TYPE, decode_token
+
+_bearer_scheme = HTTPBearer(auto_error=False)
+
+
+@dataclass(frozen=True)
+class TokenUser:
+    id: int
+    isAdmin: bool
+    englishLevel: Optional[str]
+
+
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer_scheme)
+) -> TokenUser:
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    claims = decode_token(credentials.credentials, ACCESS_TOKEN_TYPE)
+    if claims is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    return TokenUser(id=int(claims["sub"]), isAdmin=claims["isAdmin"], englishLevel=claims.get("englishLevel"))
+
+
+async def get_current_admin(user: TokenUser = Depends(get_current_user)) -> TokenUser:
+    if not user.isAdmin:
+        raise HTTPException(status_code=403, detail="Admin privileges required")
+    return user
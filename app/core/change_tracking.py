@@ -0,0 +1,76 @@
+"""
+Versionado de tablas para GET condicionales (ETag).
+
+Los eventos de la sesión registran qué tablas se escribieron y, al hacer commit,
+incrementan su fila en table_versions dentro de la misma transacción. Así la versión
+es consistente entre todos los workers sin consultar los datos en sí.
+"""
+from itertools import chain
+from typing import Dict, Iterable
+from sqlalchemy import event, inspect, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+from app.models.table_version import TableVersion
+
+TRACKED_TABLES = {"exercises", "questions", "options", "content", "content_user_assignment"}
+
+_CHANGED_TABLES_KEY = "changed_tables"
+
+
+def mark_tables_changed(session, *table_names: str):
+    """Marca tablas como modificadas (para escrituras con text() que los eventos no pueden detectar)."""
+    if isinstance(session, AsyncSession):
+        session = session.sync_session
+    tracked = TRACKED_TABLES.intersection(table_names)
+    if tracked:
+        session.info.setdefault(_CHANGED_TABLES_KEY, set()).update(tracked)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session, flush_context):
+    tables = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tables.add(getattr(obj, "__tablename__", None))
+    # Al borrar un objeto el ORM también borra sus filas en tablas intermedias
+    for obj in session.deleted:
+        for relationship in inspect(obj).mapper.relationships:
+            if relationship.secondary is not None:
+                tables.add(relationship.secondary.name)
+    mark_tables_changed(session, *filter(None, tables))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state):
+    # insert()/update()/delete() ejecutados con session.execute no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        table_name = getattr(table, "name", None)
+        if table_name:
+            mark_tables_changed(orm_execute_state.session, table_name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_table_versions(session):
+    # El flush final del commit ocurre después de este evento, así que se fuerza antes
+    session.flush()
+    tables = session.info.pop(_CHANGED_TABLES_KEY, None)
+    if tables:
+        session.execute(
+            update(TableVersion)
+            .where(TableVersion.table_name.in_(tables))
+            .values(version=TableVersion.version + 1)
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_tables(session):
+    session.info.pop(_CHANGED_TABLES_KEY, None)
+
+
+async def get_table_versions(db: AsyncSession, table_names: Iterable[str]) -> Dict[str, int]:
+    result = await db.execute(
+        select(TableVersion.table_name, TableVersion.version)
+        .where(TableVersion.table_name.in_(list(table_names)))
+    )
+    return dict(result.all())
@@ -1,15 +1,32 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
-from typing import Optional
+from typing import List, Optional
 
 load_dotenv()  # Cargar variables desde el archivo .env
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Pool de conexiones de la base de datos
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Segundos de espera por una conexión libre
+    DB_POOL_RECYCLE: int = 1800  # Reciclar conexiones con más de N segundos (-1 para desactivar)
+    DB_POOL_PRE_PING: bool = True
+    # Logging de SQL
+    DB_ECHO: bool = False  # Loguear todas las sentencias (solo para depurar)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_SAMPLE_RATE: float = 1.0  # Fracción de sentencias lentas que se escriben en el log
+    QUERY_STATS_REPORT_INTERVAL_SECONDS: int = 300  # 0 desactiva el reporte periódico
+    QUERY_STATS_TOP_N: int = 10
+    QUERY_COUNTER_ENABLED: bool = False  # Headers X-DB-Queries/X-DB-Time por request (desarrollo/staging)
+    QUERY_REPEAT_WARN_THRESHOLD: int = 10  # Avisar si una misma sentencia se repite más veces en un request
     ALGORITHM: str
+    BCRYPT_ROUNDS: int = 12  # Costo de bcrypt; al cambiarlo los hashes se actualizan en el próximo login
+    BCRYPT_MAX_WORKERS: int = 4  # Hilos dedicados a calcular hashes
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     OPENAI_API_KEY: str 
+    OPENAI_BASE_URL: Optional[str] = None  # Permite apuntar a un servidor compatible con OpenAI
     secret_key: str
     
     # Configuración para emails (opcional)
@@ -23,7 +40,49 @@ class Settings(BaseSettings):
     
     # Configuración para tokens de recupero
     RESET_TOKEN_EXPIRE_MINUTES: int = 30
+
+    # Tokens de sesión (JWT)
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000  # Tokens ya decodificados que se guardan en memoria
     
+    # Configuración de la corrección con IA
+    AI_GRADING_CONCURRENCY: int = 5  # Evaluaciones simultáneas por entrega
+    AI_GRADING_TIMEOUT_SECONDS: float = 30.0  # Tiempo máximo por llamada al modelo
+    AI_CACHE_MAX_ENTRIES: int = 5000  # Entradas del nivel en memoria de la caché de evaluaciones
+    GRADING_WORKERS: int = 4  # Workers de la cola de corrección en segundo plano
+    GRADING_MAX_ATTEMPTS: int = 3  # Reintentos de un trabajo de corrección antes de marcarlo como fallido
+    GRADING_JOB_LEASE_SECONDS: int = 300  # Tras este tiempo un trabajo en ejecución se considera abandonado
+
+    # Caché de ejercicios completos
+    EXERCISE_CACHE_BACKEND: str = "memory"  # memory o redis
+    EXERCISE_CACHE_REDIS_URL: Optional[str] = None
+    EXERCISE_CACHE_TTL_SECONDS: int = 300
+    EXERCISE_CACHE_MAX_ENTRIES: int = 1000
+
+    # Subida de archivos
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes leídos del request por iteración
+    UPLOAD_SPOOL_MAX_MEMORY: int = 2 * 1024 * 1024  # A partir de este tamaño la subida se guarda en disco
+    UPLOAD_IO_WORKERS: int = 4  # Hilos para validar imágenes y escribir en el storage
+    RESUMABLE_UPLOAD_THRESHOLD: int = 8 * 1024 * 1024  # Archivos más grandes se suben por partes
+    RESUMABLE_UPLOAD_CHUNK_SIZE: int = 8 * 1024 * 1024  # Múltiplo de 256 KB
+    PARALLEL_UPLOAD_THRESHOLD: int = 32 * 1024 * 1024  # Más grandes: partes en paralelo + compose (Firebase)
+    PARALLEL_UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    PARALLEL_UPLOAD_WORKERS: int = 4
+
+    # Backend de almacenamiento de archivos
+    STORAGE_BACKEND: str = "firebase"  # firebase, local o memory
+    STORAGE_FALLBACK_TO_LOCAL: bool = True  # Si el backend principal no está disponible o falla
+    LOCAL_STORAGE_ROOT: str = "static"
+    LOCAL_STORAGE_BASE_URL: str = "/static"
+    DIRECT_UPLOAD_EXPIRE_SECONDS: int = 900  # Vigencia de las URLs firmadas de subida
+
+    # Derivados de imágenes
+    IMAGE_VARIANT_WIDTHS: List[int] = [320, 640, 1280]
+    IMAGE_VARIANT_FORMATS: List[str] = ["webp", "jpeg"]
+    IMAGE_THUMBNAIL_SIZE: int = 160  # Lado de la miniatura cuadrada
+    IMAGE_VARIANT_QUALITY: int = 80
+    IMAGE_PROCESSING_WORKERS: int = 2  # Procesos dedicados a generar derivados
+
     # Configuración de Firebase Storage
     FIREBASE_STORAGE_BUCKET: Optional[str] = None
     GOOGLE_APPLICATION_CREDENTIALS: Optional[str] = None
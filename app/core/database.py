@@ -2,6 +2,9 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from typing import AsyncGenerator
+from app.core.config import settings
+from app.core.pool_metrics import InstrumentedAsyncQueuePool
+from app.core.query_stats import install_query_timing
 from dotenv import load_dotenv
 import os
 from dotenv import load_dotenv
@@ -11,7 +14,8 @@ import os
 Base = declarative_base()
 
 # Importa todos los modelos aquí para que Alembic los vea
-from app.models import question, option, user, content, exercise, user_exercise_response, user_answer
+from app.models import question, option, user, content, exercise, user_exercise_response, user_answer, ai_evaluation_cache, grading_job, table_version, stored_file
+from app.core import change_tracking  # Registra los eventos de versionado de tablas
 
 # Definir la URL de la base de datos
 # Cargar las variables de entorno desde el archivo .env
@@ -20,8 +24,24 @@ load_dotenv()
 # Obtener la URL de la base de datos desde las variables de entorno
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+def _pool_options(url: str) -> dict:
+    """Opciones del pool según Settings (SQLite en memoria usa un StaticPool sin estas opciones)."""
+    if url.startswith("sqlite") and ":memory:" in url:
+        return {}
+    return {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
 # Crear el motor asíncrono
-engine = create_async_engine(DATABASE_URL, echo=True)
+engine = create_async_engine(DATABASE_URL, echo=settings.DB_ECHO, **_pool_options(DATABASE_URL))
+
+# Medir cada sentencia y loguear solo las lentas
+install_query_timing(engine.sync_engine, settings.SLOW_QUERY_THRESHOLD_MS, settings.SLOW_QUERY_LOG_SAMPLE_RATE)
 
 # Crear un sessionmaker asíncrono correctamente nombrado
 async_session_maker = sessionmaker(
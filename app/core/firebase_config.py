@@ -1,12 +1,30 @@
-import firebase_admin
-from firebase_admin import credentials, storage
+import asyncio
 import os
+import threading
 from typing import Optional
 
 class FirebaseConfig:
+    """
+    Configuración de Firebase Storage. El SDK se importa e inicializa en el primer uso
+    (o en warmup() desde el lifespan), no al importar el módulo.
+    """
+
     def __init__(self):
         self.bucket = None
-        self._initialize_firebase()
+        self.initialized = False
+        self._lock = threading.Lock()
+
+    def _ensure_initialized(self):
+        if self.initialized:
+            return
+        with self._lock:
+            if not self.initialized:
+                self._initialize_firebase()
+                self.initialized = True
+
+    async def warmup(self):
+        """Inicializa Firebase en un hilo para no bloquear el event loop."""
+        await asyncio.to_thread(self._ensure_initialized)
     
     def _initialize_firebase(self):
         """Inicializar Firebase Admin SDK"""
@@ -25,6 +43,10 @@ class FirebaseConfig:
                 firebase_bucket = firebase_bucket[5:]  # Remover 'gs://'
             
             print(f"🔧 Usando bucket: {firebase_bucket}")
+
+            # El SDK se importa solo si hay un bucket configurado
+            import firebase_admin
+            from firebase_admin import credentials, storage
             
             # Opción 1: Usar archivo de credenciales (recomendado para producción)
             if credentials_file and os.path.exists(credentials_file):
@@ -49,11 +71,12 @@ class FirebaseConfig:
     
     def get_bucket(self):
         """Obtener el bucket de Storage"""
+        self._ensure_initialized()
         return self.bucket
     
     def is_configured(self):
         """Verificar si Firebase está configurado"""
-        return self.bucket is not None
+        return self.get_bucket() is not None
 
 # Instancia global
 firebase_config = FirebaseConfig() 
\ No newline at end of file
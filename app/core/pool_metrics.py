@@ -0,0 +1,66 @@
+from bisect import bisect_left
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+import time
+
+# Límites (en ms) de los buckets del histograma de espera para obtener una conexión
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class PoolMetrics:
+    """Métricas de uso del pool de conexiones (checkouts, timeouts y tiempo de espera)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.wait_histogram = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def observe_wait(self, seconds: float, timed_out: bool = False):
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+        self.total_wait_seconds += seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+        self.wait_histogram[bisect_left(WAIT_BUCKETS_MS, seconds * 1000)] += 1
+
+    def snapshot(self, pool) -> dict:
+        histogram = {f"le_{bound}ms": count for bound, count in zip(WAIT_BUCKETS_MS, self.wait_histogram)}
+        histogram[f"gt_{WAIT_BUCKETS_MS[-1]}ms"] = self.wait_histogram[-1]
+        observed = self.checkouts + self.timeouts
+        stats = {
+            "pool_class": type(pool).__name__,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.total_wait_seconds / observed * 1000, 3) if observed else 0.0,
+            "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            "wait_histogram": histogram
+        }
+        # Los pools sin cola (StaticPool, NullPool) no exponen estos contadores
+        for name in ("size", "checkedout", "checkedin", "overflow"):
+            method = getattr(pool, name, None)
+            if callable(method):
+                stats[name] = method()
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Pool asíncrono que mide cuánto espera cada checkout por una conexión."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.observe_wait(time.perf_counter() - started)
+        return connection
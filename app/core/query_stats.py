@@ -0,0 +1,103 @@
+"""
+Medición de sentencias SQL mediante eventos del engine.
+
+Cada sentencia se agrupa por una huella normalizada (sin espacios repetidos ni listas
+de parámetros variables) para acumular cantidad y tiempo total; solo las sentencias
+que superan SLOW_QUERY_THRESHOLD_MS se escriben en el log.
+"""
+from functools import lru_cache
+from typing import Dict, List
+from sqlalchemy import event
+from app.core.request_queries import record_request_query
+import asyncio
+import random
+import re
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+# Un valor: parámetro de cualquier paramstyle o literal ya reemplazado
+_VALUE = r"(?:\?|%s|%\(\w+\)s|:\w+|\$\d+|__\[POSTCOMPILE_\w+\])"
+_VALUE_LIST = re.compile(rf"\(\s*{_VALUE}(?:\s*,\s*{_VALUE})*\s*\)")
+_REPEATED_TUPLES = re.compile(r"\(\?\+\)(?:\s*,\s*\(\?\+\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normaliza una sentencia para agrupar las que solo difieren en sus valores."""
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    normalized = _VALUE_LIST.sub("(?+)", normalized)
+    normalized = _REPEATED_TUPLES.sub("(?+)", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+class QueryStats:
+    """Cantidad, tiempo total y máximo por huella de sentencia."""
+
+    def __init__(self):
+        self._stats: Dict[str, List[float]] = {}
+
+    def record(self, statement_fingerprint: str, seconds: float):
+        stats = self._stats.get(statement_fingerprint)
+        if stats is None:
+            self._stats[statement_fingerprint] = [1, seconds, seconds]
+        else:
+            stats[0] += 1
+            stats[1] += seconds
+            stats[2] = max(stats[2], seconds)
+
+    def top(self, n: int) -> List[dict]:
+        ranked = sorted(self._stats.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [
+            {
+                "fingerprint": statement_fingerprint,
+                "count": int(count),
+                "total_ms": round(total * 1000, 3),
+                "avg_ms": round(total / count * 1000, 3),
+                "max_ms": round(maximum * 1000, 3)
+            }
+            for statement_fingerprint, (count, total, maximum) in ranked
+        ]
+
+    def reset(self):
+        self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def install_query_timing(sync_engine, slow_threshold_ms: float, slow_log_sample_rate: float = 1.0):
+    """Registra los eventos que miden cada sentencia ejecutada por el engine."""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_started_at = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_started_at
+        statement_fingerprint = fingerprint(statement)
+        query_stats.record(statement_fingerprint, elapsed)
+        record_request_query(statement_fingerprint, elapsed)
+        elapsed_ms = elapsed * 1000
+        if elapsed_ms >= slow_threshold_ms and random.random() < slow_log_sample_rate:
+            logger.warning(f"Slow query ({elapsed_ms:.1f} ms): {statement_fingerprint}")
+
+
+async def report_query_stats_periodically(interval_seconds: int, top_n: int):
+    """Escribe en el log, cada `interval_seconds`, las N huellas con mayor tiempo acumulado."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        top = query_stats.top(top_n)
+        if not top:
+            continue
+        lines = [
+            f"  {entry['total_ms']:>10.1f} ms  {entry['count']:>7}x  avg {entry['avg_ms']:.2f} ms  {entry['fingerprint'][:200]}"
+            for entry in top
+        ]
+        logger.info("Top %d queries by total time:\n%s", len(top), "\n".join(lines))
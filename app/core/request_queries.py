@@ -0,0 +1,108 @@
+"""
+Conteo de sentencias SQL por request (desarrollo/staging).
+
+El hook de query_stats suma cada sentencia al registro activo en un ContextVar.
+QueryCounterMiddleware abre un registro por request, agrega los headers X-DB-Queries y
+X-DB-Time y avisa cuando una misma huella se repite demasiado (posible N+1).
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class RequestQueryLog:
+    """Sentencias ejecutadas dentro de un request (o de un bloque query_budget)."""
+
+    __slots__ = ("count", "seconds", "fingerprints")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.fingerprints = Counter()
+
+    def record(self, statement_fingerprint: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        self.fingerprints[statement_fingerprint] += 1
+
+    def repeated(self, threshold: int):
+        """Huellas ejecutadas más de `threshold` veces."""
+        return [(fp, count) for fp, count in self.fingerprints.most_common() if count > threshold]
+
+
+_current_log: ContextVar[Optional[RequestQueryLog]] = ContextVar("request_query_log", default=None)
+
+
+def record_request_query(statement_fingerprint: str, seconds: float):
+    """Llamado por el hook del engine; no hace nada fuera de un request medido."""
+    log = _current_log.get()
+    if log is not None:
+        log.record(statement_fingerprint, seconds)
+
+
+class QueryCounterMiddleware:
+    """Middleware ASGI que cuenta las sentencias SQL y el tiempo en DB de cada request."""
+
+    def __init__(self, app, repeat_threshold: int = 10):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        log = RequestQueryLog()
+        token = _current_log.set(log)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-db-queries", str(log.count).encode()))
+                headers.append((b"x-db-time", f"{log.seconds * 1000:.1f}ms".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_log.reset(token)
+            for statement_fingerprint, count in log.repeated(self.repeat_threshold):
+                logger.warning(
+                    f"Possible N+1 in {scope['method']} {scope['path']}: "
+                    f"{count}x {statement_fingerprint[:200]}"
+                )
+
+
+@contextmanager
+def query_budget(max_queries: int):
+    """
+    Falla si el bloque ejecuta más de `max_queries` sentencias. Pensado para tests que
+    llaman a los servicios directamente:
+
+        with query_budget(3):
+            await get_all_content_with_users(db)
+    """
+    log = RequestQueryLog()
+    token = _current_log.set(log)
+    try:
+        yield log
+    finally:
+        _current_log.reset(token)
+    if log.count > max_queries:
+        details = "\n".join(f"  {count}x {fp[:200]}" for fp, count in log.fingerprints.most_common())
+        raise AssertionError(f"Expected at most {max_queries} queries, executed {log.count}:\n{details}")
+
+
+def assert_query_budget(response, max_queries: int):
+    """Variante para tests de endpoints: valida el header X-DB-Queries de la respuesta."""
+    executed = int(response.headers["X-DB-Queries"])
+    if executed > max_queries:
+        raise AssertionError(
+            f"{response.request.method} {response.request.url.path}: "
+            f"expected at most {max_queries} queries, executed {executed}"
+        )
@@ -1,7 +1,15 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 from app.api.routes import router as api_router  # Importa el router desde api/routes.py
+from app.services.grading_queue import grading_queue
+from app.services.email_service import email_service
+from app.core.firebase_config import firebase_config
+from app.core.config import settings
+from app.core.query_stats import report_query_stats_periodically
+from app.core.request_queries import QueryCounterMiddleware
+from app.utils.image_processing import shutdown_process_pool
+import asyncio
 import logging
 import os
 
@@ -11,7 +19,25 @@ logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Inicializar Firebase y el cliente de email fuera del import (en hilos, en paralelo)
+    await asyncio.gather(firebase_config.warmup(), asyncio.to_thread(email_service.warmup))
+    # Iniciar los workers de la cola de corrección en segundo plano
+    await grading_queue.start()
+    # Reporte periódico de las sentencias SQL más costosas
+    report_task = None
+    if settings.QUERY_STATS_REPORT_INTERVAL_SECONDS > 0:
+        report_task = asyncio.create_task(report_query_stats_periodically(
+            settings.QUERY_STATS_REPORT_INTERVAL_SECONDS, settings.QUERY_STATS_TOP_N
+        ))
+    yield
+    if report_task:
+        report_task.cancel()
+    await grading_queue.stop()
+    shutdown_process_pool()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -20,14 +46,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Permitir todos los métodos (GET, POST, etc.)
     allow_headers=["*"],  # Permitir todos los encabezados
+    expose_headers=["X-Next-Cursor", "X-DB-Queries", "X-DB-Time"],  # Cursor de paginación y métricas de DB
 )
 
-# Crear directorio static si no existe
-os.makedirs("static", exist_ok=True)
-os.makedirs("static/images", exist_ok=True)
+# Contar sentencias SQL por request (solo desarrollo/staging)
+if settings.QUERY_COUNTER_ENABLED:
+    app.add_middleware(QueryCounterMiddleware, repeat_threshold=settings.QUERY_REPEAT_WARN_THRESHOLD)
 
-# Montar archivos estáticos
-app.mount("/static", StaticFiles(directory="static"), name="static")
+# Crear directorio static si no existe (los archivos se sirven desde app/api/media.py)
+os.makedirs(settings.LOCAL_STORAGE_ROOT, exist_ok=True)
 
 # Incluir el router en la app principal
 app.include_router(api_router)
\ No newline at end of file
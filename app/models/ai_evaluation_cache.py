@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, UniqueConstraint, func
+from app.models.base import Base
+
+class AIEvaluationCache(Base):
+    __tablename__ = "ai_evaluation_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Huella de correct_answer + explanation: si cambian, las entradas viejas dejan de coincidir
+    question_version = Column(String(64), nullable=False)
+    # SHA-256 de la respuesta normalizada con normalize_text
+    answer_hash = Column(String(64), nullable=False)
+    is_correct = Column(Boolean, default=False)
+    score_percentage = Column(Integer, default=0)
+    feedback = Column(Text)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("question_id", "question_version", "answer_hash", name="uq_ai_evaluation_cache_key"),
+    )
@@ -1,5 +1,5 @@
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Enum as SQLEnum, ForeignKey, Table
+from sqlalchemy import Column, Integer, String, Enum as SQLEnum, ForeignKey, Table, JSON
 from sqlalchemy.orm import declarative_base, relationship
 from .base import Base
 
@@ -28,6 +28,8 @@ class Content(Base):
     link = Column(String(255), unique=True, index=True, nullable=False)
     title = Column(String(255), nullable=False)
     img = Column(String(255), nullable=False)
+    # Derivados de img: {"w640": {"webp": url, "jpeg": url}, ..., "thumbnail": {...}}
+    img_variants = Column(JSON, nullable=True)
     
     # Relación muchos a muchos con users - usando lazy='select' para evitar problemas
     assigned_users = relationship("User", secondary=content_user_assignment, back_populates="assigned_content", lazy='select')
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy.orm import relationship
+from app.models.base import Base
+
+class GradingJob(Base):
+    __tablename__ = "grading_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    exercise_response_id = Column(Integer, ForeignKey("user_exercise_responses.id", ondelete="CASCADE"), nullable=False, index=True)
+    user_answer_id = Column(Integer, ForeignKey("user_answers.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    # Momento (UTC) en que un worker tomó el trabajo; sirve para retomar los abandonados
+    claimed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=func.now())
+    updated_at = Column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
+
+    # Relaciones
+    user_answer = relationship("UserAnswer")
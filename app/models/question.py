@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, ForeignKey, Text, Enum
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 from app.models.exercise import DifficultyLevel  # Importa el Enum
+from app.utils.answer_key import AnswerKey, compile_answer_key
 
 class Question(Base):
     __tablename__ = "questions"
@@ -17,3 +18,8 @@ class Question(Base):
 
     options = relationship("Option", back_populates="question", cascade="all, delete-orphan")
     exercise = relationship("Exercise", back_populates="questions")
+
+    @property
+    def answer_key(self) -> AnswerKey:
+        """Clave de respuestas compilada para corregir sin re-procesar correct_answer."""
+        return compile_answer_key(self.correct_answer)
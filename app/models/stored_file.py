@@ -0,0 +1,15 @@
+from sqlalchemy import Column, BigInteger, String, DateTime, JSON, func
+from app.models.base import Base
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+
+    # SHA-256 del contenido: el mismo archivo subido dos veces se guarda una sola vez
+    digest = Column(String(64), primary_key=True)
+    url = Column(String(255), nullable=False, index=True)
+    path = Column(String(255), nullable=False)  # Nombre del blob o ruta local
+    backend = Column(String(20), nullable=False)  # firebase o local
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(100))
+    variants = Column(JSON, nullable=True)  # URLs de los derivados (None si no se generaron)
+    created_at = Column(DateTime(timezone=True), default=func.now())
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String
+from app.models.base import Base
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+
+    # Contador de cambios por tabla, se incrementa en la misma transacción que la escritura
+    table_name = Column(String(64), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -27,6 +27,9 @@ class User(Base):
     reset_token = Column(String(255), nullable=True)
     reset_token_expires = Column(DateTime, nullable=True)
 
+    # jti del refresh token vigente (se rota en cada /auth/refresh)
+    refresh_token_jti = Column(String(64), nullable=True)
+
     # Relaciones
     exercise_responses = relationship("UserExerciseResponse", back_populates="user", cascade="all, delete-orphan")
     assigned_content = relationship("Content", secondary="content_user_assignment", back_populates="assigned_users")
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Boolean, Text, ForeignKey, DateTime, func
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -12,6 +12,8 @@ class UserAnswer(Base):
     answer_text = Column(String(1000))
     is_correct = Column(Boolean, default=False)
     points_earned = Column(Integer, default=0)
+    score_percentage = Column(Integer, nullable=True)
+    feedback = Column(Text, nullable=True)
     submitted_at = Column(DateTime(timezone=True), default=func.now())
 
     # Relaciones
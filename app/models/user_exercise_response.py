@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, Boolean, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, func
 from sqlalchemy.orm import relationship
 from app.models.base import Base
 
@@ -11,6 +11,7 @@ class UserExerciseResponse(Base):
     submitted_at = Column(DateTime(timezone=True), default=func.now())
     score = Column(Integer, default=0)
     is_valid = Column(Boolean, default=False)
+    grading_status = Column(String(20), nullable=False, default="completed", server_default="completed")  # pending, completed
 
     # Relaciones
     user = relationship("User", back_populates="exercise_responses")
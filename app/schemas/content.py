@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Dict, Optional, List
 from enum import Enum
 
 # Enum para Thematic
@@ -15,6 +15,7 @@ class ContentCreate(BaseModel):
     link: str
     title: str
     img: str
+    img_variants: Optional[Dict[str, Dict[str, str]]] = None  # Derivados generados al subir la imagen
     user_ids: Optional[List[int]] = None  # IDs de usuarios a asignar (opcional)
 
 # Esquema para asignar usuarios a contenido
@@ -22,6 +23,12 @@ class ContentUserAssignment(BaseModel):
     content_id: int
     user_ids: List[int]
 
+# Esquema para asignar muchos usuarios a muchos contenidos (cohorte x lista)
+class ContentBulkAssignment(BaseModel):
+    content_ids: List[int]
+    user_ids: List[int]
+    replace: bool = False  # Si es True, quita de esos contenidos a los usuarios que no estén en user_ids
+
 # Esquema para leer un contenido
 class ContentRead(BaseModel):
     id: int
@@ -29,6 +36,7 @@ class ContentRead(BaseModel):
     link: str
     title: str
     img: str
+    img_variants: Optional[Dict[str, Dict[str, str]]] = None
 
     class Config:
         from_attributes = True  # Permite convertir desde modelos de SQLAlchemy
@@ -40,6 +48,7 @@ class ContentWithUsers(BaseModel):
     link: str
     title: str
     img: str
+    img_variants: Optional[Dict[str, Dict[str, str]]] = None
     assigned_users: List[int]  # Lista de IDs de usuarios asignados
 
     class Config:
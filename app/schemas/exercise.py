@@ -51,3 +51,16 @@ class exerciseFullOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class exerciseHeaderOut(BaseModel):
+    id: int
+    title: str
+    type: str
+    level: str
+    valid: bool
+    instructions: str
+    content_text: Optional[str]
+    content_audio_url: Optional[str]
+
+    class Config:
+        from_attributes = True
@@ -30,6 +30,7 @@ class UserExerciseResponseRead(BaseModel):
     submitted_at: datetime
     score: int
     is_valid: bool
+    grading_status: str = "completed"
     answers: List[UserAnswerRead]
 
     class Config:
@@ -44,4 +45,12 @@ class AnswerFeedback(BaseModel):
     score_percentage: int
     feedback: str
     points_earned: int
-    total_points: int 
\ No newline at end of file
+    total_points: int 
+
+class GradingStatus(BaseModel):
+    response_id: int
+    grading_status: str
+    pending_jobs: int
+    failed_jobs: int
+    score: int
+    is_valid: bool
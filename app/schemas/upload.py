@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Literal, Optional
+
+# Esquema para pedir una URL firmada de subida directa al storage
+class UploadTicketRequest(BaseModel):
+    kind: Literal["image", "audio"]
+    filename: str
+    content_type: str
+    size: int = Field(gt=0)
+    sha256: str = Field(pattern=r"^[0-9a-f]{64}$")  # SHA-256 del archivo (define su nombre en el storage)
+
+class UploadTicket(BaseModel):
+    exists: bool  # El archivo ya estaba guardado: no hace falta subirlo
+    upload_url: Optional[str] = None
+    method: Optional[str] = None
+    headers: Dict[str, str] = {}
+    expires_in: Optional[int] = None
+    upload_token: str  # Se envía a /uploads/complete
+
+# Esquema para registrar el archivo subido en un contenido o ejercicio
+class UploadCompleteRequest(BaseModel):
+    upload_token: str
+    target: Literal["content", "exercise"]
+    target_id: int
@@ -17,6 +17,14 @@ class LoginRequest(BaseModel):
     email: str
     password: str
 
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+class TokenPair(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str
+
 # Esquemas para recupero de contraseña
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
@@ -0,0 +1,187 @@
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from app.core.config import settings
+from app.models.ai_evaluation_cache import AIEvaluationCache as AIEvaluationCacheEntry
+from app.models.question import Question
+from app.services.ia_generation_service import analyze_text_responses
+from app.utils.text import normalize_text
+import hashlib
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (question_id, question_version, answer_hash)
+CacheKey = Tuple[int, str, str]
+
+
+def question_version(question: Question) -> str:
+    """Huella de los campos que influyen en la evaluación de la IA."""
+    raw = f"{question.correct_answer or ''}\x1f{question.explanation or ''}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def evaluation_cache_key(question: Question, answer_text: str) -> CacheKey:
+    """Clave de caché para una respuesta libre a una pregunta."""
+    answer_hash = hashlib.sha256(normalize_text(answer_text).encode("utf-8")).hexdigest()
+    return (question.id, question_version(question), answer_hash)
+
+
+class AIEvaluationCacheStats:
+    def __init__(self):
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.model_calls = 0
+        self.model_seconds = 0.0
+
+    def as_dict(self) -> dict:
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        avg_model_seconds = self.model_seconds / self.model_calls if self.model_calls else 0.0
+        return {
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "model_calls": self.model_calls,
+            "avg_model_seconds": round(avg_model_seconds, 4),
+            # Estimación: cada acierto evita una llamada al modelo
+            "model_calls_saved": hits,
+            "estimated_seconds_saved": round(hits * avg_model_seconds, 2),
+        }
+
+
+class AIEvaluationCache:
+    """Caché de evaluaciones de IA en dos niveles: LRU en memoria y tabla en la base de datos."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, dict]" = OrderedDict()
+        self.stats = AIEvaluationCacheStats()
+
+    def _remember(self, key: CacheKey, result: dict):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, db: AsyncSession, keys: List[CacheKey]) -> Dict[CacheKey, dict]:
+        """Busca evaluaciones en memoria y, para las que falten, en la base de datos (una sola consulta)."""
+        found = {}
+        missing = []
+        for key in keys:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                found[key] = result
+                self.stats.memory_hits += 1
+            else:
+                missing.append(key)
+
+        if missing:
+            question_ids = {key[0] for key in missing}
+            answer_hashes = {key[2] for key in missing}
+            rows = await db.execute(
+                select(AIEvaluationCacheEntry).where(
+                    AIEvaluationCacheEntry.question_id.in_(question_ids),
+                    AIEvaluationCacheEntry.answer_hash.in_(answer_hashes)
+                )
+            )
+            wanted = set(missing)
+            for row in rows.scalars().all():
+                key = (row.question_id, row.question_version, row.answer_hash)
+                if key in wanted and key not in found:
+                    result = {
+                        "is_correct": row.is_correct,
+                        "score_percentage": row.score_percentage,
+                        "feedback": row.feedback
+                    }
+                    self._remember(key, result)
+                    found[key] = result
+                    self.stats.db_hits += 1
+
+        self.stats.misses += len([key for key in keys if key not in found])
+        return found
+
+    async def store_many(self, db: AsyncSession, results: Dict[CacheKey, dict]):
+        """Guarda evaluaciones en memoria y en la base de datos (en un savepoint)."""
+        if not results:
+            return
+        for key, result in results.items():
+            self._remember(key, result)
+        try:
+            async with db.begin_nested():
+                db.add_all([
+                    AIEvaluationCacheEntry(
+                        question_id=key[0],
+                        question_version=key[1],
+                        answer_hash=key[2],
+                        is_correct=result["is_correct"],
+                        score_percentage=result["score_percentage"],
+                        feedback=result["feedback"]
+                    )
+                    for key, result in results.items()
+                ])
+        except IntegrityError:
+            # Otra entrega guardó la misma evaluación en paralelo; la caché en memoria ya la tiene
+            logger.debug("AI evaluation already cached by a concurrent request")
+
+    async def invalidate_question(self, db: AsyncSession, question_id: int):
+        """Elimina todas las evaluaciones cacheadas de una pregunta."""
+        for key in [key for key in self._entries if key[0] == question_id]:
+            del self._entries[key]
+        await db.execute(delete(AIEvaluationCacheEntry).where(AIEvaluationCacheEntry.question_id == question_id))
+
+
+ai_evaluation_cache = AIEvaluationCache(settings.AI_CACHE_MAX_ENTRIES)
+
+
+async def evaluate_text_answers(
+    db: AsyncSession,
+    items: List[Tuple[Question, str]]
+) -> List[dict]:
+    """
+    Evalúa respuestas de texto libre reutilizando evaluaciones cacheadas.
+    Solo las respuestas no vistas antes se envían al modelo (en paralelo).
+
+    Args:
+        items: Lista de (pregunta, texto de la respuesta)
+
+    Returns:
+        List[dict]: Resultados de analyze_text_response en el mismo orden que `items`
+    """
+    keys = [evaluation_cache_key(question, answer_text) for question, answer_text in items]
+    cached = await ai_evaluation_cache.get_many(db, keys)
+
+    # Respuestas iguales dentro de la misma entrega se evalúan una sola vez
+    pending: Dict[CacheKey, Tuple[Question, str]] = {}
+    for key, (question, answer_text) in zip(keys, items):
+        if key not in cached and key not in pending:
+            pending[key] = (question, answer_text)
+
+    fresh = {}
+    if pending:
+        started = time.perf_counter()
+        results = await analyze_text_responses([
+            {
+                "question_text": question.question_text,
+                "correct_answer": question.correct_answer,
+                "user_answer": answer_text,
+                "explanation": question.explanation
+            }
+            for question, answer_text in pending.values()
+        ])
+        ai_evaluation_cache.stats.model_calls += len(pending)
+        ai_evaluation_cache.stats.model_seconds += time.perf_counter() - started
+        fresh = dict(zip(pending.keys(), results))
+        # No cachear las evaluaciones de respaldo producidas por errores del modelo
+        await ai_evaluation_cache.store_many(
+            db, {key: result for key, result in fresh.items() if not result.get("fallback")}
+        )
+
+    return [cached.get(key) or fresh[key] for key in keys]
@@ -1,10 +1,14 @@
-from app.schemas.content import ContentCreate, ContentRead, ContentUserAssignment, ContentWithUsers
-from app.models.content import Content
+from app.schemas.content import ContentCreate, ContentRead, ContentUserAssignment, ContentBulkAssignment, ContentWithUsers
+from app.models.content import Content, content_user_assignment
 from app.models.user import User
 from app.core.database import get_db
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, text
+from sqlalchemy import delete, func, insert, or_, select, text, tuple_
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import random
 import uuid
 
 async def get_content(db: AsyncSession):
@@ -16,20 +20,53 @@ async def check_link_exists(db: AsyncSession, link: str) -> bool:
     result = await db.execute(select(Content).where(Content.link == link))
     return result.scalar_one_or_none() is not None
 
-async def generate_unique_link(db: AsyncSession, base_link: str) -> str:
-    """Genera un link único basado en el link proporcionado"""
-    if not await check_link_exists(db, base_link):
+async def generate_unique_link(db: AsyncSession, base_link: str, spread: int = 1) -> str:
+    """
+    Genera un link único basado en el link proporcionado.
+    Trae en una sola consulta los links existentes con ese prefijo (usa el índice único
+    de Content.link) y elige el primer sufijo libre. Con spread > 1 elige al azar entre
+    los primeros `spread` sufijos libres, para que los reintentos de requests que compiten
+    por el mismo link no vuelvan a chocar todos en el mismo sufijo.
+    """
+    # Escapar los comodines de LIKE ("/" como carácter de escape, igual en todos los dialectos)
+    escaped = base_link.replace("/", "//").replace("%", "/%").replace("_", "/_")
+    result = await db.execute(
+        select(Content.link).where(
+            or_(Content.link == base_link, Content.link.like(f"{escaped}/_%", escape="/"))
+        )
+    )
+    existing_links = set(result.scalars().all())
+    if base_link not in existing_links:
         return base_link
-    
-    # Si el link base ya existe, agregar un sufijo único
+
+    # Si el link base ya existe, agregar un sufijo numérico libre
+    prefix = f"{base_link}_"
+    used_suffixes = {
+        int(link[len(prefix):]) for link in existing_links
+        if link.startswith(prefix) and link[len(prefix):].isdigit()
+    }
+    free_suffixes = []
     counter = 1
-    while True:
-        unique_link = f"{base_link}_{counter}"
-        if not await check_link_exists(db, unique_link):
-            return unique_link
+    while len(free_suffixes) < spread:
+        if counter not in used_suffixes:
+            free_suffixes.append(counter)
         counter += 1
+    return f"{prefix}{random.choice(free_suffixes)}"
+
+async def _insert_content(db: AsyncSession, content: ContentCreate) -> Content:
+    """Inserta el contenido (sin asignaciones). Propaga IntegrityError si el link ya existe."""
+    content_data = content.model_dump(exclude={'user_ids'})
+    new_content = Content(**content_data)
+    db.add(new_content)
+    await db.commit()
+    await db.refresh(new_content)
+    return new_content
 
 async def create_content(db: AsyncSession, content: ContentCreate):
+    # Confirmar lo que la sesión ya tenga pendiente (p. ej. el registro en stored_files de la
+    # imagen subida) para que el rollback de un link repetido no lo descarte
+    await db.commit()
+
     # Verificar si el link ya existe
     if await check_link_exists(db, content.link):
         raise HTTPException(
@@ -37,23 +74,95 @@ async def create_content(db: AsyncSession, content: ContentCreate):
             detail=f"Ya existe un contenido con el link '{content.link}'. Por favor, usa un link diferente."
         )
     
-    user_ids = content.user_ids
-    content_data = content.model_dump(exclude={'user_ids'})
-    new_content = Content(**content_data)
-    db.add(new_content)
+    try:
+        new_content = await _insert_content(db, content)
+    except IntegrityError:
+        # Otro request creó el mismo link entre la verificación y el insert
+        await db.rollback()
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Ya existe un contenido con el link '{content.link}'. Por favor, usa un link diferente."
+        )
+
+    # Asignar usuarios en la tabla intermedia con un único INSERT masivo
+    if content.user_ids:
+        await sync_content_assignments(db, [new_content.id], content.user_ids, replace=False)
+        await db.commit()
+    return new_content
+
+async def create_content_with_unique_link(db: AsyncSession, content: ContentCreate, max_attempts: int = 10):
+    """
+    Crea el contenido con un link único derivado de content.link.
+    En lugar de verificar y después insertar, se intenta el insert y, si otro request
+    tomó el mismo link (violación del índice único), se recalcula y se reintenta.
+    """
+    # Confirmar lo pendiente (p. ej. el registro en stored_files de la imagen subida) antes de
+    # los reintentos: cada rollback descarta la transacción completa, y empezar una nueva en
+    # cada intento es lo que permite ver los links que insertaron los requests que compiten
     await db.commit()
-    await db.refresh(new_content)
 
-    # Asignar usuarios manualmente en la tabla intermedia
-    if user_ids:
-        for user_id in user_ids:
-            await db.execute(
-                text("INSERT INTO content_user_assignment (content_id, user_id) VALUES (:content_id, :user_id)"),
-                {"content_id": new_content.id, "user_id": user_id}
-            )
+    for attempt in range(max_attempts):
+        # Tras cada choque se elige entre más sufijos libres (1, 2, 4, ...) para repartir a los que compiten
+        unique_link = await generate_unique_link(db, content.link, spread=min(2 ** attempt, 64))
+        try:
+            new_content = await _insert_content(db, content.model_copy(update={"link": unique_link}))
+            break
+        except IntegrityError:
+            await db.rollback()
+            # Pequeña espera aleatoria para desincronizar a los requests que compiten
+            await asyncio.sleep(random.uniform(0, 0.01 * (attempt + 1)))
+    else:
+        raise HTTPException(
+            status_code=409,
+            detail=f"No se pudo generar un link único para '{content.link}'. Intenta nuevamente."
+        )
+
+    if content.user_ids:
+        await sync_content_assignments(db, [new_content.id], content.user_ids, replace=False)
         await db.commit()
     return new_content
 
+async def sync_content_assignments(
+    db: AsyncSession,
+    content_ids: List[int],
+    user_ids: List[int],
+    replace: bool = True
+) -> Dict[str, int]:
+    """
+    Asigna todos los usuarios a todos los contenidos indicados (cohorte x lista).
+    Calcula la diferencia contra las asignaciones existentes y ejecuta como máximo
+    un INSERT masivo y un DELETE. Con replace=True se quitan de esos contenidos
+    los usuarios que no estén en user_ids. No hace commit.
+    """
+    content_ids = set(content_ids)
+    user_ids = set(user_ids)
+    if not content_ids:
+        return {"inserted": 0, "removed": 0}
+
+    existing_query = select(content_user_assignment.c.content_id, content_user_assignment.c.user_id).where(
+        content_user_assignment.c.content_id.in_(content_ids)
+    )
+    if not replace:
+        existing_query = existing_query.where(content_user_assignment.c.user_id.in_(user_ids))
+    existing = set((await db.execute(existing_query)).all())
+
+    wanted = {(content_id, user_id) for content_id in content_ids for user_id in user_ids}
+    to_insert = wanted - existing
+    to_remove = existing - wanted if replace else set()
+
+    if to_remove:
+        await db.execute(
+            delete(content_user_assignment).where(
+                tuple_(content_user_assignment.c.content_id, content_user_assignment.c.user_id).in_(to_remove)
+            )
+        )
+    if to_insert:
+        await db.execute(
+            insert(content_user_assignment),
+            [{"content_id": content_id, "user_id": user_id} for content_id, user_id in sorted(to_insert)]
+        )
+    return {"inserted": len(to_insert), "removed": len(to_remove)}
+
 async def assign_users_to_content(db: AsyncSession, assignment: ContentUserAssignment):
     # Verificar que el contenido existe
     content_result = await db.execute(select(Content).where(Content.id == assignment.content_id))
@@ -61,23 +170,28 @@ async def assign_users_to_content(db: AsyncSession, assignment: ContentUserAssig
     if not content:
         raise ValueError(f"Content with id {assignment.content_id} not found")
     # Verificar que los usuarios existen
-    users_result = await db.execute(select(User).where(User.id.in_(assignment.user_ids)))
-    users = users_result.scalars().all()
-    if len(users) != len(assignment.user_ids):
-        raise ValueError("Some users not found")
-    # Eliminar asignaciones previas
-    await db.execute(
-        text("DELETE FROM content_user_assignment WHERE content_id = :content_id"),
-        {"content_id": assignment.content_id}
-    )
-    # Insertar nuevas asignaciones
-    for user_id in assignment.user_ids:
-        await db.execute(
-            text("INSERT INTO content_user_assignment (content_id, user_id) VALUES (:content_id, :user_id)"),
-            {"content_id": assignment.content_id, "user_id": user_id}
-        )
+    await _check_users_exist(db, assignment.user_ids)
+    # Reemplazar las asignaciones previas aplicando solo las diferencias
+    counts = await sync_content_assignments(db, [assignment.content_id], assignment.user_ids, replace=True)
     await db.commit()
-    return content
+    return content, counts
+
+async def bulk_assign_content(db: AsyncSession, assignment: ContentBulkAssignment) -> Dict[str, int]:
+    """Asigna muchos usuarios a muchos contenidos en una sola operación."""
+    content_ids = set(assignment.content_ids)
+    found = await db.scalar(select(func.count(Content.id)).where(Content.id.in_(content_ids)))
+    if found != len(content_ids):
+        raise ValueError("Some content not found")
+    await _check_users_exist(db, assignment.user_ids)
+    counts = await sync_content_assignments(db, assignment.content_ids, assignment.user_ids, assignment.replace)
+    await db.commit()
+    return counts
+
+async def _check_users_exist(db: AsyncSession, user_ids: List[int]):
+    user_ids = set(user_ids)
+    found = await db.scalar(select(func.count(User.id)).where(User.id.in_(user_ids)))
+    if found != len(user_ids):
+        raise ValueError("Some users not found")
 
 async def get_content_with_users(db: AsyncSession, content_id: int):
     result = await db.execute(select(Content).where(Content.id == content_id))
@@ -96,28 +210,66 @@ async def get_content_with_users(db: AsyncSession, content_id: int):
         link=content.link,
         title=content.title,
         img=content.img,
+        img_variants=content.img_variants,
         assigned_users=user_ids
     )
 
-async def get_all_content_with_users(db: AsyncSession):
-    result = await db.execute(select(Content))
-    contents = result.scalars().all()
-    content_with_users = []
-    for content in contents:
-        user_ids_result = await db.execute(
-            text("SELECT user_id FROM content_user_assignment WHERE content_id = :content_id"),
-            {"content_id": content.id}
-        )
-        user_ids = [row[0] for row in user_ids_result.fetchall()]
-        content_with_users.append(ContentWithUsers(
+async def get_all_content_with_users(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    assigned_to: Optional[int] = None
+) -> Tuple[List[ContentWithUsers], Optional[int]]:
+    """
+    Devuelve los contenidos con sus usuarios asignados en una sola consulta
+    (LEFT JOIN contra la tabla intermedia), paginados por cursor sobre Content.id.
+    Con assigned_to solo se devuelven los contenidos asignados a ese usuario.
+    Retorna la página y el cursor de la siguiente (o None si no hay más).
+    """
+    page = select(Content.id).order_by(Content.id)
+    if cursor is not None:
+        page = page.where(Content.id > cursor)
+    if assigned_to is not None:
+        page = page.where(Content.id.in_(
+            select(content_user_assignment.c.content_id)
+            .where(content_user_assignment.c.user_id == assigned_to)
+        ))
+    if limit is not None:
+        page = page.limit(limit + 1)
+    page = page.subquery()
+
+    result = await db.execute(
+        select(Content, content_user_assignment.c.user_id)
+        .join(page, page.c.id == Content.id)
+        .outerjoin(content_user_assignment, content_user_assignment.c.content_id == Content.id)
+        .order_by(Content.id, content_user_assignment.c.user_id)
+    )
+
+    # Agrupar las filas (contenido, usuario) por contenido conservando el orden
+    grouped: Dict[int, Tuple[Content, List[int]]] = {}
+    for content, user_id in result.all():
+        _, user_ids = grouped.setdefault(content.id, (content, []))
+        if user_id is not None:
+            user_ids.append(user_id)
+
+    content_with_users = [
+        ContentWithUsers(
             id=content.id,
             thematic=content.thematic,
             link=content.link,
             title=content.title,
             img=content.img,
+            img_variants=content.img_variants,
             assigned_users=user_ids
-        ))
-    return content_with_users
+        )
+        for content, user_ids in grouped.values()
+    ]
+
+    next_cursor = None
+    if limit is not None and len(content_with_users) > limit:
+        content_with_users = content_with_users[:limit]
+        next_cursor = content_with_users[-1].id
+    return content_with_users, next_cursor
 
 async def get_content_by_user_id(db: AsyncSession, user_id: int):
     # Obtener los contenidos asignados al usuario usando la tabla intermedia
@@ -0,0 +1,109 @@
+"""
+Subidas directas al storage: la API solo firma la subida y registra el resultado,
+los bytes van del cliente al bucket (o al reemplazo local /uploads/direct).
+"""
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.content import Content
+from app.models.exercise import Exercise
+from app.models.stored_file import StoredFile
+from app.schemas.upload import UploadTicketRequest, UploadCompleteRequest
+from app.services.exercise_cache import exercise_tree_cache
+from app.services.file_service import file_service
+from app.utils.security import decode_token
+import asyncio
+
+UPLOAD_TOKEN_TYPE = "upload"
+
+# Tipo de archivo que acepta cada destino
+TARGET_KINDS = {"content": "image", "exercise": "audio"}
+
+
+def _create_upload_token(claims: dict) -> str:
+    # Vale el doble que la URL firmada, para poder completar una subida que terminó justo a tiempo
+    expires = datetime.utcnow() + timedelta(seconds=settings.DIRECT_UPLOAD_EXPIRE_SECONDS * 2)
+    return jwt.encode({**claims, "type": UPLOAD_TOKEN_TYPE, "exp": expires}, settings.secret_key, algorithm=settings.ALGORITHM)
+
+
+async def create_upload_ticket(db: AsyncSession, request: UploadTicketRequest) -> dict:
+    allowed_types = file_service.allowed_image_types if request.kind == "image" else file_service.allowed_audio_types
+    if request.content_type not in allowed_types:
+        raise HTTPException(status_code=400, detail=f"Tipo no soportado. Tipos permitidos: {', '.join(allowed_types)}")
+    if request.size > file_service.max_file_size:
+        raise HTTPException(status_code=400, detail="Archivo demasiado grande. Máximo 50MB")
+
+    claims = {
+        "kind": request.kind,
+        "sha256": request.sha256,
+        "size": request.size,
+        "content_type": request.content_type
+    }
+
+    # Si el mismo contenido ya está guardado no hace falta subirlo
+    stored = await db.get(StoredFile, request.sha256)
+    if stored:
+        return {
+            "exists": True,
+            "upload_token": _create_upload_token({**claims, "backend": stored.backend, "key": stored.path})
+        }
+
+    backend = file_service.direct_upload_backend()
+    folder = "images" if request.kind == "image" else "audio"
+    file_extension = request.filename.split('.')[-1].lower()
+    key = backend.object_key(folder, f"{request.sha256}.{file_extension}")
+    try:
+        upload_url = await asyncio.to_thread(
+            backend.presign, key, "PUT", settings.DIRECT_UPLOAD_EXPIRE_SECONDS, request.content_type
+        )
+    except Exception as e:
+        print(f"❌ Error firmando la subida: {e}")
+        raise HTTPException(status_code=503, detail="No se pudo generar la URL de subida")
+
+    return {
+        "exists": False,
+        "upload_url": upload_url,
+        "method": "PUT",
+        "headers": {"Content-Type": request.content_type},
+        "expires_in": settings.DIRECT_UPLOAD_EXPIRE_SECONDS,
+        "upload_token": _create_upload_token({**claims, "backend": backend.name, "key": key})
+    }
+
+
+async def complete_upload(db: AsyncSession, request: UploadCompleteRequest) -> dict:
+    """Valida el archivo subido y lo asigna a Content.img o Exercise.content_audio_url."""
+    claims = decode_token(request.upload_token, UPLOAD_TOKEN_TYPE)
+    if claims is None:
+        raise HTTPException(status_code=400, detail="Token de subida inválido o expirado")
+    if TARGET_KINDS[request.target] != claims["kind"]:
+        raise HTTPException(status_code=400, detail=f"Un {request.target} requiere un archivo de tipo {TARGET_KINDS[request.target]}")
+
+    model = Content if request.target == "content" else Exercise
+    target = await db.get(model, request.target_id)
+    if not target:
+        raise HTTPException(status_code=404, detail=f"{request.target} not found")
+
+    url = await file_service.register_direct_upload(
+        db, claims["backend"], claims["key"], claims["kind"], claims["sha256"], claims["size"], claims["content_type"]
+    )
+
+    if request.target == "content":
+        old_url = target.img
+        target.img = url
+        # Los derivados se generan solo cuando la imagen pasa por la API
+        target.img_variants = None
+    else:
+        old_url = target.content_audio_url
+        target.content_audio_url = url
+    await db.flush()
+
+    # Liberar el archivo anterior si este era su último uso
+    if old_url and old_url != url:
+        await file_service.delete_file(old_url, db)
+    await db.commit()
+
+    if request.target == "exercise":
+        await exercise_tree_cache.invalidate(request.target_id)
+    return {"url": url, "target": request.target, "target_id": request.target_id}
@@ -1,4 +1,3 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from app.core.config import settings
 from pathlib import Path
 import secrets
@@ -7,24 +6,39 @@ from datetime import datetime, timedelta
 
 class EmailService:
     def __init__(self):
-        # Solo inicializar si las credenciales de email están configuradas
-        if settings.MAIL_USERNAME and settings.MAIL_PASSWORD and settings.MAIL_FROM:
-            self.conf = ConnectionConfig(
-                MAIL_USERNAME=settings.MAIL_USERNAME,
-                MAIL_PASSWORD=settings.MAIL_PASSWORD,
-                MAIL_FROM=settings.MAIL_FROM,
-                MAIL_PORT=settings.MAIL_PORT,
-                MAIL_SERVER=settings.MAIL_SERVER,
-                MAIL_STARTTLS=True,
-                MAIL_SSL_TLS=False,
-                USE_CREDENTIALS=True,
-                TEMPLATE_FOLDER=None  # No usar templates por ahora
-            )
-            self.fastmail = FastMail(self.conf)
-            self.email_configured = True
-        else:
-            self.email_configured = False
+        # El cliente de fastapi_mail se crea en el primer envío (o en warmup)
+        self.email_configured = bool(settings.MAIL_USERNAME and settings.MAIL_PASSWORD and settings.MAIL_FROM)
+        self._fastmail = None
+
+    @property
+    def initialized(self) -> bool:
+        return self._fastmail is not None
+
+    @property
+    def fastmail(self):
+        if self._fastmail is None:
+            self._fastmail = self._create_fastmail()
+        return self._fastmail
+
+    def warmup(self):
+        if not self.email_configured:
             print("⚠️  Email no configurado. Las funciones de recupero de contraseña no funcionarán.")
+            return
+        self.fastmail
+
+    def _create_fastmail(self):
+        from fastapi_mail import FastMail, ConnectionConfig
+        return FastMail(ConnectionConfig(
+            MAIL_USERNAME=settings.MAIL_USERNAME,
+            MAIL_PASSWORD=settings.MAIL_PASSWORD,
+            MAIL_FROM=settings.MAIL_FROM,
+            MAIL_PORT=settings.MAIL_PORT,
+            MAIL_SERVER=settings.MAIL_SERVER,
+            MAIL_STARTTLS=True,
+            MAIL_SSL_TLS=False,
+            USE_CREDENTIALS=True,
+            TEMPLATE_FOLDER=None  # No usar templates por ahora
+        ))
     
     def generate_reset_token(self) -> str:
         """Genera un token seguro para el recupero de contraseña"""
@@ -79,6 +93,7 @@ class EmailService:
         </html>
         """
         
+        from fastapi_mail import MessageSchema
         message = MessageSchema(
             subject="🔐 Código de Recupero de Contraseña",
             recipients=[email],
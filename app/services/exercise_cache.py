@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.core.config import settings
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryCacheBackend:
+    """Backend LRU en memoria con expiración por TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+        # Los contadores de versión no se desalojan: si se perdieran podría volver a servirse una versión vieja
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[str]:
+        if key in self._counters:
+            return str(self._counters[key])
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl_seconds), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+
+class RedisCacheBackend:
+    """
+    Backend sobre un cliente compatible con redis.asyncio (get/set/incr).
+    Cualquier objeto con esa interfaz sirve, por ejemplo un stub local.
+    """
+
+    def __init__(self, client, ttl_seconds: int):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+
+    @classmethod
+    def from_url(cls, url: str, ttl_seconds: int) -> "RedisCacheBackend":
+        import redis.asyncio as redis  # Dependencia opcional
+        return cls(redis.from_url(url, decode_responses=True), ttl_seconds)
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        await self.client.set(key, value, ex=ttl or self.ttl_seconds)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class ExerciseTreeCache:
+    """
+    Caché read-through del payload serializado (exerciseFullOut) de cada ejercicio.
+    Cada ejercicio tiene un contador de versión que se incrementa en las escrituras;
+    las entradas se guardan bajo la versión vigente, así que invalidar es O(1).
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.serialization_seconds = 0.0
+
+    @staticmethod
+    def _version_key(exercise_id: int) -> str:
+        return f"exercise:{exercise_id}:version"
+
+    @staticmethod
+    def _payload_key(exercise_id: int, version: int) -> str:
+        return f"exercise:{exercise_id}:v{version}"
+
+    async def get(self, exercise_id: int) -> Tuple[Optional[dict], int]:
+        """Devuelve (payload o None, versión vigente). La versión se usa luego en set()."""
+        version = int(await self.backend.get(self._version_key(exercise_id)) or 0)
+        cached = await self.backend.get(self._payload_key(exercise_id, version))
+        if cached is None:
+            self.misses += 1
+            return None, version
+        self.hits += 1
+        return json.loads(cached), version
+
+    async def set(self, exercise_id: int, version: int, payload: dict, serialization_seconds: float = 0.0):
+        self.serialization_seconds += serialization_seconds
+        await self.backend.set(self._payload_key(exercise_id, version), json.dumps(payload))
+
+    async def invalidate(self, exercise_id: int):
+        self.invalidations += 1
+        try:
+            await self.backend.incr(self._version_key(exercise_id))
+        except Exception as e:
+            logger.error(f"Error invalidating exercise cache for {exercise_id}: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        avg_serialization = self.serialization_seconds / self.misses if self.misses else 0.0
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "avg_load_and_serialization_ms": round(avg_serialization * 1000, 3),
+            # Estimación: cada acierto evita una carga + serialización promedio
+            "estimated_seconds_saved": round(self.hits * avg_serialization, 3)
+        }
+
+
+def _build_backend():
+    if settings.EXERCISE_CACHE_BACKEND == "redis" and settings.EXERCISE_CACHE_REDIS_URL:
+        return RedisCacheBackend.from_url(settings.EXERCISE_CACHE_REDIS_URL, settings.EXERCISE_CACHE_TTL_SECONDS)
+    return InMemoryCacheBackend(settings.EXERCISE_CACHE_MAX_ENTRIES, settings.EXERCISE_CACHE_TTL_SECONDS)
+
+
+exercise_tree_cache = ExerciseTreeCache(_build_backend())
@@ -1,68 +1,33 @@
+from sqlalchemy import func, insert, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from app.models.user_exercise_response import UserExerciseResponse
 from app.models.user_answer import UserAnswer
 from app.models.question import Question
-from app.models.option import Option
 from app.models.user import User
 from app.schemas.exercise_response import UserExerciseResponseCreate
-from app.services.ia_generation_service import analyze_text_response
+from app.models.grading_job import GradingJob
+from app.services.ai_evaluation_cache_service import evaluate_text_answers
+from app.services.grading_queue import grading_queue
 from typing import List
-import re
+from bisect import bisect_right
 import logging
 
 # Configurar el logger
 logger = logging.getLogger(__name__)
 
-def normalize_text(text: str) -> str:
-    """Normaliza el texto para comparación:
-    - Convierte a minúsculas
-    - Elimina espacios extra
-    - Elimina puntuación
-    """
-    if not text:
-        return ""
-    # Convertir a minúsculas y eliminar espacios extra
-    text = text.lower().strip()
-    # Eliminar puntuación excepto en números
-    text = re.sub(r'[^\w\s]', '', text)
-    # Reemplazar múltiples espacios con uno solo
-    text = re.sub(r'\s+', ' ', text)
-    return text
-
-def check_answer(user_answer: str, correct_answer: str) -> bool:
-    """Verifica si la respuesta del usuario es correcta."""
-    logger.info("\n=== Checking Answer ===")
-    logger.info(f"Raw user answer: '{user_answer}'")
-    logger.info(f"Raw correct answer: '{correct_answer}'")
-    
-    if not user_answer or not correct_answer:
-        logger.info("Empty answer detected")
-        return False
-    
-    # Convertir a minúsculas y eliminar espacios
-    user_answer = user_answer.lower().strip()
-    correct_answers = [ans.lower().strip() for ans in correct_answer.split('|')]
-    
-    logger.info(f"Normalized user answer: '{user_answer}'")
-    logger.info(f"Normalized correct answers: {correct_answers}")
-    
-    # Verificar cada respuesta correcta
-    for correct in correct_answers:
-        logger.info(f"Comparing '{user_answer}' with '{correct}'")
-        if user_answer == correct:
-            logger.info("Match found!")
-            return True
-    
-    logger.info("No matches found")
-    return False
-
 async def create_exercise_response(
     db: AsyncSession,
     user_id: int,
-    response_data: UserExerciseResponseCreate
+    response_data: UserExerciseResponseCreate,
+    defer_ai_grading: bool = False
 ) -> UserExerciseResponse:
+    """
+    Corrige y guarda una entrega.
+    Con defer_ai_grading=True las respuestas objetivas se corrigen en el momento y las
+    de texto libre se encolan en la cola de corrección; la entrega queda en estado 'pending'.
+    """
     try:
         # Crear la respuesta del ejercicio
         exercise_response = UserExerciseResponse(
@@ -74,42 +39,43 @@ async def create_exercise_response(
         db.add(exercise_response)
         await db.flush()
 
-        total_score = 0
-        all_correct = True
-
-        # Procesar cada respuesta
-        for answer_data in response_data.answers:
-            # Obtener la pregunta con sus opciones
+        # Cargar todas las preguntas referenciadas (y sus opciones) en una sola consulta
+        question_ids = {answer_data.question_id for answer_data in response_data.answers}
+        questions = {}
+        if question_ids:
             result = await db.execute(
                 select(Question)
                 .options(selectinload(Question.options))
-                .where(Question.id == answer_data.question_id)
+                .where(Question.id.in_(question_ids))
             )
-            question = result.scalar_one_or_none()
-            
+            questions = {question.id: question for question in result.scalars().all()}
+
+        answer_rows = []
+        pending_ai = []
+
+        # Procesar cada respuesta usando los mapas en memoria
+        for answer_data in response_data.answers:
+            question = questions.get(answer_data.question_id)
+
             if not question:
                 logger.error(f"Question not found for ID: {answer_data.question_id}")
                 continue
 
-            logger.info(f"Processing question {question.id}: {question.question_text}")
-            logger.info(f"Correct answer from DB: {question.correct_answer}")
+            logger.debug(f"Processing question {question.id}: {question.question_text}")
 
             is_correct = False
             points_earned = 0
 
             # Si se proporcionó una opción, verificar si es correcta
             if answer_data.option_id is not None:
-                result = await db.execute(
-                    select(Option).where(
-                        Option.id == answer_data.option_id,
-                        Option.question_id == answer_data.question_id
-                    )
+                option = next(
+                    (opt for opt in question.options if opt.id == answer_data.option_id),
+                    None
                 )
-                option = result.scalar_one_or_none()
                 if option:
-                    is_correct = check_answer(option.option_text, question.correct_answer)
+                    is_correct = question.answer_key.matches(option.option_text)
                     points_earned = question.points if is_correct else 0
-                    logger.info(f"Option selected: {option.option_text}, is_correct: {is_correct}")
+                    logger.debug(f"Option selected: {option.option_text}, is_correct: {is_correct}")
                 else:
                     logger.error(f"Option {answer_data.option_id} not found for question {answer_data.question_id}")
                     continue
@@ -117,45 +83,79 @@ async def create_exercise_response(
             elif answer_data.answer_text:
                 # Si la pregunta no tiene opciones, usar análisis de IA
                 if not question.options:
-                    logger.info("Question has no options, using AI analysis")
-                    ai_analysis = await analyze_text_response(
-                        question_text=question.question_text,
-                        correct_answer=question.correct_answer,
-                        user_answer=answer_data.answer_text,
-                        explanation=question.explanation
-                    )
-                    is_correct = ai_analysis["is_correct"]
-                    # Calcular puntos basados en el porcentaje de acierto
-                    points_earned = int((ai_analysis["score_percentage"] / 100) * question.points)
-                    logger.info(f"AI analysis result: {ai_analysis}")
+                    # Se evalúa con IA más adelante, junto con el resto de respuestas libres
+                    pending_ai.append((len(answer_rows), question, answer_data.answer_text))
                 else:
                     # Si tiene opciones pero el usuario respondió texto, usar comparación básica
-                    is_correct = check_answer(answer_data.answer_text, question.correct_answer)
+                    is_correct = question.answer_key.matches(answer_data.answer_text)
                     points_earned = question.points if is_correct else 0
-                    logger.info(f"Text answer with options available: {answer_data.answer_text}, is_correct: {is_correct}")
-            
-            logger.info(f"Answer is {'correct' if is_correct else 'incorrect'}")
-            
-            if not is_correct:
-                all_correct = False
+                    logger.debug(f"Text answer with options available: {answer_data.answer_text}, is_correct: {is_correct}")
+
+            answer_rows.append({
+                "exercise_response_id": exercise_response.id,
+                "question_id": answer_data.question_id,
+                "option_id": answer_data.option_id,
+                "answer_text": answer_data.answer_text,
+                "is_correct": is_correct,
+                "points_earned": points_earned,
+                "score_percentage": 100 if is_correct else 0,
+                "feedback": None
+            })
 
-            # Crear la respuesta del usuario
-            user_answer = UserAnswer(
-                exercise_response_id=exercise_response.id,
-                question_id=answer_data.question_id,
-                option_id=answer_data.option_id,
-                answer_text=answer_data.answer_text,
-                is_correct=is_correct,
-                points_earned=points_earned
+        deferred_answers = []
+        if pending_ai and defer_ai_grading:
+            # Se guardan sin corregir y se crean los trabajos para la cola de corrección
+            deferred_indexes = {row_index for row_index, _, _ in pending_ai}
+            deferred_answers = [
+                UserAnswer(**{**answer_rows[row_index], "score_percentage": None})
+                for row_index in sorted(deferred_indexes)
+            ]
+            answer_rows = [row for index, row in enumerate(answer_rows) if index not in deferred_indexes]
+            db.add_all(deferred_answers)
+            await db.flush()
+        elif pending_ai:
+            # Evaluar todas las respuestas de texto libre en paralelo
+            logger.info(f"Analyzing {len(pending_ai)} free-text answers with AI")
+            ai_results = await evaluate_text_answers(
+                db, [(question, answer_text) for _, question, answer_text in pending_ai]
             )
-            db.add(user_answer)
-            total_score += points_earned
+            for (row_index, question, _), ai_analysis in zip(pending_ai, ai_results):
+                row = answer_rows[row_index]
+                row["is_correct"] = ai_analysis["is_correct"]
+                # Calcular puntos basados en el porcentaje de acierto
+                row["points_earned"] = int((ai_analysis["score_percentage"] / 100) * question.points)
+                row["score_percentage"] = ai_analysis["score_percentage"]
+                row["feedback"] = ai_analysis["feedback"]
+                logger.info(f"AI analysis result for question {question.id}: {ai_analysis}")
+
+        total_score = sum(row["points_earned"] for row in answer_rows)
+        all_correct = all(row["is_correct"] for row in answer_rows)
+
+        # Insertar todas las respuestas del usuario en un único INSERT masivo
+        if answer_rows:
+            await db.execute(insert(UserAnswer), answer_rows)
+
+        grading_jobs = [
+            GradingJob(exercise_response_id=exercise_response.id, user_answer_id=answer.id)
+            for answer in deferred_answers
+        ]
+        db.add_all(grading_jobs)
 
         # Actualizar la puntuación total y validez
         exercise_response.score = total_score
-        exercise_response.is_valid = all_correct
+        exercise_response.is_valid = all_correct and not grading_jobs
+        exercise_response.grading_status = "pending" if grading_jobs else "completed"
+
+        # Acumular el puntaje en el total del usuario dentro de la misma transacción
+        if total_score:
+            await db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(points=func.coalesce(User.points, 0) + total_score)
+            )
 
         await db.commit()
+        grading_queue.enqueue([job.id for job in grading_jobs])
         
         # Recargar la respuesta con sus relaciones
         result = await db.execute(
@@ -192,6 +192,26 @@ async def get_exercise_response(
     )
     return result.scalar_one_or_none()
 
+# Rangos de puntos para cada nivel
+CONST_LEVELS_RANGES = {
+    'A1': (0, 300),
+    'A2': (301, 600),
+    'B1': (601, 900),
+    'B2': (901, 1200),
+    'C1': (1201, 1500),
+    'C2': (1501, float('inf'))
+}
+
+# Límites inferiores ordenados para buscar el nivel con bisect
+_LEVELS_BY_MIN_POINTS = sorted(CONST_LEVELS_RANGES.items(), key=lambda item: item[1][0])
+_LEVEL_MIN_POINTS = [bounds[0] for _, bounds in _LEVELS_BY_MIN_POINTS]
+_LEVEL_NAMES = [level for level, _ in _LEVELS_BY_MIN_POINTS]
+
+def level_for_points(points: int) -> str:
+    """Devuelve el nivel CEFR correspondiente a un total de puntos."""
+    index = bisect_right(_LEVEL_MIN_POINTS, points) - 1
+    return _LEVEL_NAMES[max(index, 0)]
+
 async def update_user_level(
     db: AsyncSession,
     user_id: int
@@ -205,47 +225,34 @@ async def update_user_level(
     if not user:
         return None
         
-    # Obtener la última respuesta del usuario
-    user_points_query = await db.execute(
-        select(UserExerciseResponse)
-        .where(UserExerciseResponse.user_id == user_id)
-        .order_by(UserExerciseResponse.submitted_at.desc())
-    )
-    total_points = user_points_query.scalars().all()
-    total_points = sum(response.score for response in total_points)
+    # User.points se incrementa en cada entrega, no hace falta recorrer el historial
+    points = user.points
     
-    
-    if not total_points:
+    if not points:
         return user
         
-    points = total_points
-    
-    if points <= 300:
-        user.englishLevel = 'A1'
-    elif points <= 600:
-        user.englishLevel = 'A2'
-    elif points <= 900:
-        user.englishLevel = 'B1'
-    elif points <= 1200:
-        user.englishLevel = 'B2'
-    elif points <= 1500:
-        user.englishLevel = 'C1'
-    else:
-        user.englishLevel = 'C2'
+    user.englishLevel = level_for_points(points)
             
     await db.commit()
     
     return user
 
-# Rangos de puntos para cada nivel
-CONST_LEVELS_RANGES = {
-    'A1': (0, 300),
-    'A2': (301, 600),
-    'B1': (601, 900),
-    'B2': (901, 1200),
-    'C1': (1201, 1500),
-    'C2': (1501, float('inf'))
-}
+def build_answer_feedback(user_answer: UserAnswer, question: Question) -> dict:
+    """Arma el feedback de una respuesta a partir de lo guardado al momento de la entrega."""
+    score_percentage = user_answer.score_percentage
+    if score_percentage is None:
+        score_percentage = 100 if user_answer.is_correct else 0
+    return {
+        "question_id": question.id,
+        "question_text": question.question_text,
+        "user_answer": user_answer.answer_text or "Opción seleccionada",
+        "correct_answer": question.correct_answer,
+        "is_correct": user_answer.is_correct,
+        "score_percentage": score_percentage,
+        "feedback": user_answer.feedback or "Respuesta evaluada automáticamente",
+        "points_earned": user_answer.points_earned,
+        "total_points": question.points
+    }
 
 async def get_answer_feedback(
     db: AsyncSession,
@@ -254,68 +261,41 @@ async def get_answer_feedback(
 ) -> dict:
     """
     Obtiene el feedback detallado de una respuesta específica.
-    Si la pregunta no tiene opciones, re-analiza la respuesta con IA.
+    El puntaje y el feedback de la IA se guardan al momento de la entrega,
+    por lo que no se vuelve a consultar al modelo.
     """
     try:
-        # Obtener la respuesta del usuario
         result = await db.execute(
-            select(UserAnswer)
+            select(UserAnswer, Question)
+            .join(Question, Question.id == UserAnswer.question_id)
             .where(
                 UserAnswer.exercise_response_id == response_id,
                 UserAnswer.question_id == question_id
             )
         )
-        user_answer = result.scalar_one_or_none()
-        
-        if not user_answer:
-            return None
-        
-        # Obtener la pregunta con sus opciones
-        result = await db.execute(
-            select(Question)
-            .options(selectinload(Question.options))
-            .where(Question.id == question_id)
-        )
-        question = result.scalar_one_or_none()
+        row = result.first()
         
-        if not question:
+        if not row:
             return None
         
-        # Si la pregunta no tiene opciones y hay texto de respuesta, re-analizar con IA
-        if not question.options and user_answer.answer_text:
-            logger.info("Re-analyzing text response with AI for detailed feedback")
-            ai_analysis = await analyze_text_response(
-                question_text=question.question_text,
-                correct_answer=question.correct_answer,
-                user_answer=user_answer.answer_text,
-                explanation=question.explanation
-            )
-            
-            return {
-                "question_id": question.id,
-                "question_text": question.question_text,
-                "user_answer": user_answer.answer_text,
-                "correct_answer": question.correct_answer,
-                "is_correct": ai_analysis["is_correct"],
-                "score_percentage": ai_analysis["score_percentage"],
-                "feedback": ai_analysis["feedback"],
-                "points_earned": int((ai_analysis["score_percentage"] / 100) * question.points),
-                "total_points": question.points
-            }
-        else:
-            # Para preguntas con opciones o sin texto de respuesta, devolver información básica
-            return {
-                "question_id": question.id,
-                "question_text": question.question_text,
-                "user_answer": user_answer.answer_text or "Opción seleccionada",
-                "correct_answer": question.correct_answer,
-                "is_correct": user_answer.is_correct,
-                "score_percentage": 100 if user_answer.is_correct else 0,
-                "feedback": "Respuesta evaluada automáticamente",
-                "points_earned": user_answer.points_earned,
-                "total_points": question.points
-            }
+        user_answer, question = row
+        return build_answer_feedback(user_answer, question)
             
     except Exception as e:
         logger.error(f"Error getting answer feedback: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+async def get_response_feedback(
+    db: AsyncSession,
+    response_id: int
+) -> List[dict]:
+    """
+    Obtiene el feedback de todas las respuestas de una entrega en una sola consulta.
+    """
+    result = await db.execute(
+        select(UserAnswer, Question)
+        .join(Question, Question.id == UserAnswer.question_id)
+        .where(UserAnswer.exercise_response_id == response_id)
+        .order_by(Question.order, UserAnswer.id)
+    )
+    return [build_answer_feedback(user_answer, question) for user_answer, question in result.all()]
@@ -1,10 +1,13 @@
 from app.models.exercise import Exercise
-from app.schemas.exercise import exerciseCreate
+from app.schemas.exercise import exerciseCreate, exerciseFullOut
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from app.models.question import Question
 from app.models.option import Option
+from app.services.exercise_cache import exercise_tree_cache
+from typing import List, Optional, Tuple
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -91,6 +94,7 @@ async def delete_exercise_router(db: AsyncSession, exercise_id: int):
         return None
     await db.delete(exercise)
     await db.commit()
+    await exercise_tree_cache.invalidate(exercise_id)
     return True
 
 async def update_exercise_router(db: AsyncSession, exercise_id: int, updates: dict):
@@ -101,6 +105,7 @@ async def update_exercise_router(db: AsyncSession, exercise_id: int, updates: di
     for key, value in updates.items():
         setattr(exercise, key, value)
     await db.commit()
+    await exercise_tree_cache.invalidate(exercise_id)
     await db.refresh(exercise)
     return exercise
 
@@ -115,49 +120,92 @@ async def get_full_exercise(db: AsyncSession, exercise_id: int):
     exercise = result.scalar_one_or_none()
     return exercise
 
-async def get_all_exercises(db: AsyncSession):
-    result = await db.execute(
-        select(Exercise)
-        .options(selectinload(Exercise.questions).selectinload(Question.options))
-        .order_by(Exercise.id)
-    )
-    exercises = result.scalars().all()
-    
-    # Convertir los ejercicios al formato esperado
-    formatted_exercises = []
-    for exercise in exercises:
-        formatted_questions = []
-        for question in exercise.questions:
-            options = []
-            for option in question.options:
-                options.append({
-                    'option_text': option.option_text,
-                    'is_correct': option.is_correct
-                })
-            formatted_questions.append({
+async def get_full_exercise_payload(db: AsyncSession, exercise_id: int) -> Optional[dict]:
+    """
+    Devuelve el ejercicio completo serializado como exerciseFullOut,
+    usando la caché de ejercicios (se invalida en cada escritura).
+    """
+    payload, version = await exercise_tree_cache.get(exercise_id)
+    if payload is not None:
+        return payload
+
+    started = time.perf_counter()
+    exercise = await get_full_exercise(db, exercise_id)
+    if not exercise:
+        return None
+    payload = exerciseFullOut(**serialize_exercise(exercise)).model_dump(mode="json")
+    await exercise_tree_cache.set(exercise_id, version, payload, time.perf_counter() - started)
+    return payload
+
+def serialize_exercise(exercise: Exercise, include_questions: bool = True) -> dict:
+    """Convierte un ejercicio al formato esperado por la API."""
+    data = {
+        'id': exercise.id,
+        'title': exercise.title,
+        'type': exercise.type.value,
+        'level': exercise.level.value,
+        'valid': exercise.valid,
+        'instructions': exercise.instructions,
+        'content_text': exercise.content_text,
+        'content_audio_url': exercise.content_audio_url
+    }
+    if include_questions:
+        data['questions'] = [
+            {
                 'id': question.id,
                 'question_text': question.question_text,
                 'correct_answer': question.correct_answer,
                 'explanation': question.explanation,
                 'order': question.order,
                 'points': question.points,
-                'difficulty': question.difficulty,
-                'options':  options  # Convertir objetos Option a strings
-            })
-        
-        formatted_exercises.append({
-            'id': exercise.id,
-            'title': exercise.title,
-            'type': exercise.type.value,
-            'level': exercise.level.value,
-            'valid': exercise.valid,
-            'instructions': exercise.instructions,
-            'content_text': exercise.content_text,
-            'content_audio_url': exercise.content_audio_url,
-            'questions': formatted_questions
-        })
-    
-    return formatted_exercises
+                'difficulty': question.difficulty.value if hasattr(question.difficulty, "value") else question.difficulty,
+                'options': [
+                    {
+                        'option_text': option.option_text,
+                        'is_correct': option.is_correct
+                    } for option in question.options
+                ]
+            } for question in exercise.questions
+        ]
+    return data
+
+async def get_exercises_page(
+    db: AsyncSession,
+    limit: Optional[int] = None,
+    cursor: Optional[int] = None,
+    exercise_type: Optional[str] = None,
+    level: Optional[str] = None,
+    valid: Optional[bool] = None,
+    include_questions: bool = True
+) -> Tuple[List[dict], Optional[int]]:
+    """
+    Devuelve una página de ejercicios ordenada por id (paginación por cursor sobre Exercise.id)
+    y el cursor de la página siguiente, o None si no hay más.
+    Sin limit se devuelven todos los ejercicios (a partir del cursor), como antes de la paginación.
+    Las preguntas y opciones solo se cargan para los ejercicios de la página.
+    """
+    query = select(Exercise).order_by(Exercise.id)
+    if limit is not None:
+        query = query.limit(limit + 1)
+    if cursor is not None:
+        query = query.where(Exercise.id > cursor)
+    if exercise_type is not None:
+        query = query.where(Exercise.type == exercise_type)
+    if level is not None:
+        query = query.where(Exercise.level == level)
+    if valid is not None:
+        query = query.where(Exercise.valid == valid)
+    if include_questions:
+        query = query.options(selectinload(Exercise.questions).selectinload(Question.options))
+
+    result = await db.execute(query)
+    exercises = result.scalars().all()
+
+    next_cursor = None
+    if limit is not None and len(exercises) > limit:
+        exercises = exercises[:limit]
+        next_cursor = exercises[-1].id
+    return [serialize_exercise(exercise, include_questions) for exercise in exercises], next_cursor
 
 async def get_exercises_by_type_router(db: AsyncSession, exercise_type: str):
     result = await db.execute(
@@ -168,44 +216,13 @@ async def get_exercises_by_type_router(db: AsyncSession, exercise_type: str):
     exercises = result.scalars().all()
     
     # Convertir los ejercicios al formato esperado
-    formatted_exercises = []
-    for exercise in exercises:
-        formatted_questions = []
-        for question in exercise.questions:
-            options = []
-            for option in question.options:
-                options.append({
-                    'option_text': option.option_text,
-                    'is_correct': option.is_correct
-                })
-            formatted_questions.append({
-                'id': question.id,
-                'question_text': question.question_text,
-                'correct_answer': question.correct_answer,
-                'explanation': question.explanation,
-                'order': question.order,
-                'points': question.points,
-                'difficulty': question.difficulty,
-                'options': options  # Ahora devuelve toda la información de las opciones
-            })
-        
-        formatted_exercises.append({
+    return [
+        {
             'message': 'Ejercicio encontrado',
-            'exercise': {
-                'id': exercise.id,
-                'title': exercise.title,
-                'type': exercise.type.value,
-                'level': exercise.level.value,
-                'valid': exercise.valid,
-                'instructions': exercise.instructions,
-                'content_text': exercise.content_text,
-                'content_audio_url': exercise.content_audio_url,
-                'questions': formatted_questions
-            },
+            'exercise': serialize_exercise(exercise),
             'status': 200
-        })
-    
-    return formatted_exercises
+        } for exercise in exercises
+    ]
 
 async def reject_exercise_router(db: AsyncSession, exercise_id: int):
     result = await db.execute(select(Exercise).filter_by(id=exercise_id))
@@ -214,6 +231,7 @@ async def reject_exercise_router(db: AsyncSession, exercise_id: int):
         return None
     exercise.valid = False
     await db.commit()
+    await exercise_tree_cache.invalidate(exercise_id)
     await delete_exercise_router(db, exercise_id)
     return True
 
@@ -224,4 +242,5 @@ async def approve_exercise_router(db: AsyncSession, exercise_id: int):
         return None
     exercise.valid = True
     await db.commit()
+    await exercise_tree_cache.invalidate(exercise_id)
     return True
\ No newline at end of file
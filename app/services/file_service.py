@@ -1,119 +1,247 @@
-import os
-import uuid
+import io
+import asyncio
+import hashlib
+import logging
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import UploadFile, HTTPException
 from PIL import Image
-import io
-from typing import Optional
-from google.cloud import storage
-from app.core.firebase_config import firebase_config
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.content import Content
+from app.models.exercise import Exercise
+from app.models.stored_file import StoredFile
+from app.services.storage_backends import StorageBackend, create_storage_backend
+from app.utils.image_processing import FORMAT_CONTENT_TYPES, FORMAT_EXTENSIONS, render_image_variants_async
+
+logger = logging.getLogger(__name__)
+
+# Las llamadas al backend de almacenamiento, a PIL y al disco son bloqueantes: corren en este pool
+_io_executor = ThreadPoolExecutor(max_workers=settings.UPLOAD_IO_WORKERS, thread_name_prefix="file-io")
+
+async def _run_blocking(func, *args):
+    return await asyncio.get_running_loop().run_in_executor(_io_executor, func, *args)
+
+def _verify_image(spool: BinaryIO):
+    spool.seek(0)
+    with Image.open(spool) as image:
+        image.verify()
+    spool.seek(0)
+
+def _download_and_hash(backend: StorageBackend, key: str) -> Tuple[BinaryIO, int, str]:
+    """Descarga un objeto del storage a un archivo temporal y calcula su tamaño y SHA-256."""
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_MAX_MEMORY)
+    try:
+        backend.download_to(key, spool)
+        spool.seek(0)
+        sha256 = hashlib.sha256()
+        size = 0
+        while chunk := spool.read(settings.UPLOAD_CHUNK_SIZE):
+            sha256.update(chunk)
+            size += len(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool, size, sha256.hexdigest()
+
+def _read_all(spool: BinaryIO) -> bytes:
+    spool.seek(0)
+    data = spool.read()
+    spool.seek(0)
+    return data
+
+class FileService:
+    """
+    Los archivos se guardan con el SHA-256 de su contenido como nombre y se registran en
+    stored_files: una subida repetida devuelve la URL existente sin volver a transferir bytes,
+    y un archivo solo se borra cuando ya no lo referencia ningún contenido ni ejercicio.
+
+    El almacenamiento lo resuelve el backend de STORAGE_BACKEND (firebase, local o memory);
+    con STORAGE_FALLBACK_TO_LOCAL, si ese backend no está disponible o falla se usa el local.
+    """
 
-class FirebaseFileService:
     def __init__(self):
-        self.bucket = firebase_config.get_bucket()
         self.allowed_image_types = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
         self.allowed_audio_types = ['audio/mpeg', 'audio/wav', 'audio/mp3', 'audio/ogg', 'audio/m4a']
         self.max_file_size = 50 * 1024 * 1024  # 50MB
-        
-        # Crear directorio para imágenes locales si no existe
-        self.local_images_dir = "static/images"
-        os.makedirs(self.local_images_dir, exist_ok=True)
-    
-    def _check_firebase_configured(self):
-        """Verificar si Firebase está configurado"""
-        if not firebase_config.is_configured():
+
+        self.backend: StorageBackend = create_storage_backend(settings.STORAGE_BACKEND)
+        self.local_backend: StorageBackend = (
+            self.backend if self.backend.name == "local" else create_storage_backend("local")
+        )
+        self.backends = {backend.name: backend for backend in (self.backend, self.local_backend)}
+
+    def _check_storage_available(self):
+        """Verificar que haya algún backend donde guardar"""
+        if not self.backend.available and not settings.STORAGE_FALLBACK_TO_LOCAL:
             raise HTTPException(
                 status_code=503,
-                detail="Firebase Storage no está configurado. Contacta al administrador."
+                detail="El almacenamiento de archivos no está configurado. Contacta al administrador."
             )
+
+    def direct_upload_backend(self) -> StorageBackend:
+        """Backend al que se suben los archivos directamente (sin pasar por la API)."""
+        if self.backend.available:
+            return self.backend
+        self._check_storage_available()
+        return self.local_backend
+
+    def _backend_for_url(self, url: str) -> Tuple[Optional[StorageBackend], Optional[str]]:
+        for backend in self.backends.values():
+            if not backend.available:
+                continue
+            key = backend.key_from_url(url)
+            if key is not None:
+                return backend, key
+        return None, None
+
+    async def _spool_upload(self, file: UploadFile) -> Tuple[BinaryIO, int, str]:
+        """
+        Copia la subida por partes a un archivo temporal (en memoria hasta UPLOAD_SPOOL_MAX_MEMORY,
+        después en disco) y corta apenas se supera el tamaño máximo, sin leer el resto.
+        Devuelve el archivo temporal, su tamaño y el SHA-256 calculado mientras se recibe.
+        """
+        if file.size is not None and file.size > self.max_file_size:
+            raise HTTPException(status_code=400, detail="Archivo demasiado grande. Máximo 50MB")
+
+        async def chunks():
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                yield chunk
+
+        return await self._spool_chunks(chunks())
+
+    async def _spool_chunks(self, chunks: AsyncIterator[bytes]) -> Tuple[BinaryIO, int, str]:
+        spool = tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_MAX_MEMORY)
+        sha256 = hashlib.sha256()
+        size = 0
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_file_size:
+                    raise HTTPException(status_code=400, detail="Archivo demasiado grande. Máximo 50MB")
+                sha256.update(chunk)
+                spool.write(chunk)
+        except BaseException:
+            spool.close()
+            raise
+        spool.seek(0)
+        return spool, size, sha256.hexdigest()
+
+    async def _spool_image(self, file: UploadFile) -> Tuple[BinaryIO, int, str]:
+        """Valida tipo, tamaño y contenido de una imagen y la deja lista para guardarse."""
+        if not file.content_type in self.allowed_image_types:
+            raise HTTPException(
+                status_code=400, 
+                detail=f"Tipo de imagen no soportado. Tipos permitidos: {', '.join(self.allowed_image_types)}"
+            )
+        spool, size, digest = await self._spool_upload(file)
+        try:
+            await _run_blocking(_verify_image, spool)
+        except Exception as e:
+            spool.close()
+            print(f"Error validando imagen: {e}")
+            raise HTTPException(status_code=400, detail="Archivo de imagen inválido")
+        return spool, size, digest
+
+    async def _find_stored(self, db: Optional[AsyncSession], digest: str) -> Optional[StoredFile]:
+        if db is None:
+            return None
+        return await db.get(StoredFile, digest)
+
+    async def _register_stored(
+        self, db: Optional[AsyncSession], digest: str, url: str, path: str,
+        backend: str, size: int, content_type: str, variants: Optional[dict] = None
+    ):
+        """Registra el archivo en el índice (en un savepoint; el commit lo hace quien llama)."""
+        if db is None:
+            return
+        try:
+            async with db.begin_nested():
+                db.add(StoredFile(
+                    digest=digest, url=url, path=path, backend=backend,
+                    size=size, content_type=content_type, variants=variants
+                ))
+        except IntegrityError:
+            # Otro request registró el mismo contenido en paralelo
+            pass
+
+    async def _count_references(self, db: AsyncSession, url: str) -> int:
+        content_refs = await db.scalar(select(func.count(Content.id)).where(Content.img == url))
+        audio_refs = await db.scalar(select(func.count(Exercise.id)).where(Exercise.content_audio_url == url))
+        return content_refs + audio_refs
+
+    async def _put(self, folder: str, filename: str, spool: BinaryIO, size: int, content_type: str) -> Tuple[str, str, str]:
+        """Guarda en el backend principal o, si falla, en el local. Retorna (url, clave, backend)."""
+        backend = self.backend
+        if backend.available:
+            try:
+                key = backend.object_key(folder, filename)
+                url = await _run_blocking(backend.put, key, spool, size, content_type)
+                return url, key, backend.name
+            except Exception as e:
+                if not settings.STORAGE_FALLBACK_TO_LOCAL or backend is self.local_backend:
+                    raise
+                print(f"❌ Error guardando en {backend.name}: {e}")
+                print("Intentando guardar localmente...")
+        elif not settings.STORAGE_FALLBACK_TO_LOCAL:
+            self._check_storage_available()
+
+        key = self.local_backend.object_key(folder, filename)
+        url = await _run_blocking(self.local_backend.put, key, spool, size, content_type)
+        return url, key, self.local_backend.name
     
-    async def save_image_locally(self, file: UploadFile) -> str:
+    async def save_image_locally(self, file: UploadFile, db: Optional[AsyncSession] = None) -> str:
         """Guardar imagen localmente como fallback"""
         try:
-            # Validar tipo de archivo
-            if not file.content_type in self.allowed_image_types:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Tipo de imagen no soportado. Tipos permitidos: {', '.join(self.allowed_image_types)}"
-                )
-            
-            # Leer contenido
-            content = await file.read()
-            if len(content) > self.max_file_size:
-                raise HTTPException(status_code=400, detail="Archivo demasiado grande. Máximo 50MB")
-            
-            # Validar que sea una imagen válida
-            try:
-                image = Image.open(io.BytesIO(content))
-                image.verify()
-            except Exception:
-                raise HTTPException(status_code=400, detail="Archivo de imagen inválido")
-            
-            # Generar nombre único
-            file_extension = file.filename.split('.')[-1]
-            unique_filename = f"{uuid.uuid4()}.{file_extension}"
-            file_path = os.path.join(self.local_images_dir, unique_filename)
-            
-            # Guardar archivo localmente
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            
-            # Retornar URL relativa
-            return f"/static/images/{unique_filename}"
-            
+            spool, size, digest = await self._spool_image(file)
+            with spool:
+                file_extension = file.filename.split('.')[-1].lower()
+                key = self.local_backend.object_key("images", f"{digest}.{file_extension}")
+                url_path = await _run_blocking(self.local_backend.put, key, spool, size, file.content_type)
+                await self._register_stored(db, digest, url_path, key, self.local_backend.name, size, file.content_type)
+                return url_path
         except Exception as e:
             print(f"Error guardando imagen localmente: {e}")
             raise
     
-    async def save_image(self, file: UploadFile) -> str:
-        """Guardar imagen en Firebase Storage y retornar URL pública"""
+    async def save_image(self, file: UploadFile, db: Optional[AsyncSession] = None) -> str:
+        """Guardar imagen en el storage y retornar URL pública"""
+        url, _ = await self._save_image(file, db, with_variants=False)
+        return url
+
+    async def save_image_with_variants(self, file: UploadFile, db: Optional[AsyncSession] = None) -> Tuple[str, Optional[dict]]:
+        """Guardar imagen y sus derivados (anchos configurados + miniatura). Retorna (url, variantes o None)."""
+        return await self._save_image(file, db, with_variants=True)
+
+    async def _save_image(self, file: UploadFile, db: Optional[AsyncSession], with_variants: bool) -> Tuple[str, Optional[dict]]:
         try:
-            # Leer el contenido una sola vez
-            content = await file.read()
-            
-            # Validar tipo de archivo
-            if not file.content_type in self.allowed_image_types:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Tipo de imagen no soportado. Tipos permitidos: {', '.join(self.allowed_image_types)}"
-                )
-            
-            # Validar tamaño
-            if len(content) > self.max_file_size:
-                raise HTTPException(status_code=400, detail="Archivo demasiado grande. Máximo 50MB")
-            
-            # Validar que sea una imagen válida
-            try:
-                image = Image.open(io.BytesIO(content))
-                image.verify()
-                # Resetear el archivo para que se pueda leer de nuevo
-                await file.seek(0)
-            except Exception as e:
-                print(f"Error validando imagen: {e}")
-                raise HTTPException(status_code=400, detail="Archivo de imagen inválido")
-            
-            # Intentar subir a Firebase primero
-            if firebase_config.is_configured():
-                try:
-                    # Generar nombre único
-                    file_extension = file.filename.split('.')[-1]
-                    unique_filename = f"images/{uuid.uuid4()}.{file_extension}"
-                    
-                    # Subir a Firebase Storage
-                    blob = self.bucket.blob(unique_filename)
-                    blob.upload_from_string(content, content_type=file.content_type)
-                    
-                    # Hacer público el archivo
-                    blob.make_public()
-                    
-                    print(f"✅ Imagen subida exitosamente a Firebase: {blob.public_url}")
-                    return blob.public_url
-                    
-                except Exception as e:
-                    print(f"❌ Error subiendo a Firebase: {e}")
-                    print("Intentando guardar localmente...")
-            
-            # Fallback: guardar localmente
-            return await self.save_image_locally_with_content(file, content)
+            spool, size, digest = await self._spool_image(file)
+            with spool:
+                # Si el mismo contenido ya está guardado, reutilizarlo sin subirlo de nuevo
+                stored = await self._find_stored(db, digest)
+                if stored and (stored.variants is not None or not with_variants):
+                    print(f"♻️  Imagen ya almacenada: {stored.url}")
+                    return stored.url, stored.variants
+
+                if stored:
+                    url, backend = stored.url, stored.backend
+                else:
+                    # Nombre derivado del contenido
+                    file_extension = file.filename.split('.')[-1].lower()
+                    url, key, backend = await self._put("images", f"{digest}.{file_extension}", spool, size, file.content_type)
+                    print(f"✅ Imagen guardada ({backend}): {url}")
+
+                variants = await self._create_variants(spool, digest, backend) if with_variants else None
+
+                if stored:
+                    stored.variants = variants
+                else:
+                    await self._register_stored(db, digest, url, key, backend, size, file.content_type, variants)
+                return url, variants
             
         except HTTPException:
             # Re-lanzar HTTPExceptions
@@ -121,30 +249,117 @@ class FirebaseFileService:
         except Exception as e:
             print(f"Error general guardando imagen: {e}")
             raise HTTPException(status_code=500, detail="Error interno del servidor")
-    
-    async def save_image_locally_with_content(self, file: UploadFile, content: bytes) -> str:
-        """Guardar imagen localmente usando contenido ya leído"""
+
+    def _backend_named(self, name: str) -> StorageBackend:
+        if name not in self.backends:
+            self.backends[name] = create_storage_backend(name)
+        return self.backends[name]
+
+    async def _create_variants(self, spool: BinaryIO, digest: str, backend_name: str) -> Optional[dict]:
+        """
+        Genera los derivados en el pool de procesos y los guarda en el mismo backend que el original.
+        Retorna {"w640": {"webp": url, "jpeg": url}, ..., "thumbnail": {...}}. Si la imagen no se
+        puede procesar o los derivados no se pueden guardar retorna None: se guarda solo el
+        original y los derivados se vuelven a intentar la próxima vez que se suba ese contenido.
+        """
         try:
-            # Generar nombre único
-            file_extension = file.filename.split('.')[-1]
-            unique_filename = f"{uuid.uuid4()}.{file_extension}"
-            file_path = os.path.join(self.local_images_dir, unique_filename)
-            
-            # Guardar archivo localmente
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            
-            url_path = f"/static/images/{unique_filename}"
-            print(f"✅ Imagen guardada localmente: {url_path}")
-            return url_path
-            
-        except Exception as e:
-            print(f"Error guardando imagen localmente: {e}")
-            raise HTTPException(status_code=500, detail="Error guardando imagen localmente")
+            data = await _run_blocking(_read_all, spool)
+            rendered = await render_image_variants_async(
+                data,
+                settings.IMAGE_VARIANT_WIDTHS,
+                settings.IMAGE_VARIANT_FORMATS,
+                settings.IMAGE_THUMBNAIL_SIZE,
+                settings.IMAGE_VARIANT_QUALITY,
+                settings.IMAGE_PROCESSING_WORKERS
+            )
+        except Exception:
+            logger.exception(f"Error generating image variants for {digest}")
+            return None
+
+        backend = self._backend_named(backend_name)
+
+        async def store_variant(key: str, image_format: str, variant_data: bytes):
+            object_key = backend.object_key("images/variants", f"{digest}_{key}.{FORMAT_EXTENSIONS[image_format]}")
+            url = await _run_blocking(
+                backend.put, object_key, io.BytesIO(variant_data), len(variant_data), FORMAT_CONTENT_TYPES[image_format]
+            )
+            return key, image_format, url
+
+        try:
+            stored_variants = await asyncio.gather(*(store_variant(*variant) for variant in rendered))
+        except Exception:
+            logger.exception(f"Error storing image variants for {digest} in {backend_name}")
+            return None
+
+        variants: dict = {}
+        for key, image_format, url in stored_variants:
+            variants.setdefault(key, {})[image_format] = url
+        return variants
     
-    async def save_audio(self, file: UploadFile) -> str:
-        """Guardar archivo de audio en Firebase Storage y retornar URL pública"""
-        self._check_firebase_configured()
+    async def receive_direct_upload(
+        self, backend_name: str, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str]
+    ) -> str:
+        """
+        Recibe el cuerpo de un PUT firmado (reemplazo local del storage). Como la clave se
+        deriva del SHA-256 del contenido, se verifica que coincida con lo recibido.
+        """
+        spool, size, digest = await self._spool_chunks(chunks)
+        with spool:
+            if key.rsplit("/", 1)[-1].split(".", 1)[0] != digest:
+                raise HTTPException(status_code=400, detail="El contenido no coincide con el hash declarado")
+            backend = self._backend_named(backend_name)
+            return await _run_blocking(backend.put, key, spool, size, content_type)
+
+    async def register_direct_upload(
+        self, db: AsyncSession, backend_name: str, key: str, kind: str,
+        digest: str, size: int, content_type: str
+    ) -> str:
+        """
+        Valida un archivo subido directamente al storage y, si corresponde, lo publica y lo
+        registra en stored_files. Retorna su URL pública.
+
+        stored_files es el índice de deduplicación, así que no se confía en el hash declarado:
+        el objeto se descarga, se recalcula su SHA-256 y se valida su tipo igual que en una
+        subida multipart. Si algo no coincide se borra el objeto y se rechaza.
+        """
+        stored = await self._find_stored(db, digest)
+        if stored:
+            return stored.url
+
+        backend = self._backend_named(backend_name)
+        info = await _run_blocking(backend.stat, key)
+        if info is None:
+            raise HTTPException(status_code=400, detail="El archivo no fue subido")
+        actual_size, actual_content_type = info
+        if actual_size != size or (actual_content_type and actual_content_type != content_type):
+            await _run_blocking(backend.delete, key)
+            raise HTTPException(status_code=400, detail="El archivo subido no coincide con el declarado")
+
+        allowed_types = self.allowed_image_types if kind == "image" else self.allowed_audio_types
+        if content_type not in allowed_types:
+            await _run_blocking(backend.delete, key)
+            raise HTTPException(status_code=400, detail=f"Tipo no soportado. Tipos permitidos: {', '.join(allowed_types)}")
+
+        spool, actual_size, actual_digest = await _run_blocking(_download_and_hash, backend, key)
+        with spool:
+            if actual_digest != digest or actual_size != size:
+                await _run_blocking(backend.delete, key)
+                raise HTTPException(status_code=400, detail="El contenido no coincide con el hash declarado")
+            if kind == "image":
+                try:
+                    await _run_blocking(_verify_image, spool)
+                except Exception as e:
+                    print(f"Error validando imagen subida directamente: {e}")
+                    await _run_blocking(backend.delete, key)
+                    raise HTTPException(status_code=400, detail="Archivo de imagen inválido")
+
+        url = await _run_blocking(backend.finalize_upload, key)
+        await self._register_stored(db, digest, url, key, backend.name, size, content_type)
+        return url
+
+    async def save_audio(self, file: UploadFile, db: Optional[AsyncSession] = None) -> str:
+        """Guardar archivo de audio en el storage y retornar URL pública"""
+        self._check_storage_available()
         
         if not file.content_type in self.allowed_audio_types:
             raise HTTPException(
@@ -152,56 +367,77 @@ class FirebaseFileService:
                 detail=f"Tipo de audio no soportado. Tipos permitidos: {', '.join(self.allowed_audio_types)}"
             )
         
-        # Validar tamaño
-        content = await file.read()
-        if len(content) > self.max_file_size:
-            raise HTTPException(status_code=400, detail="Archivo demasiado grande. Máximo 50MB")
-        
-        # Generar nombre único
-        file_extension = file.filename.split('.')[-1]
-        unique_filename = f"audio/{uuid.uuid4()}.{file_extension}"
-        
-        # Subir a Firebase Storage
-        blob = self.bucket.blob(unique_filename)
-        blob.upload_from_string(content, content_type=file.content_type)
-        
-        # Hacer público el archivo
-        blob.make_public()
-        
-        return blob.public_url
+        # Validar tamaño mientras se recibe
+        spool, size, digest = await self._spool_upload(file)
+        with spool:
+            stored = await self._find_stored(db, digest)
+            if stored:
+                return stored.url
+
+            # Nombre derivado del contenido
+            file_extension = file.filename.split('.')[-1].lower()
+            url, key, backend = await self._put("audio", f"{digest}.{file_extension}", spool, size, file.content_type)
+            await self._register_stored(db, digest, url, key, backend, size, file.content_type)
+            return url
     
-    async def delete_file(self, file_url: str) -> bool:
-        """Eliminar archivo de Firebase Storage"""
-        if not firebase_config.is_configured():
-            print("⚠️  Firebase no configurado, no se puede eliminar archivo")
-            return False
-            
+    async def delete_file(self, file_url: str, db: Optional[AsyncSession] = None, released_references: int = 0) -> bool:
+        """
+        Eliminar archivo del storage.
+        Con db, solo se elimina si no quedan referencias (Content.img o Exercise.content_audio_url)
+        además de las `released_references` que quien llama está por soltar.
+        """
+        stored = None
+        if db is not None:
+            if await self._count_references(db, file_url) > released_references:
+                print(f"🔗 Archivo todavía referenciado, no se elimina: {file_url}")
+                return False
+            stored = (await db.execute(select(StoredFile).where(StoredFile.url == file_url))).scalar_one_or_none()
+
         try:
-            # Extraer el nombre del archivo de la URL
-            # Ejemplo: https://storage.googleapis.com/bucket-name/images/filename.jpg
-            file_path = file_url.split('/')[-2] + '/' + file_url.split('/')[-1]
-            blob = self.bucket.blob(file_path)
-            blob.delete()
+            if not await self._delete_object(file_url):
+                return False
+            if stored:
+                # Eliminar también los derivados generados a partir del original
+                for formats in (stored.variants or {}).values():
+                    for variant_url in formats.values():
+                        await self._delete_object(variant_url)
+                await db.delete(stored)
             return True
         except Exception as e:
             print(f"Error eliminando archivo: {e}")
             return False
+
+    async def _delete_object(self, file_url: str) -> bool:
+        backend, key = self._backend_for_url(file_url)
+        if backend is None:
+            print(f"⚠️  Ningún backend disponible reconoce la URL, no se puede eliminar: {file_url}")
+            return False
+        await _run_blocking(backend.delete, key)
+        return True
     
-    async def update_file(self, old_url: str, new_file: UploadFile, file_type: str) -> str:
+    async def update_file(self, old_url: str, new_file: UploadFile, file_type: str, db: Optional[AsyncSession] = None) -> str:
         """Actualizar archivo existente"""
-        self._check_firebase_configured()
-        
-        # Eliminar archivo anterior
-        if old_url:
-            await self.delete_file(old_url)
-        
-        # Subir nuevo archivo
         if file_type == "image":
-            return await self.save_image(new_file)
-        elif file_type == "audio":
-            return await self.save_audio(new_file)
-        else:
+            new_url, _ = await self.update_image(old_url, new_file, db)
+            return new_url
+        elif file_type != "audio":
             raise HTTPException(status_code=400, detail="Tipo de archivo no soportado")
 
+        new_url = await self.save_audio(new_file, db)
+        # Eliminar el archivo anterior si este era su último uso
+        if old_url and old_url != new_url:
+            await self.delete_file(old_url, db, released_references=1)
+        return new_url
+
+    async def update_image(self, old_url: str, new_file: UploadFile, db: Optional[AsyncSession] = None) -> Tuple[str, Optional[dict]]:
+        """Reemplaza una imagen (con sus derivados). Retorna (url, variantes)."""
+        self._check_storage_available()
+
+        new_url, variants = await self.save_image_with_variants(new_file, db)
+        # Eliminar el archivo anterior si este era su último uso
+        if old_url and old_url != new_url:
+            await self.delete_file(old_url, db, released_references=1)
+        return new_url, variants
+
 # Instancia global
-file_service = FirebaseFileService() 
\ No newline at end of file
+file_service = FileService()
@@ -0,0 +1,280 @@
+from sqlalchemy import and_, case, func, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
+from app.core.config import settings
+from app.core.database import async_session_maker
+from app.models.grading_job import GradingJob
+from app.models.question import Question
+from app.models.user import User
+from app.models.user_answer import UserAnswer
+from app.models.user_exercise_response import UserExerciseResponse
+from app.services.ai_evaluation_cache_service import evaluate_text_answers
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Se ejecuta cuando termina la corrección de una entrega: hook(db, exercise_response)
+CompletionHook = Callable[[AsyncSession, UserExerciseResponse], Awaitable[None]]
+
+
+class GradingQueue:
+    """
+    Cola de corrección en segundo plano para respuestas de texto libre.
+    Los trabajos se persisten en la tabla grading_jobs, por lo que los que queden
+    pendientes al apagar el proceso se retoman en el próximo arranque. Cada trabajo se
+    toma con un UPDATE condicional y un lease (claimed_at), así varios procesos pueden
+    compartir la tabla sin corregir dos veces la misma respuesta.
+    """
+
+    def __init__(self, workers: int, max_attempts: int, lease_seconds: int):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._completion_hooks: List[CompletionHook] = []
+
+    def add_completion_hook(self, hook: CompletionHook):
+        self._completion_hooks.append(hook)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self):
+        """Inicia los workers y re-encola los trabajos pendientes guardados en la base de datos."""
+        if self.running:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reclaim_periodically()))
+
+        # Solo se retoman los trabajos cuyo lease venció: los demás pueden estar en manos
+        # de workers de otros procesos que siguen vivos
+        await self._reclaim_stale_jobs()
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(GradingJob.id).where(GradingJob.status == "pending").order_by(GradingJob.id)
+            )
+            job_ids = result.scalars().all()
+        self.enqueue(job_ids)
+        logger.info(f"Grading queue started with {self.workers} workers ({len(job_ids)} pending jobs)")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def enqueue(self, job_ids: List[int]):
+        # Si la cola no está corriendo (p. ej. desde un comando), los trabajos quedan
+        # pendientes en la base de datos y se toman en el próximo arranque
+        if self._queue is None:
+            return
+        for job_id in job_ids:
+            self._queue.put_nowait(job_id)
+
+    async def _reclaim_stale_jobs(self) -> List[int]:
+        """Devuelve a pendientes los trabajos en ejecución cuyo lease venció (worker o proceso caído)."""
+        stale = and_(
+            GradingJob.status == "running",
+            or_(
+                GradingJob.claimed_at.is_(None),
+                GradingJob.claimed_at < datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+            )
+        )
+        async with async_session_maker() as db:
+            result = await db.execute(select(GradingJob.id).where(stale))
+            job_ids = result.scalars().all()
+            if job_ids:
+                await db.execute(
+                    update(GradingJob)
+                    .where(GradingJob.id.in_(job_ids), stale)
+                    .values(status="pending", claimed_at=None)
+                )
+                await db.commit()
+                logger.warning(f"Reclaimed {len(job_ids)} grading jobs with an expired lease")
+        return job_ids
+
+    async def _reclaim_periodically(self):
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                self.enqueue(await self._reclaim_stale_jobs())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Reclaiming stale grading jobs failed: {str(e)}")
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._process(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Fallo antes de tomar el trabajo: sigue pendiente en la base de datos
+                logger.error(f"Grading worker {index} failed to claim job {job_id}: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    async def _process(self, job_id: int):
+        async with async_session_maker() as db:
+            # Tomar el trabajo de forma atómica: solo un worker (de cualquier proceso) gana pending -> running.
+            # attempts identifica la toma y evita que un worker con el lease vencido pise el resultado de otro
+            claim = await db.execute(
+                update(GradingJob)
+                .where(GradingJob.id == job_id, GradingJob.status == "pending")
+                .values(status="running", claimed_at=datetime.utcnow(), attempts=GradingJob.attempts + 1)
+            )
+            if claim.rowcount != 1:
+                await db.rollback()
+                return
+            await db.commit()
+
+            result = await db.execute(
+                select(GradingJob)
+                .options(
+                    selectinload(GradingJob.user_answer)
+                    .selectinload(UserAnswer.question)
+                    .selectinload(Question.options)
+                )
+                .where(GradingJob.id == job_id)
+            )
+            job = result.scalar_one()
+            attempt = job.attempts
+            exercise_response_id = job.exercise_response_id
+
+            try:
+                user_answer = job.user_answer
+                question = user_answer.question
+                ai_analysis, = await evaluate_text_answers(db, [(question, user_answer.answer_text)])
+
+                user_answer.is_correct = ai_analysis["is_correct"]
+                user_answer.points_earned = int((ai_analysis["score_percentage"] / 100) * question.points)
+                user_answer.score_percentage = ai_analysis["score_percentage"]
+                user_answer.feedback = ai_analysis["feedback"]
+                finished = await db.execute(
+                    update(GradingJob)
+                    .where(GradingJob.id == job_id, GradingJob.status == "running", GradingJob.attempts == attempt)
+                    .values(status="done", error=None)
+                )
+                if finished.rowcount != 1:
+                    # El lease venció y otro worker retomó el trabajo: se descarta este resultado
+                    await db.rollback()
+                    return
+                await db.commit()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Grading job {job_id} failed on attempt {attempt}: {str(e)}")
+                await db.rollback()
+                await self._record_failure(job_id, attempt, e)
+                return
+
+            await self._complete_if_finished(db, exercise_response_id)
+
+    async def _record_failure(self, job_id: int, attempt: int, error: Exception):
+        retry = attempt < self.max_attempts
+        async with async_session_maker() as db:
+            result = await db.execute(
+                update(GradingJob)
+                .where(GradingJob.id == job_id, GradingJob.status == "running", GradingJob.attempts == attempt)
+                .values(error=str(error), status="pending" if retry else "failed", claimed_at=None)
+            )
+            if result.rowcount != 1:
+                await db.rollback()
+                return
+            await db.commit()
+            if retry:
+                self.enqueue([job_id])
+            else:
+                exercise_response_id = await db.scalar(
+                    select(GradingJob.exercise_response_id).where(GradingJob.id == job_id)
+                )
+                await self._complete_if_finished(db, exercise_response_id)
+
+    async def _complete_if_finished(self, db: AsyncSession, exercise_response_id: int):
+        """Si no quedan trabajos abiertos, recalcula el puntaje de la entrega y ejecuta los hooks."""
+        open_jobs = await db.scalar(
+            select(func.count(GradingJob.id)).where(
+                GradingJob.exercise_response_id == exercise_response_id,
+                GradingJob.status.in_(("pending", "running"))
+            )
+        )
+        if open_jobs:
+            return
+
+        totals = await db.execute(
+            select(
+                func.coalesce(func.sum(UserAnswer.points_earned), 0),
+                func.count(UserAnswer.id),
+                func.coalesce(func.sum(case((UserAnswer.is_correct.is_(True), 1), else_=0)), 0)
+            ).where(UserAnswer.exercise_response_id == exercise_response_id)
+        )
+        score, answers, correct = totals.one()
+        previous = await db.execute(
+            select(UserExerciseResponse.user_id, UserExerciseResponse.score)
+            .where(UserExerciseResponse.id == exercise_response_id)
+        )
+        user_id, previous_score = previous.one()
+
+        # Solo un worker gana la transición pending -> completed
+        result = await db.execute(
+            update(UserExerciseResponse)
+            .where(
+                UserExerciseResponse.id == exercise_response_id,
+                UserExerciseResponse.grading_status == "pending"
+            )
+            .values(score=score, is_valid=answers == correct, grading_status="completed")
+        )
+        if result.rowcount != 1:
+            await db.rollback()
+            return
+
+        # Sumar al total del usuario los puntos obtenidos en la corrección diferida
+        if score != (previous_score or 0):
+            await db.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(points=func.coalesce(User.points, 0) + (score - (previous_score or 0)))
+            )
+        await db.commit()
+
+        exercise_response = await db.get(UserExerciseResponse, exercise_response_id, populate_existing=True)
+        for hook in self._completion_hooks:
+            try:
+                await hook(db, exercise_response)
+            except Exception as e:
+                logger.error(f"Grading completion hook failed for response {exercise_response_id}: {str(e)}")
+
+
+grading_queue = GradingQueue(
+    settings.GRADING_WORKERS, settings.GRADING_MAX_ATTEMPTS, settings.GRADING_JOB_LEASE_SECONDS
+)
+
+
+async def get_grading_status(db: AsyncSession, response_id: int) -> Optional[dict]:
+    exercise_response = await db.get(UserExerciseResponse, response_id)
+    if not exercise_response:
+        return None
+    result = await db.execute(
+        select(GradingJob.status, func.count(GradingJob.id))
+        .where(GradingJob.exercise_response_id == response_id)
+        .group_by(GradingJob.status)
+    )
+    counts = dict(result.all())
+    return {
+        "response_id": exercise_response.id,
+        "grading_status": exercise_response.grading_status,
+        "pending_jobs": counts.get("pending", 0) + counts.get("running", 0),
+        "failed_jobs": counts.get("failed", 0),
+        "score": exercise_response.score,
+        "is_valid": exercise_response.is_valid
+    }
@@ -1,7 +1,11 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 import os
 import json
+import asyncio
 import logging
+from typing import List, Optional
+from app.core.config import settings
+from app.utils.answer_key import check_answer
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.exercise import Exercise
 from sqlalchemy.future import select
@@ -10,21 +14,18 @@ from sqlalchemy.orm import selectinload
 # Configurar el logger
 logger = logging.getLogger(__name__)
 
-def check_answer(user_answer: str, correct_answer: str) -> bool:
-    """Verifica si la respuesta del usuario es correcta usando comparación básica."""
-    if not user_answer or not correct_answer:
-        return False
-    
-    # Convertir a minúsculas y eliminar espacios
-    user_answer = user_answer.lower().strip()
-    correct_answers = [ans.lower().strip() for ans in correct_answer.split('|')]
-    
-    # Verificar cada respuesta correcta
-    for correct in correct_answers:
-        if user_answer == correct:
-            return True
-    
-    return False
+# Cliente asíncrono compartido para no bloquear el event loop durante la llamada al modelo
+_async_client: Optional[AsyncOpenAI] = None
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Obtiene (o crea) el cliente asíncrono de OpenAI."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            base_url=settings.OPENAI_BASE_URL
+        )
+    return _async_client
 
 def generateExercisePrompt(exercise_type, english_level, title, userRequest, valid=False):
     
@@ -184,7 +185,7 @@ async def analyze_text_response(
     Returns:
         dict: Contiene 'is_correct' (bool), 'score_percentage' (int), y 'feedback' (str)
     """
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    client = get_async_openai_client()
     
     prompt = f"""
     Eres un evaluador experto de ejercicios de inglés. Tu tarea es evaluar si la respuesta del estudiante es correcta.
@@ -212,13 +213,16 @@ async def analyze_text_response(
     """
     
     try:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Eres un evaluador experto de ejercicios de inglés. Responde siempre en formato JSON válido."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3
+        response = await asyncio.wait_for(
+            client.chat.completions.create(
+                model="gpt-4",
+                messages=[
+                    {"role": "system", "content": "Eres un evaluador experto de ejercicios de inglés. Responde siempre en formato JSON válido."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3
+            ),
+            timeout=settings.AI_GRADING_TIMEOUT_SECONDS
         )
         
         output = response.choices[0].message.content.strip()
@@ -231,10 +235,36 @@ async def analyze_text_response(
         }
         
     except Exception as e:
-        # En caso de error, usar evaluación básica como fallback
-        logger.error(f"Error al analizar respuesta con IA: {str(e)}")
+        # En caso de error (o tiempo de espera agotado), usar evaluación básica como fallback
+        logger.error(f"Error al analizar respuesta con IA: {type(e).__name__} {str(e)}")
         return {
             "is_correct": check_answer(user_answer, correct_answer),
             "score_percentage": 100 if check_answer(user_answer, correct_answer) else 0,
-            "feedback": "Evaluación automática debido a error en el análisis de IA"
-        }
\ No newline at end of file
+            "feedback": "Evaluación automática debido a error en el análisis de IA",
+            "fallback": True
+        }
+
+async def analyze_text_responses(
+    evaluations: List[dict],
+    max_concurrency: Optional[int] = None
+) -> List[dict]:
+    """
+    Analiza varias respuestas de texto libre en paralelo.
+
+    Args:
+        evaluations: Lista de dicts con los argumentos de analyze_text_response
+        max_concurrency: Límite de llamadas simultáneas al modelo (por defecto AI_GRADING_CONCURRENCY)
+
+    Returns:
+        List[dict]: Resultados en el mismo orden que `evaluations`
+    """
+    if not evaluations:
+        return []
+
+    semaphore = asyncio.Semaphore(max_concurrency or settings.AI_GRADING_CONCURRENCY)
+
+    async def _analyze(evaluation: dict) -> dict:
+        async with semaphore:
+            return await analyze_text_response(**evaluation)
+
+    return await asyncio.gather(*(_analyze(evaluation) for evaluation in evaluations))
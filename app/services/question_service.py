@@ -4,6 +4,8 @@ from sqlalchemy import delete
 from app.models.question import Question
 from app.models.option import Option
 from app.schemas.question import QuestionCreate
+from app.services.ai_evaluation_cache_service import ai_evaluation_cache
+from app.services.exercise_cache import exercise_tree_cache
 from typing import List
 from sqlalchemy.orm import selectinload
 
@@ -32,6 +34,7 @@ async def create_question_service(db: AsyncSession, exercise_id: int, question_d
         db.add(new_option)
 
     await db.commit()
+    await exercise_tree_cache.invalidate(exercise_id)
     # Refresca la pregunta para que tenga las opciones cargadas
     await db.refresh(new_question)
     return new_question
@@ -63,7 +66,9 @@ async def add_options_to_question(db: AsyncSession, question_id: int, options: L
         .options(selectinload(Question.options))
         .where(Question.id == question_id)
     )
-    return result.scalar_one()
+    question = result.scalar_one()
+    await exercise_tree_cache.invalidate(question.exercise_id)
+    return question
 
 async def update_question_service(db: AsyncSession, question_id: int, question_data: QuestionCreate):
     result = await db.execute(select(Question).filter_by(id=question_id))
@@ -73,10 +78,15 @@ async def update_question_service(db: AsyncSession, question_id: int, question_d
     
     # Extraer los datos de la pregunta excluyendo las opciones
     question_update_data = question_data.model_dump(exclude_unset=True, exclude={'options'})
+    previous_answer_key = (question.correct_answer, question.explanation)
     
     # Actualizar los campos de la pregunta
     for key, value in question_update_data.items():
         setattr(question, key, value)
+
+    # Invalidar las evaluaciones de IA cacheadas si cambió la respuesta esperada
+    if (question.correct_answer, question.explanation) != previous_answer_key:
+        await ai_evaluation_cache.invalidate_question(db, question_id)
     
     # Manejar las opciones por separado si se proporcionan
     if question_data.options:
@@ -93,6 +103,7 @@ async def update_question_service(db: AsyncSession, question_id: int, question_d
             db.add(new_option)
     
     await db.commit()
+    await exercise_tree_cache.invalidate(question.exercise_id)
     await db.refresh(question)
     
     # Cargar las opciones para el retorno
@@ -0,0 +1,323 @@
+"""
+Backends de almacenamiento de archivos.
+
+Todos exponen la misma interfaz bloqueante (put/get/download_to/delete/exists/stat/presign); FileService
+los llama desde su pool de hilos. Las claves son rutas relativas ("images/<digest>.png").
+"""
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import BinaryIO, Dict, Optional, Tuple
+from urllib.parse import quote, urlencode
+import hashlib
+import hmac
+import os
+import shutil
+import tempfile
+import threading
+import time
+from app.core.config import settings
+from app.core.firebase_config import firebase_config
+
+
+class StorageBackend(ABC):
+    name: str
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def object_key(self, folder: str, filename: str) -> str:
+        """Clave con la que se guarda `filename` dentro de `folder`."""
+        return f"{folder}/{filename}"
+
+    @abstractmethod
+    def put(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> str:
+        """Guarda el contenido de `fileobj` (desde el inicio) y retorna su URL pública."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        pass
+
+    def download_to(self, key: str, fileobj: BinaryIO):
+        """Escribe el contenido del objeto en `fileobj` (los backends remotos lo hacen por partes)."""
+        fileobj.write(self.get(key))
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        pass
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[Tuple[int, Optional[str]]]:
+        """(tamaño, content_type) del objeto, o None si no existe."""
+
+    def finalize_upload(self, key: str) -> str:
+        """Publica un objeto subido directamente al storage y retorna su URL pública."""
+        return self.url(key)
+
+    @abstractmethod
+    def key_from_url(self, url: str) -> Optional[str]:
+        """Clave de un objeto a partir de su URL, o None si la URL no es de este backend."""
+
+    def presign(self, key: str, method: str = "GET", expires_seconds: int = 900, content_type: Optional[str] = None) -> str:
+        """
+        URL temporal para leer (GET) o escribir (PUT) el objeto sin pasar por la API.
+        Los backends sin URLs firmadas propias usan la ruta /uploads/direct de la API,
+        firmada con HMAC, como reemplazo local del storage.
+        """
+        if method == "GET":
+            return self.url(key)
+        if method != "PUT":
+            raise ValueError(f"Método no soportado para URLs firmadas: {method} (solo GET o PUT)")
+        expires = int(time.time()) + expires_seconds
+        query = {"expires": expires, "signature": sign_direct_upload(self.name, key, content_type, expires)}
+        if content_type:
+            query["content_type"] = content_type
+        return f"/uploads/direct/{self.name}/{quote(key)}?{urlencode(query)}"
+
+
+def sign_direct_upload(backend_name: str, key: str, content_type: Optional[str], expires: int) -> str:
+    message = f"PUT\n{backend_name}\n{key}\n{content_type or ''}\n{expires}".encode()
+    return hmac.new(settings.secret_key.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_direct_upload(backend_name: str, key: str, content_type: Optional[str], expires: int, signature: str) -> bool:
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(sign_direct_upload(backend_name, key, content_type, expires), signature)
+
+
+class FirebaseStorageBackend(StorageBackend):
+    """Firebase Storage (Google Cloud Storage). Los archivos muy grandes se suben en partes en paralelo."""
+
+    name = "firebase"
+
+    @property
+    def available(self) -> bool:
+        return firebase_config.is_configured()
+
+    @property
+    def bucket(self):
+        return firebase_config.get_bucket()
+
+    def put(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> str:
+        if size > settings.PARALLEL_UPLOAD_THRESHOLD:
+            blob = self._parallel_composite_upload(key, fileobj, size, content_type)
+        else:
+            # Los archivos medianos usan subida resumible por partes
+            chunk_size = settings.RESUMABLE_UPLOAD_CHUNK_SIZE if size > settings.RESUMABLE_UPLOAD_THRESHOLD else None
+            blob = self.bucket.blob(key, chunk_size=chunk_size)
+            fileobj.seek(0)
+            blob.upload_from_file(fileobj, size=size, content_type=content_type)
+        blob.make_public()
+        return blob.public_url
+
+    def _parallel_composite_upload(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]):
+        """Sube el archivo como partes independientes en paralelo y las combina con compose()."""
+        part_size = settings.PARALLEL_UPLOAD_PART_SIZE
+        # compose() acepta hasta 32 componentes
+        part_size = max(part_size, -(-size // 32))
+        ranges = [(offset, min(part_size, size - offset)) for offset in range(0, size, part_size)]
+        read_lock = threading.Lock()
+        # Partes ya subidas: se borran al final tanto si compose() funciona como si falla alguna subida
+        uploaded = []
+
+        def upload_part(index: int, offset: int, length: int):
+            # Un solo archivo de origen: las lecturas se serializan, las subidas no
+            with read_lock:
+                fileobj.seek(offset)
+                data = fileobj.read(length)
+            part = self.bucket.blob(f"{key}.part-{index:02d}")
+            part.upload_from_string(data, content_type=content_type)
+            with read_lock:
+                uploaded.append(part)
+            return part
+
+        try:
+            with ThreadPoolExecutor(max_workers=settings.PARALLEL_UPLOAD_WORKERS) as pool:
+                parts = list(pool.map(lambda args: upload_part(*args), [(i, *r) for i, r in enumerate(ranges)]))
+            blob = self.bucket.blob(key)
+            blob.content_type = content_type
+            blob.compose(parts)
+        finally:
+            for part in uploaded:
+                try:
+                    part.delete()
+                except Exception as e:
+                    print(f"❌ No se pudo borrar la parte {part.name}: {e}")
+        return blob
+
+    def get(self, key: str) -> bytes:
+        return self.bucket.blob(key).download_as_bytes()
+
+    def download_to(self, key: str, fileobj: BinaryIO):
+        self.bucket.blob(key).download_to_file(fileobj)
+
+    def delete(self, key: str):
+        self.bucket.blob(key).delete()
+
+    def exists(self, key: str) -> bool:
+        return self.bucket.blob(key).exists()
+
+    def url(self, key: str) -> str:
+        return self.bucket.blob(key).public_url
+
+    def stat(self, key: str) -> Optional[Tuple[int, Optional[str]]]:
+        blob = self.bucket.get_blob(key)
+        if blob is None:
+            return None
+        return blob.size, blob.content_type
+
+    def finalize_upload(self, key: str) -> str:
+        blob = self.bucket.blob(key)
+        blob.make_public()
+        return blob.public_url
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        # Ejemplo: https://storage.googleapis.com/bucket-name/images/filename.jpg
+        marker = f"/{self.bucket.name}/"
+        if marker not in url:
+            return None
+        return url.split(marker, 1)[1]
+
+    def presign(self, key: str, method: str = "GET", expires_seconds: int = 900, content_type: Optional[str] = None) -> str:
+        if method not in ("GET", "PUT"):
+            raise ValueError(f"Método no soportado para URLs firmadas: {method} (solo GET o PUT)")
+        return self.bucket.blob(key).generate_signed_url(
+            version="v4",
+            expiration=timedelta(seconds=expires_seconds),
+            method=method,
+            content_type=content_type
+        )
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    Sistema de archivos local, servido en base_url. Las escrituras van a un archivo temporal
+    en el mismo directorio y se renombran al final (nunca se ve un archivo a medio escribir).
+    """
+
+    name = "local"
+
+    def __init__(self, root: str, base_url: str):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def object_key(self, folder: str, filename: str) -> str:
+        # Directorios de dos niveles según el nombre (images/ab/cd/abcd...png) para no
+        # acumular miles de archivos en una sola carpeta
+        return f"{folder}/{filename[:2]}/{filename[2:4]}/{filename}"
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.root, key))
+        if not path.startswith(os.path.normpath(self.root) + os.sep):
+            raise ValueError(f"Clave fuera del directorio de almacenamiento: {key}")
+        return path
+
+    def put(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> str:
+        path = self._path(key)
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fileobj.seek(0)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".upload-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                shutil.copyfileobj(fileobj, f, settings.UPLOAD_CHUNK_SIZE)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return self.url(key)
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as f:
+            return f.read()
+
+    def download_to(self, key: str, fileobj: BinaryIO):
+        with open(self._path(key), "rb") as f:
+            shutil.copyfileobj(f, fileobj, settings.UPLOAD_CHUNK_SIZE)
+
+    def delete(self, key: str):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def stat(self, key: str) -> Optional[Tuple[int, Optional[str]]]:
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        # El sistema de archivos no guarda el content_type
+        return os.path.getsize(path), None
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        if not url.startswith(self.base_url + "/"):
+            return None
+        return url[len(self.base_url) + 1:]
+
+
+class InMemoryStorageBackend(StorageBackend):
+    """Almacenamiento en memoria del proceso, para pruebas y benchmarks sin red ni disco."""
+
+    name = "memory"
+
+    def __init__(self, base_url: str = "/memory"):
+        self.base_url = base_url.rstrip("/")
+        self.objects: Dict[str, Tuple[bytes, Optional[str]]] = {}
+        self._lock = threading.Lock()
+
+    def put(self, key: str, fileobj: BinaryIO, size: int, content_type: Optional[str]) -> str:
+        fileobj.seek(0)
+        data = fileobj.read()
+        with self._lock:
+            self.objects[key] = (data, content_type)
+        return self.url(key)
+
+    def get(self, key: str) -> bytes:
+        return self.objects[key][0]
+
+    def delete(self, key: str):
+        with self._lock:
+            self.objects.pop(key, None)
+
+    def exists(self, key: str) -> bool:
+        return key in self.objects
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def stat(self, key: str) -> Optional[Tuple[int, Optional[str]]]:
+        if key not in self.objects:
+            return None
+        data, content_type = self.objects[key]
+        return len(data), content_type
+
+    def key_from_url(self, url: str) -> Optional[str]:
+        if not url.startswith(self.base_url + "/"):
+            return None
+        return url[len(self.base_url) + 1:]
+
+
+def create_storage_backend(name: str) -> StorageBackend:
+    if name == "firebase":
+        return FirebaseStorageBackend()
+    if name == "local":
+        return LocalStorageBackend(settings.LOCAL_STORAGE_ROOT, settings.LOCAL_STORAGE_BASE_URL)
+    if name == "memory":
+        return InMemoryStorageBackend()
+    raise ValueError(f"STORAGE_BACKEND desconocido: {name}")
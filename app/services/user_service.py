@@ -1,7 +1,11 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate 
-from app.utils.security import hash_password, verify_password
+from app.utils.security import (
+    hash_password_async, verify_and_update_password_async,
+    create_access_token, create_refresh_token, decode_token, REFRESH_TOKEN_TYPE
+)
+from sqlalchemy import update
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
@@ -12,7 +16,7 @@ def isAdmin(email: str):
     return email.split('@')[1]=='caece.edu.com'
 
 async def create_user(db: Session, user_data: UserCreate):
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     adminValue= isAdmin(user_data.email)
     
     new_user =  new_user = User(
@@ -30,10 +34,62 @@ async def create_user(db: Session, user_data: UserCreate):
 async def authenticate_user(db: Session, email: str, password: str):
     result = await db.execute(select(User).where(User.email == email))
     user = result.scalars().first()
-    if not user or not verify_password(password, user.password):
+    if not user:
+        return None
+    valid, new_hash = await verify_and_update_password_async(password, user.password)
+    if not valid:
         return None
+    if new_hash:
+        # El hash tenía otro costo de bcrypt: guardarlo con el costo configurado
+        user.password = new_hash
+        await db.commit()
+        await db.refresh(user)
     return user
 
+async def issue_session_tokens(db: AsyncSession, user: User) -> dict:
+    """Emite access y refresh token; el jti del refresh queda guardado como el único vigente."""
+    refresh_token, jti = create_refresh_token(user.id)
+    await db.execute(update(User).where(User.id == user.id).values(refresh_token_jti=jti))
+    await db.commit()
+    return {
+        "access_token": create_access_token(user),
+        "refresh_token": refresh_token,
+        "token_type": "bearer"
+    }
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str):
+    """
+    Cambia un refresh token válido por un par nuevo (rotación).
+    Si el token ya fue usado (su jti no es el vigente) se revocan todas las sesiones del usuario.
+    """
+    claims = decode_token(refresh_token, REFRESH_TOKEN_TYPE)
+    if claims is None:
+        return None
+    user_id = int(claims["sub"])
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if not user:
+        return None
+
+    new_refresh_token, new_jti = create_refresh_token(user.id)
+    # Update condicional: solo un request puede consumir cada refresh token
+    rotated = await db.execute(
+        update(User)
+        .where(User.id == user_id, User.refresh_token_jti == claims["jti"])
+        .values(refresh_token_jti=new_jti)
+    )
+    if rotated.rowcount != 1:
+        # Reutilización de un refresh token ya rotado: posible robo, cerrar la sesión
+        await db.execute(update(User).where(User.id == user_id).values(refresh_token_jti=None))
+        await db.commit()
+        return None
+    await db.commit()
+    return {
+        "access_token": create_access_token(user),
+        "refresh_token": new_refresh_token,
+        "token_type": "bearer"
+    }
+
 async def delete_user_router(db: AsyncSession, user_id: int):
     result = await db.execute(select(User).filter(User.id == user_id))
     user = result.scalar_one_or_none()
@@ -55,7 +111,7 @@ async def update_user_router(db: AsyncSession, user_id: int, updates: dict):
 
     for key, value in updates.items():
         if (key == "password"):
-            value = hash_password(value)
+            value = await hash_password_async(value)
         setattr(user, key, value)
     
     await db.commit()
@@ -135,9 +191,11 @@ async def reset_password_with_token(db: AsyncSession, token: str, new_password:
         return False, "Token inválido o expirado"
     
     # Actualizar contraseña y limpiar token
-    user.password = hash_password(new_password)
+    user.password = await hash_password_async(new_password)
     user.reset_token = None
     user.reset_token_expires = None
+    # Invalidar el refresh token vigente
+    user.refresh_token_jti = None
     
     await db.commit()
     
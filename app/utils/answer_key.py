@@ -0,0 +1,44 @@
+from functools import lru_cache
+from typing import FrozenSet, Optional
+from app.utils.text import normalize_text
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerKey:
+    """
+    Clave de respuestas precompilada de una pregunta.
+    `correct_answer` admite varias respuestas separadas por '|'; se normalizan una
+    sola vez y la comparación es una búsqueda O(1) en un conjunto.
+    """
+    __slots__ = ("accepted", "use_normalize_text")
+
+    def __init__(self, correct_answer: Optional[str], use_normalize_text: bool = False):
+        self.use_normalize_text = use_normalize_text
+        self.accepted: FrozenSet[str] = frozenset(
+            self.canonical(answer) for answer in correct_answer.split('|')
+        ) if correct_answer else frozenset()
+
+    def canonical(self, text: str) -> str:
+        if self.use_normalize_text:
+            return normalize_text(text)
+        return text.lower().strip()
+
+    def matches(self, user_answer: Optional[str]) -> bool:
+        if not user_answer or not self.accepted:
+            return False
+        return self.canonical(user_answer) in self.accepted
+
+
+@lru_cache(maxsize=4096)
+def compile_answer_key(correct_answer: Optional[str], use_normalize_text: bool = False) -> AnswerKey:
+    """Devuelve la clave compilada para `correct_answer` (cacheada por su texto)."""
+    return AnswerKey(correct_answer, use_normalize_text)
+
+
+def check_answer(user_answer: str, correct_answer: str) -> bool:
+    """Verifica si la respuesta del usuario es correcta."""
+    is_correct = compile_answer_key(correct_answer).matches(user_answer)
+    logger.debug("check_answer: '%s' vs '%s' -> %s", user_answer, correct_answer, is_correct)
+    return is_correct
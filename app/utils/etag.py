@@ -0,0 +1,58 @@
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+from app.core.change_tracking import get_table_versions
+import hashlib
+import json
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _quoted(digest: str) -> str:
+    return f'"{digest[:32]}"'
+
+
+async def conditional_json_response(
+    request: Request,
+    db: AsyncSession,
+    tables: Iterable[str],
+    build_payload: Callable[[], Awaitable[Any]],
+    headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Responde un GET con soporte de ETag / If-None-Match.
+
+    El ETag se calcula con la URL y las versiones de las tablas de las que depende
+    la respuesta, por lo que un 304 se resuelve sin consultar ni serializar los datos.
+    Si alguna tabla no tiene versión registrada, se usa un hash del cuerpo serializado.
+    `headers` puede ser completado por build_payload (p. ej. el cursor de paginación).
+    """
+    headers = headers if headers is not None else {}
+    tables = sorted(set(tables))
+    versions = await get_table_versions(db, tables)
+
+    etag = None
+    if len(versions) == len(tables):
+        query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+        fingerprint = f"{request.url.path}?{query}|" + ",".join(f"{table}:{versions[table]}" for table in tables)
+        etag = _quoted(hashlib.sha256(fingerprint.encode("utf-8")).hexdigest())
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    payload = await build_payload()
+    body = json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if etag is None:
+        etag = _quoted(hashlib.sha256(body).hexdigest())
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    response_headers = {**headers, "ETag": etag, "Cache-Control": "no-cache"}
+    return Response(content=body, media_type="application/json", headers=response_headers)
@@ -0,0 +1,87 @@
+"""
+Generación de derivados de imágenes (anchos configurados + miniatura) en un pool de procesos.
+
+render_image_variants corre en un proceso aparte: recibe los bytes originales y devuelve
+los derivados ya codificados. Los derivados se guardan sin metadatos (EXIF, ICC, XMP).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+from PIL import Image, ImageOps
+import asyncio
+import io
+import multiprocessing
+
+FORMAT_EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+FORMAT_CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# (clave del derivado, formato, bytes codificados)
+RenderedVariant = Tuple[str, str, bytes]
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _encode(image: Image.Image, image_format: str, quality: int) -> bytes:
+    # Al guardar sin exif/icc_profile/xmp, PIL no copia los metadatos del original
+    if image_format == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format.upper(), quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def render_image_variants(
+    data: bytes,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    thumbnail_size: int,
+    quality: int
+) -> List[RenderedVariant]:
+    """Genera los derivados de una imagen. Se ejecuta dentro del pool de procesos."""
+    with Image.open(io.BytesIO(data)) as original:
+        # Aplicar la orientación EXIF antes de descartar los metadatos
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+
+        rendered: List[RenderedVariant] = []
+        # No se generan anchos mayores al original
+        for width in sorted({w for w in widths if w < image.width}):
+            height = round(image.height * width / image.width)
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for image_format in formats:
+                rendered.append((f"w{width}", image_format, _encode(resized, image_format, quality)))
+
+        thumbnail = ImageOps.fit(image, (thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+        for image_format in formats:
+            rendered.append(("thumbnail", image_format, _encode(thumbnail, image_format, quality)))
+        return rendered
+
+
+def get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Crea el pool en el primer uso para no lanzar procesos al importar la app."""
+    global _process_pool
+    if _process_pool is None:
+        # spawn: los procesos no heredan hilos ni conexiones abiertas del servidor
+        _process_pool = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+
+async def render_image_variants_async(
+    data: bytes,
+    widths: Sequence[int],
+    formats: Sequence[str],
+    thumbnail_size: int,
+    quality: int,
+    max_workers: int
+) -> List[RenderedVariant]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(max_workers), render_image_variants, data, widths, formats, thumbnail_size, quality
+    )
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
@@ -1,13 +1,124 @@
 from passlib.context import CryptContext
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
+from typing import Optional, Tuple
 from app.core.config import settings
+import asyncio
+import threading
+import time
+import uuid
 
-# Cifrado de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Cifrado de contraseñas. Los hashes con un costo distinto a BCRYPT_ROUNDS quedan marcados
+# para actualizarse (needs_update / verify_and_update) la próxima vez que el usuario inicia sesión.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt libera el GIL, así que un pool de hilos acotado permite calcular hashes
+# en paralelo sin bloquear el event loop
+_hash_executor = ThreadPoolExecutor(max_workers=settings.BCRYPT_MAX_WORKERS, thread_name_prefix="bcrypt")
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica la contraseña y, si el hash usa otro costo, devuelve también el hash nuevo."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_hash_executor, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, verify_password, plain_password, hashed_password
+    )
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await asyncio.get_running_loop().run_in_executor(
+        _hash_executor, verify_and_update_password, plain_password, hashed_password
+    )
+
+
+# Tokens de sesión (JWT)
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
+def create_access_token(user) -> str:
+    """Token de acceso con los datos necesarios para autorizar sin consultar la tabla users."""
+    now = datetime.utcnow()
+    claims = {
+        "sub": str(user.id),
+        "type": ACCESS_TOKEN_TYPE,
+        "isAdmin": user.isAdmin,
+        "englishLevel": user.englishLevel.value if user.englishLevel else None,
+        "iat": now,
+        "exp": now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    }
+    return jwt.encode(claims, settings.secret_key, algorithm=settings.ALGORITHM)
+
+def create_refresh_token(user_id: int) -> Tuple[str, str]:
+    """Devuelve el refresh token y su jti, que se guarda en el usuario para poder rotarlo."""
+    now = datetime.utcnow()
+    jti = uuid.uuid4().hex
+    claims = {
+        "sub": str(user_id),
+        "type": REFRESH_TOKEN_TYPE,
+        "jti": jti,
+        "iat": now,
+        "exp": now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    }
+    return jwt.encode(claims, settings.secret_key, algorithm=settings.ALGORITHM), jti
+
+class DecodedTokenCache:
+    """
+    LRU de tokens ya verificados, para no repetir la verificación de la firma en cada request.
+    Se usa también desde dependencias y servicios que corren en el threadpool, por eso cada
+    operación sobre el OrderedDict va bajo un lock.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            claims = self._entries.get(token)
+            if claims is None:
+                return None
+            if claims["exp"] <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return claims
+
+    def set(self, token: str, claims: dict):
+        with self._lock:
+            self._entries[token] = claims
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+decoded_token_cache = DecodedTokenCache(settings.TOKEN_CACHE_MAX_ENTRIES)
+
+def decode_token(token: str, expected_type: str) -> Optional[dict]:
+    """Verifica firma, expiración y tipo del token. Devuelve los claims o None si no es válido."""
+    claims = decoded_token_cache.get(token)
+    if claims is None:
+        try:
+            claims = jwt.decode(token, settings.secret_key, algorithms=[settings.ALGORITHM])
+        except JWTError:
+            return None
+        decoded_token_cache.set(token, claims)
+    if claims.get("type") != expected_type:
+        return None
+    return claims
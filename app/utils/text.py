@@ -0,0 +1,18 @@
+import re
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza el texto para comparación:
+    - Convierte a minúsculas
+    - Elimina espacios extra
+    - Elimina puntuación
+    """
+    if not text:
+        return ""
+    # Convertir a minúsculas y eliminar espacios extra
+    text = text.lower().strip()
+    # Eliminar puntuación excepto en números
+    text = re.sub(r'[^\w\s]', '', text)
+    # Reemplazar múltiples espacios con uno solo
+    text = re.sub(r'\s+', ' ', text)
+    return text